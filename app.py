@@ -1,28 +1,160 @@
+import argparse
+import json
 import sys
 import os
 from PySide6.QtWidgets import QApplication
 from PySide6.QtGui import QIcon
-from ui.main_window import MainWindow
+from core.ocr_server import ServerConfig
+from core.single_instance import CommandError, SingleInstanceServer, send_command
+from util.logger import setup_logging
+
+
+def parse_args(argv):
+    """解析命令行参数（Qt自身的参数已由QApplication移除）"""
+    output_parser = argparse.ArgumentParser(add_help=False)
+    output_parser.add_argument("--json", action="store_true", help="以JSON格式输出结果")
+
+    parser = argparse.ArgumentParser(prog="ocr-tool", description="OCR文字识别工具")
+    parser.set_defaults(files=[], json=False)
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("show", help="显示主窗口（默认）")
+    subparsers.add_parser("capture", parents=[output_parser], help="截图识别并输出识别文本")
+    ocr_parser = subparsers.add_parser("ocr", parents=[output_parser], help="识别图片文件并输出识别文本")
+    ocr_parser.add_argument("files", nargs="+", help="图片文件路径")
+    subparsers.add_parser("quit", help="退出正在运行的实例")
+    serve_parser = subparsers.add_parser("serve", help="以无界面服务模式运行，通过本机HTTP或Unix套接字提供识别")
+    serve_parser.add_argument("--host", default=ServerConfig.HOST)
+    serve_parser.add_argument("--port", type=int, default=ServerConfig.PORT)
+    serve_parser.add_argument("--unix", help="Unix套接字路径，指定后不监听TCP端口")
+    serve_parser.add_argument("--workers", type=int, default=ServerConfig.WORKERS,
+                              help="同时推理的请求数，默认与会话池大小一致")
+    serve_parser.add_argument("--pool-size", type=int, default=None, help="推理会话数量，0 表示自动")
+    serve_parser.add_argument("--queue", type=int, default=ServerConfig.MAX_QUEUE, help="排队请求数上限")
+    args = parser.parse_args(argv)
+    args.command = args.command or "show"
+    return args
+
+
+def print_result(command, result, as_json=False):
+    """输出命令结果"""
+    if result is None:
+        return
+    if as_json:
+        print(json.dumps(result, ensure_ascii=False))
+    elif command == "ocr":
+        for path, lines in result.items():
+            if len(result) > 1:
+                print(f"== {path} ==")
+            print("\n".join(lines))
+    else:
+        print("\n".join(result))
+
+
+def run_ocr_locally(files):
+    """没有正在运行的实例时直接识别图片文件（需要加载模型）"""
+    from PySide6.QtGui import QImage
+    from core.ocr_engine import OCREngine
+
+    images = []
+    for path in files:
+        image = QImage(path)
+        if image.isNull():
+            raise CommandError(f"无法读取图片: {path}")
+        images.append((path, image))
+
+    engine = OCREngine.get_instance()
+    return {path: list(engine.process_image(image).txts) for path, image in images}
+
+
+def run_server(args):
+    """无界面服务模式，按配置的后端加载一次模型，供多个客户端共享"""
+    from core.ocr_engine import OCREngine
+    from core.ocr_server import OCRServer
+    from core.settings_manager import SettingsManager
+
+    settings = SettingsManager(use_file_storage=True)
+    backend = settings.get_value("ocr_backend", OCREngine.DEFAULT_BACKEND)
+    pool_size = args.pool_size if args.pool_size is not None else int(settings.get_value("ocr_pool_size", 0))
+    engine = OCREngine.get_instance(backend, pool_size, profile=settings.get_value("model_profile", "fp32"),
+                                    cls=settings.get_value("angle_cls", "auto"))
+    engine.set_preprocess_profile(settings.get_value("preprocess_profile", "screen"))
+    server = OCRServer(engine, args.host, args.port, args.unix, args.workers, args.queue)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def forward_command(args, command_args):
+    """把命令转发给已运行的实例并输出结果，返回退出码；没有正在运行的实例时返回 None"""
+    try:
+        print_result(args.command, send_command(args.command, command_args), args.json)
+        return 0
+    except ConnectionError:
+        return None
+    except CommandError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
 
 
 def main():
     """主函数"""
-    # 确保只有一个实例运行
+    # 初始化日志（级别可通过环境变量 OCR_TOOL_LOG_LEVEL 调整）
+    setup_logging()
+
+    # 服务模式不需要界面
+    if sys.argv[1:2] == ["serve"]:
+        return run_server(parse_args(sys.argv[1:]))
+
     app = QApplication(sys.argv)
     app.setQuitOnLastWindowClosed(False)
 
+    args = parse_args(app.arguments()[1:])
+    command_args = [os.path.abspath(path) for path in args.files]
+
+    # 确保只有一个实例运行：已有实例时把命令转发过去，由已加载模型的实例执行并返回结果
+    exit_code = forward_command(args, command_args)
+    if exit_code is not None:
+        return exit_code
+
+    if args.command == "quit":
+        return 0
+    if args.command == "ocr":
+        try:
+            print_result(args.command, run_ocr_locally(command_args), args.json)
+        except CommandError as e:
+            print(f"错误: {e}", file=sys.stderr)
+            return 1
+        return 0
+
+    # 另一个实例可能在转发之后抢先启动：再转发一次，仍失败时不启动界面
+    instance_server = SingleInstanceServer()
+    if not instance_server.listen():
+        exit_code = forward_command(args, command_args)
+        if exit_code is not None:
+            return exit_code
+        print("错误: 无法启动单实例守护，也无法连接正在运行的实例", file=sys.stderr)
+        return 1
+
     # 设置应用图标
     icon_path = os.path.join("_internal", "ocr.png")
     if os.path.exists(icon_path):
         app.setWindowIcon(QIcon(icon_path))
 
-    # 创建主窗口
+    # 创建主窗口（延迟导入，转发命令时无需加载界面和OCR模型）
+    from ui.main_window import MainWindow
     window = MainWindow()
+    window.attach_instance_server(instance_server)
     window.show()
+    if args.command == "capture":
+        window.start_screenshot()
 
     # 运行应用
-    sys.exit(app.exec())
+    exit_code = app.exec()
+    instance_server.close()
+    return exit_code
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -3,6 +3,9 @@ from PySide6.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, QRect,
 from PySide6.QtGui import QCursor, QFont
 import math
 
+from util.logger import get_logger
+
+logger = get_logger(__name__)
 
 class FloatingIndicator(QWidget):
     """增强版浮动指示器 - 支持鼠标跟随和动画效果"""
@@ -77,7 +80,7 @@ class FloatingIndicator(QWidget):
         # 屏幕边界检测
         self.screen_margin = 10  # 距离屏幕边缘的最小距离
 
-        print("Enhanced FloatingIndicator initialized")
+        logger.debug("FloatingIndicator initialized")
 
     def _setup_styles(self):
         """设置样式"""
@@ -151,7 +154,7 @@ class FloatingIndicator(QWidget):
         if follow_mouse:
             self.start_mouse_following()
 
-        print(f"FloatingIndicator shown at cursor with text: {text}, follow_mouse: {follow_mouse}")
+        logger.debug("FloatingIndicator shown at cursor with text: %s, follow_mouse: %s", text, follow_mouse)
 
     def start_mouse_following(self):
         """线程安全的开始跟随"""
@@ -168,7 +171,7 @@ class FloatingIndicator(QWidget):
         if self.smooth_follow and not self.smooth_timer.isActive():
             self.smooth_timer.start()
 
-        print("Mouse following started")
+        logger.debug("Mouse following started")
 
     def stop_mouse_following(self):
         """线程安全的停止跟随"""
@@ -184,7 +187,7 @@ class FloatingIndicator(QWidget):
         if self.smooth_timer.isActive():
             self.smooth_timer.stop()
 
-        print("Mouse following stopped")
+        logger.debug("Mouse following stopped")
 
     def _update_mouse_position(self):
         """更新鼠标位置"""
@@ -254,7 +257,7 @@ class FloatingIndicator(QWidget):
                         min(y, screen_rect.bottom() - self.height() - self.screen_margin))
 
         except Exception as e:
-            print(f"Screen clamping error: {e}")
+            logger.warning("Screen clamping error: %s", e)
 
         return x, y
 
@@ -292,24 +295,24 @@ class FloatingIndicator(QWidget):
         if self.isVisible():
             self._fade_out()
             self.visibility_changed.emit(False)
-            print("FloatingIndicator hiding with animation")
+            logger.debug("FloatingIndicator hiding with animation")
 
     def hide(self):
         """立即隐藏"""
         self.stop_mouse_following()
         super().hide()
         self.visibility_changed.emit(False)
-        print("FloatingIndicator hidden immediately")
+        logger.debug("FloatingIndicator hidden immediately")
 
     def update_text(self, text):
         """更新显示文本"""
         self.label.setText(text)
-        print(f"FloatingIndicator text updated: {text}")
+        logger.debug("FloatingIndicator text updated: %s", text)
 
     def set_follow_speed(self, speed):
         """设置跟随速度 (0-1之间)"""
         self.follow_speed = max(0.01, min(1.0, speed))
-        print(f"Follow speed set to: {self.follow_speed}")
+        logger.debug("Follow speed set to: %s", self.follow_speed)
 
     def set_smooth_follow(self, enabled):
         """设置是否启用平滑跟随"""
@@ -319,13 +322,13 @@ class FloatingIndicator(QWidget):
         elif not enabled and self.smooth_timer.isActive():
             self.smooth_timer.stop()
 
-        print(f"Smooth follow {'enabled' if enabled else 'disabled'}")
+        logger.debug("Smooth follow %s", "enabled" if enabled else "disabled")
 
     def set_offset(self, offset_x, offset_y):
         """设置鼠标偏移量"""
         self.follow_offset_x = offset_x
         self.follow_offset_y = offset_y
-        print(f"Offset set to: ({offset_x}, {offset_y})")
+        logger.debug("Offset set to: (%s, %s)", offset_x, offset_y)
 
     def get_status(self):
         """获取当前状态信息"""
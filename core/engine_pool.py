@@ -0,0 +1,341 @@
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from core.ocr_backends import OCRBackend, create_backend
+from util.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class PoolConfig:
+    """推理会话池配置"""
+    # 会话数量，0 表示按CPU核数和内存预算自动决定
+    SIZE = 0
+    MAX_SIZE = 4
+    # 每个会话大约占用的CPU线程数（ONNX Runtime 内部并行）
+    THREADS_PER_SESSION = 4
+    # 会话池可使用的内存预算，以及单个会话（一套检测/分类/识别模型）的估算内存（MB）
+    MEMORY_BUDGET_MB = 1024
+    SESSION_MEMORY_MB = 300
+    # 交互请求连续优先获得会话的次数上限，之后若有批量请求等待则让一次，避免批量请求饿死
+    INTERACTIVE_STREAK = 8
+    # 统计等待时间分位数时保留的样本数
+    WAIT_SAMPLES = 1000
+
+
+class Priority:
+    """识别任务类别，同时也是会话请求的优先级，数值越小越优先"""
+    HOVER = 0  # 悬停取词
+    CAPTURE = 1  # 截图识别（含实时预览）
+    WATCH = 2  # 区域监视
+    BATCH = 3  # 批量识别、服务请求
+    # 未指明类别的交互调用
+    INTERACTIVE = CAPTURE
+
+    NAMES = {HOVER: "hover", CAPTURE: "capture", WATCH: "watch", BATCH: "batch"}
+
+    @staticmethod
+    def is_background(priority: int) -> bool:
+        return priority >= Priority.WATCH
+
+
+class PoolClosedError(RuntimeError):
+    """会话池已关闭（后端已切换）"""
+    pass
+
+
+def auto_pool_size() -> int:
+    """按CPU核数和内存预算计算会话数量"""
+    by_cpu = max((os.cpu_count() or 1) // PoolConfig.THREADS_PER_SESSION, 1)
+    by_memory = max(PoolConfig.MEMORY_BUDGET_MB // PoolConfig.SESSION_MEMORY_MB, 1)
+    return max(min(by_cpu, by_memory, PoolConfig.MAX_SIZE), 1)
+
+
+class PoolMetrics:
+    """会话池统计：按优先级记录排队等待时间"""
+
+    def __init__(self, samples: int = PoolConfig.WAIT_SAMPLES):
+        self._lock = threading.Lock()
+        self._waits: Dict[int, deque] = {}
+        self._counts: Dict[int, int] = {}
+        self._samples = samples
+
+    def observe(self, priority: int, wait: float):
+        with self._lock:
+            self._waits.setdefault(priority, deque(maxlen=self._samples)).append(wait)
+            self._counts[priority] = self._counts.get(priority, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            result = {}
+            for priority, waits in self._waits.items():
+                values = np.percentile(np.fromiter(waits, dtype=np.float64), [50, 95, 99]) * 1000
+                p50, p95, p99 = (round(float(value), 2) for value in values)
+                result[Priority.NAMES.get(priority, str(priority))] = {
+                    "checkouts": self._counts[priority],
+                    "wait_ms": {"p50": p50, "p95": p95, "p99": p99},
+                }
+            return result
+
+
+class EnginePool:
+    """同一后端的多个独立推理会话
+
+    ONNX 会话对象不能被多个线程同时调用，每个请求通过 checkout 独占一个会话，用完归还。
+    首个会话在 load 时创建，其余会话在全部忙碌时按需在后台创建，直到达到池大小。
+    等待中的请求按优先级获得会话，同优先级先到先得。
+    """
+
+    def __init__(self, backend_name: str, size: int = PoolConfig.SIZE, **backend_options):
+        self.backend_name = backend_name
+        self.size = size or auto_pool_size()
+        self.backend_options = backend_options
+        self.metrics = PoolMetrics()
+
+        self._cond = threading.Condition()
+        self._idle: List[OCRBackend] = []
+        self._sessions: List[OCRBackend] = []
+        self._last_used = time.monotonic()
+        self._created = 0
+        self._growing = 0
+        self._waiting: List[tuple] = []  # (priority, seq)
+        self._sequence = itertools.count()
+        self._interactive_streak = 0
+        self._closed = False
+
+    def _create_backend(self) -> OCRBackend:
+        backend = create_backend(self.backend_name, **self.backend_options)
+        backend.load()
+        return backend
+
+    def load(self):
+        """同步创建首个会话"""
+        backend = self._create_backend()
+        with self._cond:
+            self._created += 1
+            self._sessions.append(backend)
+            self._idle.append(backend)
+            self._cond.notify_all()
+
+    def warmup(self):
+        """预热空闲的会话"""
+        with self._cond:
+            backends = list(self._idle)
+        for backend in backends:
+            backend.warmup()
+
+    @property
+    def name(self) -> str:
+        return self.backend_name
+
+    @contextmanager
+    def checkout(self, priority: int = Priority.INTERACTIVE):
+        """独占一个会话，退出时归还
+
+        Raises:
+            PoolClosedError: 会话池已关闭
+        """
+        backend = self.acquire(priority)
+        try:
+            yield backend
+        finally:
+            self.release(backend)
+
+    def acquire(self, priority: int = Priority.INTERACTIVE) -> OCRBackend:
+        """获取一个会话，没有空闲会话时按优先级排队等待"""
+        start_time = time.perf_counter()
+        with self._cond:
+            ticket = (priority, next(self._sequence))
+            self._waiting.append(ticket)
+            try:
+                while not (self._idle and self._next_ticket() == ticket):
+                    if self._closed:
+                        raise PoolClosedError("会话池已关闭")
+                    self._grow_if_needed()
+                    self._cond.wait()
+            finally:
+                self._waiting.remove(ticket)
+
+            # 只统计有低优先级请求在等待时，高优先级请求连续获得会话的次数
+            if all(waiting[0] >= priority for waiting in self._waiting) and \
+                    any(waiting[0] > priority for waiting in self._waiting):
+                self._interactive_streak += 1
+            else:
+                self._interactive_streak = 0
+            backend = self._idle.pop()
+            # 其它等待者可能因为队首变化而可以继续
+            self._cond.notify_all()
+        self.metrics.observe(priority, time.perf_counter() - start_time)
+        return backend
+
+    def release(self, backend: OCRBackend):
+        """归还会话；会话池已关闭时直接释放"""
+        with self._cond:
+            self._last_used = time.monotonic()
+            if not self._closed:
+                self._idle.append(backend)
+                self._cond.notify_all()
+                return
+            if backend in self._sessions:
+                self._sessions.remove(backend)
+        backend.unload()
+
+    def _next_ticket(self) -> Optional[tuple]:
+        """下一个应获得会话的请求"""
+        if not self._waiting:
+            return None
+        first = min(self._waiting)
+        if self._interactive_streak >= PoolConfig.INTERACTIVE_STREAK:
+            # 高优先级请求已连续占用，让等待最久的低优先级请求先走一次
+            lower = [ticket for ticket in self._waiting if ticket[0] > first[0]]
+            if lower:
+                return min(lower, key=lambda ticket: ticket[1])
+        return first
+
+    def _grow_if_needed(self):
+        """所有会话都忙碌且未达到池大小时，在后台创建新会话"""
+        if self._idle or self._created + self._growing >= self.size:
+            return
+        self._growing += 1
+        threading.Thread(target=self._grow, name="ocr-pool-grow", daemon=True).start()
+
+    def _grow(self):
+        try:
+            backend = self._create_backend()
+            backend.warmup()
+        except Exception as e:
+            logger.error("创建推理会话失败: %s", e)
+            with self._cond:
+                self._growing -= 1
+                # 不再尝试扩容，避免反复失败
+                self.size = max(self._created, 1)
+            return
+
+        with self._cond:
+            self._growing -= 1
+            if self._closed:
+                backend_to_unload = backend
+            else:
+                backend_to_unload = None
+                self._created += 1
+                self._sessions.append(backend)
+                self._idle.append(backend)
+                self._cond.notify_all()
+        if backend_to_unload is not None:
+            backend_to_unload.unload()
+        else:
+            logger.info("推理会话池扩容: %s %d/%d", self.backend_name, self._created, self.size)
+
+    def evict_idle(self, idle_seconds: float) -> List[str]:
+        """释放闲置的模型，返回释放内容的说明
+
+        整个会话池超过 idle_seconds 未使用时，只保留一个会话且释放其模型（下次使用时重新加载）；
+        否则只释放各空闲会话中长时间未用的部分模型。
+        """
+        evicted = []
+        with self._cond:
+            if self._closed:
+                return evicted
+            kept = []
+            if time.monotonic() - self._last_used >= idle_seconds and len(self._idle) == self._created:
+                extra = self._idle[1:]
+                for backend in extra:
+                    self._sessions.remove(backend)
+                self._created -= len(extra)
+                # 保留的会话释放期间移出空闲列表，避免被取走后在推理中途卸载模型
+                kept = [backend for backend in self._idle[:1] if backend.is_loaded]
+                self._idle = [] if kept else self._idle[:1]
+                to_unload = extra + kept
+            else:
+                to_unload = []
+                for backend in self._idle:
+                    evicted.extend(backend.release_idle_models(idle_seconds))
+        for backend in to_unload:
+            backend.unload()
+        if kept:
+            with self._cond:
+                if self._closed:
+                    self._sessions.remove(kept[0])
+                else:
+                    self._idle.extend(kept)
+                    self._cond.notify_all()
+        if to_unload:
+            evicted.append(f"{self.backend_name} x{len(to_unload)}")
+        return evicted
+
+    def prewarm(self) -> bool:
+        """重新加载已释放的模型（在即将需要识别时调用），返回是否进行了加载
+
+        只处理空闲会话，忙碌的会话必然已加载；加载期间该会话暂不参与分配。
+        """
+        with self._cond:
+            cold = [backend for backend in self._idle if backend.needs_reload()]
+            for backend in cold:
+                self._idle.remove(backend)
+        for backend in cold:
+            try:
+                backend.ensure_loaded()
+                backend.warmup()
+            except Exception as e:
+                logger.error("重新加载模型失败: %s", e)
+            finally:
+                self.release(backend)
+        return bool(cold)
+
+    def model_memory(self) -> int:
+        """所有会话已加载模型的估算内存（字节）"""
+        with self._cond:
+            sessions = list(self._sessions)
+        return sum(backend.resident_model_bytes() for backend in sessions)
+
+    def stats(self) -> dict:
+        """会话池状态和各优先级的等待时间"""
+        with self._cond:
+            waiting = {}
+            for priority, _ in self._waiting:
+                name = Priority.NAMES.get(priority, str(priority))
+                waiting[name] = waiting.get(name, 0) + 1
+            state = {
+                "backend": self.backend_name,
+                "size": self.size,
+                "sessions": self._created,
+                "idle": len(self._idle),
+                "waiting": waiting,
+                "cold": sum(1 for backend in self._sessions if backend.needs_reload()),
+            }
+        state["priorities"] = self.metrics.snapshot()
+        state["stages"] = self._stage_stats()
+        return state
+
+    def _stage_stats(self) -> Dict[str, Dict[str, float]]:
+        """汇总各会话的推理阶段统计"""
+        with self._cond:
+            sessions = list(self._sessions)
+        merged: Dict[str, Dict[str, float]] = {}
+        for backend in sessions:
+            for stage, counters in backend.stage_stats().items():
+                total = merged.setdefault(stage, {})
+                for name, value in counters.items():
+                    total[name] = total.get(name, 0) + value
+        for counters in merged.values():
+            if "seconds" in counters:
+                counters["seconds"] = round(counters["seconds"], 3)
+        return merged
+
+    def close(self):
+        """关闭会话池：释放空闲会话，使用中的会话在归还时释放，等待者收到 PoolClosedError"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            for backend in idle:
+                self._sessions.remove(backend)
+            self._cond.notify_all()
+        for backend in idle:
+            backend.unload()
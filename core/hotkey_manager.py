@@ -13,6 +13,9 @@ import sys
 import signal
 
 from components.floating_indicator import FloatingIndicator
+from util.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 class ModifierKey(Enum):
@@ -294,7 +297,7 @@ class WindowsHandler(PlatformHandler):
             self.mouse_proc = None
 
         except ImportError as e:
-            print(f"Warning: Windows-specific libraries not available: {e}")
+            logger.warning("Windows-specific libraries not available: %s", e)
             self.user32 = None
 
     def start_keyboard_listener(self, on_key_press: Callable, on_key_release: Callable):
@@ -306,7 +309,7 @@ class WindowsHandler(PlatformHandler):
                 if normalized_key:
                     on_key_press(normalized_key)
             except Exception as e:
-                print(f"Error in key press: {e}")
+                logger.error("Error in key press: %s", e)
 
         def release_handler(key):
             try:
@@ -314,7 +317,7 @@ class WindowsHandler(PlatformHandler):
                 if normalized_key:
                     on_key_release(normalized_key)
             except Exception as e:
-                print(f"Error in key release: {e}")
+                logger.error("Error in key release: %s", e)
 
         self.listener = keyboard.Listener(on_press=press_handler, on_release=release_handler)
         self.listener.daemon = True
@@ -390,7 +393,7 @@ class MacOSHandler(PlatformHandler):
             self.Cocoa = Cocoa
             self.Quartz = Quartz
         except ImportError:
-            print("Warning: macOS-specific libraries not available")
+            logger.warning("macOS-specific libraries not available")
             self.Cocoa = None
             self.Quartz = None
 
@@ -403,7 +406,7 @@ class MacOSHandler(PlatformHandler):
                 if normalized_key:
                     on_key_press(normalized_key)
             except Exception as e:
-                print(f"Error in key press: {e}")
+                logger.error("Error in key press: %s", e)
 
         def release_handler(key):
             try:
@@ -411,7 +414,7 @@ class MacOSHandler(PlatformHandler):
                 if normalized_key:
                     on_key_release(normalized_key)
             except Exception as e:
-                print(f"Error in key release: {e}")
+                logger.error("Error in key release: %s", e)
 
         self.listener = keyboard.Listener(on_press=press_handler, on_release=release_handler)
         self.listener.daemon = True
@@ -435,7 +438,7 @@ class MacOSHandler(PlatformHandler):
                     if flags & self.Quartz.kCGEventFlagMaskAlternate:
                         callback()
             except Exception as e:
-                print(f"Error in mouse handler: {e}")
+                logger.error("Error in mouse handler: %s", e)
             return event
 
         self.mouse_monitor = self.Quartz.CGEventTapCreate(
@@ -498,8 +501,7 @@ class CrossPlatformHotkeyManager(QObject):
         self._running = False
         self._setup_connections()
 
-        print(f"Initialized for platform: {platform.system()}")
-        print(f"Hotkey combination: {hotkey}")
+        logger.info("Initialized for platform: %s, hotkey combination: %s", platform.system(), hotkey)
 
     def _create_platform_handler(self) -> PlatformHandler:
         """创建平台处理器"""
@@ -510,7 +512,7 @@ class CrossPlatformHotkeyManager(QObject):
         elif system == 'darwin':
             return MacOSHandler()
         else:
-            print(f"Warning: Platform {system} not fully supported, using Windows handler")
+            logger.warning("Platform %s not fully supported, using Windows handler", system)
             return WindowsHandler()
 
     def _setup_connections(self):
@@ -534,23 +536,23 @@ class CrossPlatformHotkeyManager(QObject):
                 self._on_key_press,
                 self._on_key_release
             )
-            print("Keyboard listener started successfully")
+            logger.debug("Keyboard listener started successfully")
 
             # 启动鼠标钩子监听（可选）
             if enable_mouse_hook:
                 success = self.platform_handler.start_mouse_hook(self._on_mouse_clicked)
                 if success:
-                    print("Mouse hook started successfully")
+                    logger.debug("Mouse hook started successfully")
                 else:
-                    print("Mouse hook could not be started")
+                    logger.warning("Mouse hook could not be started")
             else:
-                print("Mouse hook disabled")
+                logger.debug("Mouse hook disabled")
 
             self._running = True
-            print("Hotkey manager started")
+            logger.info("Hotkey manager started")
 
         except Exception as e:
-            print(f"Error starting hotkey manager: {e}")
+            logger.error("Error starting hotkey manager: %s", e)
             self.feedback_manager.show_error_state(f"Start failed: {e}")
 
     def stop(self):
@@ -564,10 +566,10 @@ class CrossPlatformHotkeyManager(QObject):
             self.keyboard_state.clear()
             self.feedback_manager.show_idle_state()
             self._running = False
-            print("Hotkey manager stopped")
+            logger.info("Hotkey manager stopped")
 
         except Exception as e:
-            print(f"Error stopping hotkey manager: {e}")
+            logger.error("Error stopping hotkey manager: %s", e)
 
     def change_hotkey(self, new_hotkey: str):
         """更改热键组合"""
@@ -580,13 +582,13 @@ class CrossPlatformHotkeyManager(QObject):
             self.hotkey_combo = HotkeyCombo.parse(new_hotkey)
             self.state_machine = HotkeyStateMachine(self.hotkey_combo)
             self._setup_connections()
-            print(f"Hotkey changed to: {new_hotkey}")
+            logger.info("Hotkey changed to: %s", new_hotkey)
 
             if was_running:
                 self.start()
 
         except ValueError as e:
-            print(f"Invalid hotkey format: {e}")
+            logger.error("Invalid hotkey format: %s", e)
             self.feedback_manager.show_error_state(f"Invalid hotkey: {e}")
 
     def _on_key_press(self, key: str):
@@ -599,13 +601,13 @@ class CrossPlatformHotkeyManager(QObject):
 
     def _on_modifiers_ready(self, old_state: HotkeyState, new_state: HotkeyState):
         """修饰键准备状态处理"""
-        print("Modifiers ready - showing feedback")
+        logger.debug("Modifiers ready - showing feedback")
         self.feedback_manager.show_ready_state()
         self.state_changed.emit("ready")
 
     def _on_hotkey_activated(self, old_state: HotkeyState, new_state: HotkeyState):
         """热键激活处理"""
-        print(f"Hotkey activated: {self.hotkey_combo}")
+        logger.debug("Hotkey activated: %s", self.hotkey_combo)
         self.feedback_manager.show_activated_state("Hotkey Activated!")
         self.state_changed.emit("activated")
         self.hotkey_activated.emit()
@@ -618,7 +620,7 @@ class CrossPlatformHotkeyManager(QObject):
 
     def _on_mouse_clicked(self):
         """Alt+鼠标点击处理"""
-        print("Alt+Mouse click detected")
+        logger.debug("Alt+Mouse click detected")
         self.feedback_manager.show_activated_state("Alt+Click!")
         self.mouse_clicked.emit()
 
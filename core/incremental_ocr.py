@@ -0,0 +1,279 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+
+from core.engine_pool import Priority
+from core.ocr_result import OCRResult
+from core.tiling import Tile, reading_order
+
+
+class IncrementalConfig:
+    """增量识别配置"""
+    # 指纹网格的单元格边长（像素）
+    CELL_SIZE = 32
+    # 计算指纹时的采样步长，只取部分像素以降低开销
+    SAMPLE_STEP = 2
+    # 变化区域上下扩展的像素，避免文本行被变化条带截断
+    BAND_MARGIN = 8
+    # 滚动检测：最大位移占帧高的比例，以及重叠区域的有内容行中逐行完全一致的最低比例
+    MAX_SCROLL_RATIO = 0.75
+    MIN_SCROLL_MATCH = 0.6
+    # 滚动检测：至少有这么多有内容的行一致才认为发生了滚动（空白行在任何位移下都一致）
+    MIN_SCROLL_INK_ROWS = 8
+    # 互相关得分最高的若干个峰逐一做逐行校验（行距均匀的文本会在行距整数倍处产生多个相近的峰）
+    SCROLL_CANDIDATES = 16
+
+
+@dataclass
+class FrameDiff:
+    """一帧增量识别的结果
+
+    Attributes:
+        result: 当前帧完整的识别结果
+        added: 相比上一帧新增的文本行
+        removed: 相比上一帧消失的文本行
+        changed: 画面是否发生变化
+        recognized_ratio: 本帧重新识别的面积占比
+        shift: 检测到的垂直滚动位移（像素），内容下移为正
+    """
+    result: OCRResult
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: bool = False
+    recognized_ratio: float = 0.0
+    shift: int = 0
+
+
+def tile_fingerprints(image: np.ndarray, cell_size: int = IncrementalConfig.CELL_SIZE,
+                      step: int = IncrementalConfig.SAMPLE_STEP) -> np.ndarray:
+    """计算图像每个网格单元的指纹，形状 (rows, cols, 2)
+
+    指纹为单元格内采样像素的和与平方和，屏幕内容没有噪声，任何像素变化几乎都会改变指纹。
+    """
+    height, width = image.shape[:2]
+    rows, cols = -(-height // cell_size), -(-width // cell_size)
+    cell = cell_size // step
+
+    sampled = image[::step, ::step].astype(np.int64).sum(axis=2)
+    padded = np.zeros((rows * cell, cols * cell), dtype=np.int64)
+    padded[:sampled.shape[0], :sampled.shape[1]] = sampled[:rows * cell, :cols * cell]
+    blocks = padded.reshape(rows, cell, cols, cell)
+    return np.stack((blocks.sum(axis=(1, 3)), (blocks * blocks).sum(axis=(1, 3))), axis=-1)
+
+
+def row_profiles(image: np.ndarray, step: int = IncrementalConfig.SAMPLE_STEP) -> np.ndarray:
+    """计算每行采样像素的和与平方和，形状 (H, 2)"""
+    sampled = image[:, ::step].astype(np.int64).sum(axis=2)
+    return np.stack((sampled.sum(axis=1), (sampled * sampled).sum(axis=1)), axis=1)
+
+
+def ink_rows(profiles: np.ndarray, width: int, step: int = IncrementalConfig.SAMPLE_STEP) -> np.ndarray:
+    """根据行剖面判断每行是否有内容：采样像素全部相同的行（空白、纯色）为 False"""
+    samples = -(-width // step)
+    return profiles[:, 1] * samples != profiles[:, 0] * profiles[:, 0]
+
+
+def estimate_vertical_shifts(previous: np.ndarray, current: np.ndarray, max_shift: int,
+                             count: int = IncrementalConfig.SCROLL_CANDIDATES) -> List[int]:
+    """用行剖面的互相关估计两帧之间的垂直位移，按得分从高到低返回候选
+
+    位移 shift 表示当前帧第 r 行对应上一帧第 r - shift 行（内容下移为正）。
+    """
+    a = previous[:, 0].astype(np.float64)
+    b = current[:, 0].astype(np.float64)
+    a -= a.mean()
+    b -= b.mean()
+    length = len(a)
+    size = 1 << (2 * length - 1).bit_length()
+
+    # corr[k] = sum_i b[i + k] * a[i]，负位移落在数组末尾
+    corr = np.fft.irfft(np.fft.rfft(b, size) * np.conj(np.fft.rfft(a, size)), size)
+    # 不按重叠长度归一化：重叠越多得分越高，行距均匀时周期性的假峰中优先选择位移小的
+    shifts = np.arange(-max_shift, max_shift + 1)
+    scores = corr[shifts % size]
+    scores[shifts == 0] = -np.inf
+
+    # 只保留局部极大值，避免候选集中在同一个峰附近
+    padded = np.concatenate(([-np.inf], scores, [-np.inf]))
+    peaks = np.flatnonzero((scores >= padded[:-2]) & (scores >= padded[2:]) & np.isfinite(scores))
+    best = peaks[np.argsort(-scores[peaks], kind="stable")[:count]]
+    return shifts[best].tolist()
+
+
+def match_shifted_rows(previous: np.ndarray, current: np.ndarray, shift: int) -> np.ndarray:
+    """按位移逐行比较两帧的行剖面，返回当前帧每行是否与上一帧对应行完全一致"""
+    height = len(current)
+    matched = np.zeros(height, dtype=bool)
+    start, end = max(0, shift), min(height, height + shift)
+    if start < end:
+        matched[start:end] = (current[start:end] == previous[start - shift:end - shift]).all(axis=1)
+    return matched
+
+
+def changed_bands(changed_rows: np.ndarray, cell_size: int, height: int, width: int,
+                  margin: int = IncrementalConfig.BAND_MARGIN) -> List[Tile]:
+    """将发生变化的网格行合并为整宽的水平条带
+
+    文本行是水平的，按整行宽度重新识别不会把文本行从左右切断。
+    """
+    bands = []
+    for row in np.flatnonzero(changed_rows).tolist():
+        top = max(row * cell_size - margin, 0)
+        bottom = min((row + 1) * cell_size + margin, height)
+        if bands and top <= bands[-1][1]:
+            bands[-1][1] = bottom
+        else:
+            bands.append([top, bottom])
+    return [Tile(0, top, width, bottom - top) for top, bottom in bands]
+
+
+def _expand_bands(bands: List[Tile], boxes: np.ndarray, height: int) -> List[Tile]:
+    """扩展条带，使与条带相交的旧文本行完整落在条带内，并合并重叠的条带"""
+    spans = []
+    for band in bands:
+        top, bottom = band.y, band.y + band.height
+        hit = (boxes[:, 3] > top) & (boxes[:, 2] < bottom) if len(boxes) else np.zeros(0, dtype=bool)
+        if hit.any():
+            top = max(min(top, int(np.floor(boxes[hit, 2].min()))), 0)
+            bottom = min(max(bottom, int(np.ceil(boxes[hit, 3].max()))), height)
+        spans.append((top, bottom))
+
+    merged = []
+    for top, bottom in sorted(spans):
+        if merged and top <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], bottom)
+        else:
+            merged.append([top, bottom])
+    width = bands[0].width if bands else 0
+    return [Tile(0, top, width, bottom - top) for top, bottom in merged]
+
+
+def diff_texts(old: OCRResult, new: OCRResult):
+    """按文本行比较两次结果，返回 (新增, 消失)"""
+    old_counts, new_counts = Counter(old.txts), Counter(new.txts)
+    return list((new_counts - old_counts).elements()), list((old_counts - new_counts).elements())
+
+
+class IncrementalOCR:
+    """对同一屏幕区域的连续帧做增量识别
+
+    比较相邻两帧的网格指纹，只重新识别发生变化的水平条带，未变化部分沿用上一帧的结果；
+    画面垂直滚动时用行剖面互相关估计位移，平移复用上一帧的结果。
+    """
+
+    def __init__(self, ocr_engine, cell_size: int = IncrementalConfig.CELL_SIZE,
+                 priority: int = Priority.WATCH):
+        self.ocr_engine = ocr_engine
+        self.cell_size = cell_size
+        # 后台监视不应拖慢交互识别
+        self.priority = priority
+        self.result: Optional[OCRResult] = None
+        self._fingerprints: Optional[np.ndarray] = None
+        self._rows: Optional[np.ndarray] = None
+
+    def reset(self):
+        """丢弃历史帧，下一帧完整识别"""
+        self.result = None
+        self._fingerprints = None
+        self._rows = None
+
+    def update(self, image: np.ndarray, dpi_ratio: float = 1.0, screen: Optional[str] = None) -> FrameDiff:
+        """处理新的一帧
+
+        画面滚动时先按估计的位移平移上一帧的结果，只识别新露出的条带和其它变化的行；
+        否则按网格指纹找出变化的条带重新识别。
+
+        Args:
+            image: BGR格式的numpy数组，尺寸应与之前的帧一致，不一致时完整识别
+            dpi_ratio: 截图的设备像素比
+            screen: 截图所在屏幕的名称，用于按文字大小缩放识别输入
+        """
+        height, width = image.shape[:2]
+        fingerprints = tile_fingerprints(image, self.cell_size)
+        rows = row_profiles(image)
+        previous, previous_rows = self.result, self._rows
+
+        if previous is None or self._fingerprints is None or self._fingerprints.shape != fingerprints.shape:
+            self._fingerprints, self._rows = fingerprints, rows
+            self.result = self.ocr_engine.process_array(image, self.priority, dpi_ratio, screen)
+            added = list(self.result.txts)
+            return FrameDiff(self.result, added=added, changed=True, recognized_ratio=1.0)
+
+        changed_cells = (fingerprints != self._fingerprints).any(axis=(1, 2))
+        self._fingerprints, self._rows = fingerprints, rows
+        if not changed_cells.any():
+            return FrameDiff(previous)
+
+        shift, changed_rows = self._detect_scroll(previous_rows, rows, width)
+        if shift:
+            reused = self._shift_result(previous, shift, height)
+            boxes = reused.boxes
+            # 新露出的一侧直到最近一条保留的文本行之间都需要识别（含上一帧被截断的行）
+            if shift > 0:
+                changed_rows[:int(boxes[:, 2].min()) if len(boxes) else height] = True
+            else:
+                changed_rows[int(np.ceil(boxes[:, 3].max())) if len(boxes) else 0:] = True
+            bands = changed_bands(changed_rows, 1, height, width)
+        else:
+            reused = previous
+            bands = changed_bands(changed_cells, self.cell_size, height, width)
+
+        bands = _expand_bands(bands, reused.boxes, height) if bands else []
+        self.result = self._recognize_bands(image, bands, reused, dpi_ratio, screen)
+        added, removed = diff_texts(previous, self.result)
+        recognized = sum(band.height for band in bands) / max(height, 1)
+        return FrameDiff(self.result, added, removed, changed=bool(added or removed or shift),
+                         recognized_ratio=recognized, shift=shift)
+
+    @staticmethod
+    def _detect_scroll(previous_rows: np.ndarray, rows: np.ndarray, width: int):
+        """检测垂直滚动，返回 (位移, 需要重新识别的行掩码)；未检测到滚动时位移为0
+
+        只统计有内容的行：空白行在任何位移下都一致，不能作为滚动的依据。
+        """
+        height = len(rows)
+        max_shift = int(height * IncrementalConfig.MAX_SCROLL_RATIO)
+        if max_shift < 1:
+            return 0, None
+
+        ink = ink_rows(rows, width)
+        best_shift, best_matched, best_count = 0, None, 0
+        for shift in estimate_vertical_shifts(previous_rows, rows, max_shift):
+            matched = match_shifted_rows(previous_rows, rows, shift)
+            count = int((matched & ink).sum())
+            overlap = int(ink[max(0, shift):min(height, height + shift)].sum())
+            if count > best_count and count >= IncrementalConfig.MIN_SCROLL_INK_ROWS \
+                    and count >= overlap * IncrementalConfig.MIN_SCROLL_MATCH:
+                best_shift, best_matched, best_count = shift, matched, count
+        if best_matched is None:
+            return 0, None
+        return best_shift, ~best_matched
+
+    @staticmethod
+    def _shift_result(result: OCRResult, shift: int, height: int) -> OCRResult:
+        """按位移平移上一帧的结果，丢弃移出画面的文本行"""
+        shifted = OCRResult(result.txts, result.polygons + np.array([0, shift], dtype=np.float32),
+                            result.scores, result.elapse, result.backend)
+        boxes = shifted.boxes
+        return shifted.select((boxes[:, 2] >= 0) & (boxes[:, 3] <= height))
+
+    def _recognize_bands(self, image: np.ndarray, bands: List[Tile], previous: OCRResult,
+                         dpi_ratio: float, screen: Optional[str]) -> OCRResult:
+        """识别变化条带，替换上一帧中落在条带内的文本行
+
+        条带和完整帧一样经过预处理、按文字大小缩放和大图分块，结果坐标还原到条带内。
+        """
+        boxes = previous.boxes
+        keep = np.ones(len(previous), dtype=bool)
+        parts = []
+        for band in bands:
+            keep &= ~((boxes[:, 3] > band.y) & (boxes[:, 2] < band.y + band.height))
+            result = self.ocr_engine.process_array(band.crop(image), self.priority, dpi_ratio, screen)
+            parts.append(OCRResult(result.txts, result.polygons + np.array([band.x, band.y], dtype=np.float32),
+                                   result.scores, result.elapse, result.backend))
+
+        combined = OCRResult.concatenate([previous.select(keep)] + parts, previous.backend,
+                                         sum(part.elapse for part in parts))
+        return combined.select(reading_order(combined.boxes))
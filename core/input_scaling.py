@@ -0,0 +1,116 @@
+import math
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+
+from core.line_finder import estimate_glyph_height
+from core.ocr_backends import DetLimit
+from core.ocr_result import OCRResult
+from core.tiling import TilingConfig
+from util.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ScalingConfig:
+    """按文字大小缩放识别输入的配置（像素均为截图的物理像素）"""
+    # 检测和识别模型最适合的文字行高度；低于下限放大，高于上限缩小，缩放后接近目标值
+    TARGET_GLYPH_HEIGHT = 24
+    MIN_GLYPH_HEIGHT = 16
+    MAX_GLYPH_HEIGHT = 56
+    MAX_UPSCALE = 3
+    MAX_DOWNSCALE = 4
+    # 放大后长边不超过该值，避免小字的大截图因放大而分块、成倍增加检测耗时
+    MAX_UPSCALED_SIDE = TilingConfig.TRIGGER_SIDE
+    # 检测输入短边的下限（PP-OCR 检测模型的最小输入）
+    DET_MIN_SIDE = 32
+    # 识别结果的置信度中位数达到该值时，记住本次测得的文字高度作为该屏幕的默认值
+    GOOD_SCORE = 0.8
+    # 每个屏幕记住的文字高度的平滑系数（新测量值的权重）
+    MEMORY_WEIGHT = 0.3
+
+
+@dataclass
+class ScalePlan:
+    """单次识别的输入缩放方案
+
+    glyph_height 为 None 表示文字大小未知：scale 也为 None，由预处理按尺寸和DPI缩放，检测使用后端默认设置。
+    """
+    screen: str
+    scale: Optional[float] = None
+    glyph_height: Optional[float] = None
+    source: str = "default"  # measured: 本次测得 / remembered: 该屏幕记住的值 / default
+
+    def det_limit(self, width: int, height: int) -> Optional[DetLimit]:
+        """缩放后文字大小已知时，检测按图像实际尺寸推理，不再二次缩放
+
+        以 min 方式、短边为限：短边不小于限制时检测不缩放图像（只对齐到32的倍数）。
+        RapidOCR 的 max 方式会忽略 limit_side_len、按长边改用 960/1500/2000，无法表达“保持原尺寸”，
+        默认的 min 736 则会把取词等小截图放大数倍。
+        """
+        if self.glyph_height is None:
+            return None
+        return DetLimit(max(min(width, height), ScalingConfig.DET_MIN_SIDE), "min")
+
+
+def scale_for_glyph(glyph_height: float, width: int, height: int) -> float:
+    """使文字高度接近目标值的整数倍缩放比例（大于1放大，小于1缩小）"""
+    if glyph_height < ScalingConfig.MIN_GLYPH_HEIGHT:
+        factor = min(math.ceil(ScalingConfig.TARGET_GLYPH_HEIGHT / glyph_height), ScalingConfig.MAX_UPSCALE)
+        while factor > 1 and max(width, height) * factor > ScalingConfig.MAX_UPSCALED_SIDE:
+            factor -= 1
+        return float(factor)
+    if glyph_height > ScalingConfig.MAX_GLYPH_HEIGHT:
+        factor = min(int(glyph_height // ScalingConfig.TARGET_GLYPH_HEIGHT), ScalingConfig.MAX_DOWNSCALE)
+        return 1.0 / factor
+    return 1.0
+
+
+def screen_key(screen: Optional[str], dpi_ratio: float) -> str:
+    """记忆缩放比例用的屏幕标识，不知道截图来自哪个屏幕时按DPI区分"""
+    return screen or f"@{dpi_ratio:g}x"
+
+
+class InputScaler:
+    """按截图的物理尺寸和估计的文字高度决定每次识别的缩放比例和检测尺寸
+
+    小号界面字体放大后再识别，取词无需逐级扩大截图区域；高分屏上的大字缩小后检测，不浪费检测耗时。
+    每个屏幕记住识别成功时的文字高度，本次无法估计（背景复杂）时使用。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._glyph_heights: Dict[str, float] = {}
+
+    def plan(self, image: np.ndarray, screen: Optional[str] = None, dpi_ratio: float = 1.0) -> ScalePlan:
+        """为BGR图像制定缩放方案"""
+        key = screen_key(screen, dpi_ratio)
+        height, width = image.shape[:2]
+        glyph_height = estimate_glyph_height(image)
+        source = "measured"
+        if glyph_height is None:
+            with self._lock:
+                glyph_height = self._glyph_heights.get(key)
+            source = "remembered"
+        if glyph_height is None:
+            return ScalePlan(key)
+
+        plan = ScalePlan(key, scale_for_glyph(glyph_height, width, height), glyph_height, source)
+        logger.debug("输入缩放: %s 文字高度 %.1fpx (%s), 缩放 x%.2f", key, glyph_height, source, plan.scale)
+        return plan
+
+    def feedback(self, plan: ScalePlan, result: OCRResult):
+        """识别成功时记住本次测得的文字高度"""
+        if plan.source != "measured" or not len(result) or np.median(result.scores) < ScalingConfig.GOOD_SCORE:
+            return
+        with self._lock:
+            previous = self._glyph_heights.get(plan.screen)
+            self._glyph_heights[plan.screen] = plan.glyph_height if previous is None else \
+                previous + (plan.glyph_height - previous) * ScalingConfig.MEMORY_WEIGHT
+
+    def stats(self) -> Dict[str, float]:
+        """各屏幕记住的文字高度（像素）"""
+        with self._lock:
+            return {key: round(glyph, 1) for key, glyph in self._glyph_heights.items()}
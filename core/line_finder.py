@@ -0,0 +1,123 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+class LineFinderConfig:
+    """单行文本快速定位配置（取词的免检测快速路径）"""
+    # 与背景亮度相差超过该值的像素视为笔画
+    INK_THRESHOLD = 48
+    # 一行中笔画像素数少于该比例（相对宽度）的行视为空白行
+    ROW_INK_RATIO = 0.01
+    # 文本行内允许的空白行数（如 "i"、"ä" 的点与主体之间）
+    MAX_ROW_GAP = 2
+    # 文本行高度范围（像素）
+    MIN_LINE_HEIGHT = 6
+    MAX_LINE_HEIGHT_RATIO = 0.8
+    # 背景像素占比低于该值时（图片、渐变、控件密集）视为复杂布局
+    MIN_BACKGROUND_RATIO = 0.6
+    # 文本行内笔画像素占比高于该值时视为非文字内容
+    MAX_LINE_INK_DENSITY = 0.5
+    # 同一行中间隔超过该值（相对行高）的文字视为不同的段
+    SEGMENT_GAP_RATIO = 1.5
+    # 裁剪时在文本行四周保留的边距（相对行高）
+    PADDING_RATIO = 0.25
+    # 跳过检测的识别结果置信度低于该值时改用完整检测
+    MIN_SCORE = 0.6
+    # 估计文字高度时，列方向最多采样的像素数和每个竖条的宽度（分栏排版的各栏分别投影）
+    GLYPH_SAMPLE_WIDTH = 1024
+    GLYPH_STRIP_WIDTH = 128
+
+
+def _runs(mask: np.ndarray, max_gap: int) -> List[Tuple[int, int]]:
+    """mask 中为真的连续区间 [start, end)，间隔不超过 max_gap 的区间合并"""
+    indices = np.flatnonzero(mask)
+    if not len(indices):
+        return []
+    breaks = np.flatnonzero(np.diff(indices) > max_gap + 1)
+    starts = np.concatenate(([indices[0]], indices[breaks + 1]))
+    ends = np.concatenate((indices[breaks], [indices[-1]])) + 1
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def _ink_mask(image: np.ndarray) -> Optional[np.ndarray]:
+    """相对背景（出现最多的亮度）的笔画掩码，背景不单一时返回 None"""
+    # 逐通道相加比 sum(axis=2) 快数倍（最内层轴只有3个元素）
+    gray = (image[:, :, 0].astype(np.int16) + image[:, :, 1] + image[:, :, 2]) // 3
+    # 界面文字背景通常是单色，取出现最多的亮度作为背景
+    background = int(np.bincount(gray[::2, ::2].ravel(), minlength=256).argmax())
+    ink = np.abs(gray - background) > LineFinderConfig.INK_THRESHOLD
+    if 1.0 - ink.mean() < LineFinderConfig.MIN_BACKGROUND_RATIO:
+        return None
+    return ink
+
+
+def estimate_glyph_height(image: np.ndarray) -> Optional[float]:
+    """用水平投影估计图像中文字行的高度（像素），无法估计时（背景复杂、没有完整的文字行）返回 None
+
+    图像按竖条分别投影，避免分栏排版中错开的行被合并；大图按列采样，耗时与图像宽度基本无关。
+
+    Args:
+        image: BGR 图像 (H, W, 3)
+    """
+    height, width = image.shape[:2]
+    step = -(-width // LineFinderConfig.GLYPH_SAMPLE_WIDTH)
+    ink = _ink_mask(image[:, ::step])
+    if ink is None:
+        return None
+
+    strip_width = min(LineFinderConfig.GLYPH_STRIP_WIDTH, ink.shape[1])
+    strips = ink.shape[1] // strip_width
+    row_ink = ink[:, :strips * strip_width].reshape(height, strips, strip_width).sum(axis=2)
+    heights = []
+    for column in row_ink.T:
+        for y0, y1 in _runs(column > strip_width * LineFinderConfig.ROW_INK_RATIO, LineFinderConfig.MAX_ROW_GAP):
+            if y0 > 0 and y1 < height and \
+                    LineFinderConfig.MIN_LINE_HEIGHT <= y1 - y0 <= height * LineFinderConfig.MAX_LINE_HEIGHT_RATIO:
+                heights.append(y1 - y0)
+    return float(np.median(heights)) if heights else None
+
+
+def find_single_line(image: np.ndarray,
+                     cursor: Optional[Tuple[int, int]] = None) -> Optional[Tuple[int, int, int, int]]:
+    """用投影判断取词区域中光标处是否是单独一行文字，是则返回该行的裁剪区域 (x0, y0, x1, y1)
+
+    只处理背景单一的常见界面文字；被区域边缘截断的行不计入。区域内有多行完整文字、
+    背景复杂或光标不在文字上时返回 None，由调用方走完整检测。
+
+    Args:
+        image: BGR 图像 (H, W, 3)
+        cursor: 光标在图像中的位置，默认为图像中心
+    """
+    height, width = image.shape[:2]
+    if height < LineFinderConfig.MIN_LINE_HEIGHT or width < LineFinderConfig.MIN_LINE_HEIGHT:
+        return None
+    cursor_x, cursor_y = cursor if cursor is not None else (width // 2, height // 2)
+
+    ink = _ink_mask(image)
+    if ink is None:
+        return None
+
+    # 水平投影：找出文字行，去掉被上下边缘截断的行
+    rows = _runs(ink.sum(axis=1) > width * LineFinderConfig.ROW_INK_RATIO, LineFinderConfig.MAX_ROW_GAP)
+    rows = [(y0, y1) for y0, y1 in rows if y0 > 0 and y1 < height]
+    if len(rows) != 1:
+        return None
+    y0, y1 = rows[0]
+    line_height = y1 - y0
+    if not LineFinderConfig.MIN_LINE_HEIGHT <= line_height <= height * LineFinderConfig.MAX_LINE_HEIGHT_RATIO:
+        return None
+    if not y0 - line_height // 2 <= cursor_y < y1 + line_height // 2:
+        return None
+
+    # 垂直投影：同一行中相距较远的多段文字（如并排的按钮）只取光标所在或最近的一段
+    band = ink[y0:y1]
+    segments = _runs(band.any(axis=0), int(line_height * LineFinderConfig.SEGMENT_GAP_RATIO))
+    x0, x1 = min(segments, key=lambda seg: 0 if seg[0] <= cursor_x < seg[1]
+                 else min(abs(seg[0] - cursor_x), abs(seg[1] - 1 - cursor_x)))
+    if band[:, x0:x1].mean() > LineFinderConfig.MAX_LINE_INK_DENSITY:
+        return None
+
+    padding = max(int(line_height * LineFinderConfig.PADDING_RATIO), 2)
+    return (max(x0 - padding, 0), max(y0 - padding, 0),
+            min(x1 + padding, width), min(y1 + padding, height))
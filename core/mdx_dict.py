@@ -0,0 +1,642 @@
+import difflib
+import hashlib
+import mmap
+import os
+import re
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from util.logger import get_logger
+from util.utils import PathConfig
+
+logger = get_logger(__name__)
+
+
+class DictConfig:
+    """离线词典配置"""
+    # 索引文件格式版本，格式变化时递增以触发重建
+    INDEX_VERSION = 1
+    # 缓存的已解压记录块数量
+    BLOCK_CACHE_SIZE = 16
+    # 模糊匹配的最低相似度和返回数量
+    FUZZY_CUTOFF = 0.75
+    MAX_SUGGESTIONS = 10
+    # 模糊匹配时参与比较的候选词数量上限
+    FUZZY_MAX_CANDIDATES = 5000
+    # @@@LINK= 跳转的最大层数
+    MAX_LINK_DEPTH = 5
+
+
+class MdxError(Exception):
+    """MDX/MDD 文件格式错误或不支持的特性"""
+    pass
+
+
+# ---------------------------------------------------------------------------
+# RIPEMD-128，仅用于解密 MDX 的关键词索引信息（Encrypted="2"）
+# ---------------------------------------------------------------------------
+
+_R = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15,
+      7, 4, 13, 1, 10, 6, 15, 3, 12, 0, 9, 5, 2, 14, 11, 8,
+      3, 10, 14, 4, 9, 15, 8, 1, 2, 7, 0, 6, 13, 11, 5, 12,
+      1, 9, 11, 10, 0, 8, 12, 4, 13, 3, 7, 15, 14, 5, 6, 2]
+_RR = [5, 14, 7, 0, 9, 2, 11, 4, 13, 6, 15, 8, 1, 10, 3, 12,
+       6, 11, 3, 7, 0, 13, 5, 10, 14, 15, 8, 12, 4, 9, 1, 2,
+       15, 5, 1, 3, 7, 14, 6, 9, 11, 8, 12, 2, 10, 0, 4, 13,
+       8, 6, 4, 1, 3, 11, 15, 0, 5, 12, 2, 13, 9, 7, 10, 14]
+_S = [11, 14, 15, 12, 5, 8, 7, 9, 11, 13, 14, 15, 6, 7, 9, 8,
+      7, 6, 8, 13, 11, 9, 7, 15, 7, 12, 15, 9, 11, 7, 13, 12,
+      11, 13, 6, 7, 14, 9, 13, 15, 14, 8, 13, 6, 5, 12, 7, 5,
+      11, 12, 14, 15, 14, 15, 9, 8, 9, 14, 5, 6, 8, 6, 5, 12]
+_SS = [8, 9, 9, 11, 13, 15, 15, 5, 7, 7, 8, 11, 14, 14, 12, 6,
+       9, 13, 15, 7, 12, 8, 9, 11, 7, 7, 12, 7, 6, 15, 13, 11,
+       9, 7, 15, 11, 8, 6, 6, 14, 12, 13, 5, 14, 13, 13, 7, 5,
+       15, 5, 8, 11, 14, 14, 6, 14, 6, 9, 12, 9, 12, 5, 15, 8]
+_K = [0x00000000, 0x5A827999, 0x6ED9EBA1, 0x8F1BBCDC]
+_KK = [0x50A28BE6, 0x5C4DD124, 0x6D703EF3, 0x00000000]
+_MASK = 0xFFFFFFFF
+
+
+def _ripemd_f(j, x, y, z):
+    if j < 16:
+        return x ^ y ^ z
+    if j < 32:
+        return (x & y) | (~x & _MASK & z)
+    if j < 48:
+        return (x | (~y & _MASK)) ^ z
+    return (x & z) | (y & ~z & _MASK)
+
+
+def _rol(value, shift):
+    return ((value << shift) | (value >> (32 - shift))) & _MASK
+
+
+def ripemd128(data: bytes) -> bytes:
+    """计算 RIPEMD-128 摘要"""
+    message = bytearray(data)
+    bit_length = len(data) * 8
+    message.append(0x80)
+    while len(message) % 64 != 56:
+        message.append(0)
+    message += struct.pack("<Q", bit_length)
+
+    h0, h1, h2, h3 = 0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476
+    for offset in range(0, len(message), 64):
+        x = struct.unpack("<16I", message[offset:offset + 64])
+        a, b, c, d = h0, h1, h2, h3
+        aa, bb, cc, dd = h0, h1, h2, h3
+        for j in range(64):
+            t = _rol((a + _ripemd_f(j, b, c, d) + x[_R[j]] + _K[j // 16]) & _MASK, _S[j])
+            a, d, c, b = d, c, b, t
+            t = _rol((aa + _ripemd_f(63 - j, bb, cc, dd) + x[_RR[j]] + _KK[j // 16]) & _MASK, _SS[j])
+            aa, dd, cc, bb = dd, cc, bb, t
+        h0, h1, h2, h3 = (h1 + c + dd) & _MASK, (h2 + d + aa) & _MASK, (h3 + a + bb) & _MASK, (h0 + b + cc) & _MASK
+    return struct.pack("<4I", h0, h1, h2, h3)
+
+
+def _fast_decrypt(data: bytes, key: bytes) -> bytes:
+    buffer = bytearray(data)
+    previous = 0x36
+    for i, value in enumerate(buffer):
+        t = ((value >> 4) | (value << 4)) & 0xFF
+        buffer[i] = t ^ previous ^ (i & 0xFF) ^ key[i % len(key)]
+        previous = value
+    return bytes(buffer)
+
+
+def _decrypt_key_info(block: bytes) -> bytes:
+    """解密关键词索引信息块"""
+    key = ripemd128(block[4:8] + struct.pack("<L", 0x3695))
+    return block[:8] + _fast_decrypt(block[8:], key)
+
+
+def _decompress(block: bytes) -> bytes:
+    """解压 MDX 数据块：4字节类型 + 4字节校验 + 数据"""
+    block_type = block[:4]
+    if block_type == b"\x00\x00\x00\x00":
+        return block[8:]
+    if block_type == b"\x02\x00\x00\x00":
+        return zlib.decompress(block[8:])
+    if block_type == b"\x01\x00\x00\x00":
+        try:
+            import lzo
+        except ImportError:
+            raise MdxError("该词典使用LZO压缩，需要安装 python-lzo")
+        return lzo.decompress(b"\xf0" + b"\x00" * 4 + block[8:], False, 0)
+    raise MdxError(f"未知的压缩类型: {block_type!r}")
+
+
+# ---------------------------------------------------------------------------
+# MDX/MDD 文件解析
+# ---------------------------------------------------------------------------
+
+class MDictFile:
+    """MDX/MDD 文件解析器，负责读取文件头、关键词和记录块表"""
+
+    def __init__(self, path, is_mdd: bool = False):
+        self.path = Path(path)
+        self.is_mdd = is_mdd
+        with open(self.path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._parse_header()
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        if self._data is not None:
+            self._data.close()
+            self._data = None
+
+    def _read_number(self, offset: int) -> int:
+        if self.number_width == 8:
+            return struct.unpack_from(">Q", self._data, offset)[0]
+        return struct.unpack_from(">I", self._data, offset)[0]
+
+    def _parse_header(self):
+        data = self._data
+        header_size = struct.unpack_from(">I", data, 0)[0]
+        header_text = data[4:4 + header_size].decode("utf-16-le", errors="ignore")
+        self.header: Dict[str, str] = dict(re.findall(r'(\w+)="((?:.|\n)*?)"', header_text))
+
+        self.version = float(self.header.get("GeneratedByEngineVersion", "2.0") or "2.0")
+        self.number_width = 8 if self.version >= 2.0 else 4
+        encrypted = self.header.get("Encrypted", "0")
+        self.encrypted = int(encrypted) if encrypted.isdigit() else int(encrypted == "Yes")
+        if self.encrypted & 1:
+            raise MdxError("不支持需要注册码的加密词典")
+
+        encoding = self.header.get("Encoding", "").upper()
+        if self.is_mdd or encoding in ("UTF-16", "UTF-16LE"):
+            self.encoding = "utf-16-le"
+        elif encoding in ("GBK", "GB2312", "GB18030"):
+            self.encoding = "gb18030"
+        elif encoding == "BIG5":
+            self.encoding = "big5"
+        else:
+            self.encoding = "utf-8"
+        self.title = self.header.get("Title", "") or self.path.stem
+
+        self._key_section_start = 4 + header_size + 4
+
+    def iter_keys(self) -> Iterator[Tuple[int, str]]:
+        """按文件顺序逐个返回 (记录偏移, 关键词)"""
+        data = self._data
+        offset = self._key_section_start
+        if self.version >= 2.0:
+            block_count, _, _, info_size, key_blocks_size = struct.unpack_from(">5Q", data, offset)
+            offset += 5 * 8 + 4
+        else:
+            block_count, _, info_size, key_blocks_size = struct.unpack_from(">4I", data, offset)
+            offset += 4 * 4
+
+        info = data[offset:offset + info_size]
+        offset += info_size
+        block_sizes = self._parse_key_block_info(info, block_count)
+        self._record_section_start = offset + key_blocks_size
+
+        for compressed_size in block_sizes:
+            yield from self._split_key_block(_decompress(data[offset:offset + compressed_size]))
+            offset += compressed_size
+
+    def _parse_key_block_info(self, info: bytes, block_count: int) -> List[int]:
+        """解析关键词块信息，返回每个关键词块的压缩大小"""
+        if self.version >= 2.0:
+            if self.encrypted & 2:
+                info = _decrypt_key_info(info)
+            info = zlib.decompress(info[8:])
+
+        utf16 = self.encoding == "utf-16-le"
+        unit = 2 if utf16 else 1
+        terminator = 1 if self.version >= 2.0 else 0
+        width = self.number_width
+        size_format, size_width = (">H", 2) if self.version >= 2.0 else (">B", 1)
+        number_format = ">Q" if width == 8 else ">I"
+
+        sizes = []
+        offset = 0
+        for _ in range(block_count):
+            offset += width  # 块内词条数
+            for _ in range(2):  # 首个和最后一个关键词
+                text_size = struct.unpack_from(size_format, info, offset)[0]
+                offset += size_width + (text_size + terminator) * unit
+            compressed_size = struct.unpack_from(number_format, info, offset)[0]
+            offset += width * 2  # 压缩大小、解压大小
+            sizes.append(compressed_size)
+        return sizes
+
+    def _split_key_block(self, block: bytes) -> Iterator[Tuple[int, str]]:
+        width = self.number_width
+        number_format = ">Q" if width == 8 else ">I"
+        utf16 = self.encoding == "utf-16-le"
+        delimiter, unit = (b"\x00\x00", 2) if utf16 else (b"\x00", 1)
+
+        offset = 0
+        while offset < len(block):
+            record_offset = struct.unpack_from(number_format, block, offset)[0]
+            start = offset + width
+            end = block.find(delimiter, start)
+            while utf16 and end != -1 and (end - start) % 2:
+                end = block.find(delimiter, end + 1)
+            if end == -1:
+                end = len(block)
+            yield record_offset, block[start:end].decode(self.encoding, errors="ignore")
+            offset = end + unit
+
+    def record_blocks(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """读取记录块表（需在开始遍历 iter_keys 之后调用）
+
+        Returns:
+            (压缩块在文件中的偏移, 压缩大小, 解压后在记录流中的偏移[含末尾])
+        """
+        data = self._data
+        width = self.number_width
+        offset = self._record_section_start
+        block_count = self._read_number(offset)
+        info_size = self._read_number(offset + width * 2)
+        offset += width * 4
+
+        sizes = np.frombuffer(data[offset:offset + info_size], dtype=">u8" if width == 8 else ">u4")
+        sizes = sizes.reshape(block_count, 2).astype(np.int64)
+        offset += info_size
+
+        compressed_offsets = offset + np.concatenate(([0], np.cumsum(sizes[:, 0])[:-1]))
+        decompressed_offsets = np.concatenate(([0], np.cumsum(sizes[:, 1])))
+        return compressed_offsets.astype(np.int64), sizes[:, 0], decompressed_offsets.astype(np.int64)
+
+
+# ---------------------------------------------------------------------------
+# 持久化的内存映射索引
+# ---------------------------------------------------------------------------
+
+_INDEX_MAGIC = b"OCRMDXI\x00"
+_INDEX_HEADER = struct.Struct("<8sIQQ16sQQQQ")
+
+
+def normalize_key(key: str) -> str:
+    """词条比较用的规范化形式"""
+    return key.strip().casefold()
+
+
+class MDictIndex:
+    """按规范化关键词排序的磁盘索引，通过 mmap 打开，无需把词条表载入内存
+
+    文件结构: 文件头 | 规范化键偏移 | 原始键偏移 | 记录起点 | 记录终点 |
+              记录块文件偏移 | 记录块压缩大小 | 记录块解压偏移 | 规范化键数据 | 原始键数据
+    """
+
+    def __init__(self, index_path):
+        self.index_path = Path(index_path)
+        with open(self.index_path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, self.source_size, self.source_mtime, encoding, self.count, block_count,
+         norm_size, key_size) = _INDEX_HEADER.unpack_from(self._data, 0)
+        if magic != _INDEX_MAGIC or version != DictConfig.INDEX_VERSION:
+            self.close()
+            raise MdxError("索引文件版本不匹配")
+        self.encoding = encoding.rstrip(b"\x00").decode("ascii")
+
+        offset = _INDEX_HEADER.size
+        arrays = []
+        for length in (self.count + 1, self.count + 1, self.count, self.count,
+                       block_count, block_count, block_count + 1):
+            arrays.append(np.frombuffer(self._data, dtype="<i8", count=length, offset=offset))
+            offset += length * 8
+        (self.norm_offsets, self.key_offsets, self.record_starts, self.record_ends,
+         self.block_offsets, self.block_sizes, self.block_decompressed) = arrays
+        self._norm_base = offset
+        self._key_base = offset + norm_size
+
+    def close(self):
+        if self._data is not None:
+            self.norm_offsets = self.key_offsets = self.record_starts = self.record_ends = None
+            self.block_offsets = self.block_sizes = self.block_decompressed = None
+            self._data.close()
+            self._data = None
+
+    @staticmethod
+    def build(mdict: MDictFile, index_path):
+        """解析词典文件并写出索引"""
+        records, keys = [], []
+        for record_offset, key in mdict.iter_keys():
+            records.append(record_offset)
+            keys.append(key)
+        block_offsets, block_sizes, block_decompressed = mdict.record_blocks()
+
+        record_starts = np.array(records, dtype=np.int64)
+        # 记录按文件顺序连续存放，终点为下一条记录的起点
+        record_ends = np.append(record_starts[1:], block_decompressed[-1]) if len(records) else record_starts
+
+        norm_keys = [normalize_key(key).encode("utf-8") for key in keys]
+        order = sorted(range(len(keys)), key=norm_keys.__getitem__)
+        norm_sorted = [norm_keys[i] for i in order]
+        key_sorted = [keys[i].encode("utf-8") for i in order]
+
+        def offsets(blobs):
+            return np.concatenate(([0], np.cumsum([len(b) for b in blobs], dtype=np.int64))).astype("<i8")
+
+        norm_blob, key_blob = b"".join(norm_sorted), b"".join(key_sorted)
+        stat = mdict.path.stat()
+        header = _INDEX_HEADER.pack(_INDEX_MAGIC, DictConfig.INDEX_VERSION, stat.st_size, stat.st_mtime_ns,
+                                    mdict.encoding.encode("ascii"), len(keys), len(block_offsets),
+                                    len(norm_blob), len(key_blob))
+
+        index_path = Path(index_path)
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = index_path.with_suffix(index_path.suffix + ".tmp")
+        with open(temp_path, "wb") as f:
+            f.write(header)
+            order_array = np.array(order, dtype=np.int64)
+            for array in (offsets(norm_sorted), offsets(key_sorted),
+                          record_starts[order_array] if len(order) else record_starts,
+                          record_ends[order_array] if len(order) else record_ends,
+                          block_offsets, block_sizes, block_decompressed):
+                f.write(np.ascontiguousarray(array, dtype="<i8").tobytes())
+            f.write(norm_blob)
+            f.write(key_blob)
+        os.replace(temp_path, index_path)
+
+    def is_fresh(self, source_path) -> bool:
+        """索引是否与词典文件对应"""
+        stat = Path(source_path).stat()
+        return stat.st_size == self.source_size and stat.st_mtime_ns == self.source_mtime
+
+    def norm_key(self, i: int) -> bytes:
+        return self._data[self._norm_base + int(self.norm_offsets[i]):self._norm_base + int(self.norm_offsets[i + 1])]
+
+    def key(self, i: int) -> str:
+        start = self._key_base + int(self.key_offsets[i])
+        return self._data[start:self._key_base + int(self.key_offsets[i + 1])].decode("utf-8")
+
+    def _bisect(self, target: bytes) -> int:
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.norm_key(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def find(self, word: str) -> range:
+        """精确匹配（规范化后），返回索引区间"""
+        target = normalize_key(word).encode("utf-8")
+        start = self._bisect(target)
+        end = start
+        while end < self.count and self.norm_key(end) == target:
+            end += 1
+        return range(start, end)
+
+    def prefix_range(self, prefix: str) -> range:
+        """以 prefix 开头的词条区间"""
+        target = normalize_key(prefix).encode("utf-8")
+        start = self._bisect(target)
+        # 前缀的上界：最后一个字节加一
+        upper = target
+        while upper and upper[-1] == 0xFF:
+            upper = upper[:-1]
+        end = self._bisect(upper[:-1] + bytes([upper[-1] + 1])) if upper else self.count
+        return range(start, end)
+
+
+# ---------------------------------------------------------------------------
+# 词典
+# ---------------------------------------------------------------------------
+
+@dataclass
+class DictEntry:
+    """一条查询结果"""
+    dictionary: str
+    headword: str
+    definition: str
+
+
+def _index_path_for(path: Path) -> Path:
+    digest = hashlib.md5(str(path.resolve()).encode("utf-8")).hexdigest()[:12]
+    return Path(PathConfig.get_dict_index_path()) / f"{path.stem}-{digest}.idx"
+
+
+class MDictionary:
+    """单个 MDX/MDD 词典，首次打开时建立索引，之后直接映射索引文件"""
+
+    def __init__(self, path, is_mdd: bool = False):
+        self.path = Path(path)
+        self.is_mdd = is_mdd
+        self.title = self.path.stem
+        self.index = self._open_index()
+        with open(self.path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._block_cache: "OrderedDict[int, bytes]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def _open_index(self) -> MDictIndex:
+        index_path = _index_path_for(self.path)
+        mdict = MDictFile(self.path, self.is_mdd)
+        self.title = mdict.title
+        try:
+            if index_path.exists():
+                try:
+                    index = MDictIndex(index_path)
+                    if index.is_fresh(self.path):
+                        return index
+                    index.close()
+                except (MdxError, struct.error, ValueError):
+                    pass
+            logger.info("正在建立词典索引: %s", self.path.name)
+            MDictIndex.build(mdict, index_path)
+        finally:
+            mdict.close()
+        return MDictIndex(index_path)
+
+    def close(self):
+        self.index.close()
+        if self._data is not None:
+            self._data.close()
+            self._data = None
+
+    def _block(self, block: int) -> bytes:
+        with self._cache_lock:
+            data = self._block_cache.get(block)
+            if data is not None:
+                self._block_cache.move_to_end(block)
+                return data
+
+        start = int(self.index.block_offsets[block])
+        data = _decompress(self._data[start:start + int(self.index.block_sizes[block])])
+        with self._cache_lock:
+            self._block_cache[block] = data
+            if len(self._block_cache) > DictConfig.BLOCK_CACHE_SIZE:
+                self._block_cache.popitem(last=False)
+        return data
+
+    def record(self, i: int) -> bytes:
+        """读取第 i 个词条（索引顺序）的原始记录"""
+        start, end = int(self.index.record_starts[i]), int(self.index.record_ends[i])
+        decompressed = self.index.block_decompressed
+        block = int(np.searchsorted(decompressed, start, side="right")) - 1
+        chunks = []
+        position = start
+        while position < end and block < len(decompressed) - 1:
+            data = self._block(block)
+            block_start = int(decompressed[block])
+            chunk = data[position - block_start:end - block_start]
+            chunks.append(chunk)
+            position = block_start + len(data)
+            block += 1
+        return b"".join(chunks)
+
+    def definition(self, i: int) -> str:
+        return self.record(i).decode(self.index.encoding, errors="ignore").rstrip("\x00")
+
+    def lookup(self, word: str) -> List[DictEntry]:
+        """精确查询，自动跟随 @@@LINK= 跳转"""
+        entries = []
+        for i in self.index.find(word):
+            definition = self.definition(i)
+            depth = 0
+            while definition.startswith("@@@LINK=") and depth < DictConfig.MAX_LINK_DEPTH:
+                target = definition[len("@@@LINK="):].strip()
+                targets = self.index.find(target)
+                if not targets:
+                    break
+                definition = self.definition(targets[0])
+                depth += 1
+            entries.append(DictEntry(self.title, self.index.key(i), definition))
+        return entries
+
+    def prefix_search(self, prefix: str, limit: int = DictConfig.MAX_SUGGESTIONS) -> List[str]:
+        """返回以 prefix 开头的词条"""
+        matches = self.index.prefix_range(prefix)
+        return [self.index.key(i) for i in matches[:limit]]
+
+    def fuzzy_search(self, word: str, limit: int = DictConfig.MAX_SUGGESTIONS) -> List[str]:
+        """模糊查询：先尝试去掉常见词尾，再在同前缀的词条中按相似度排序"""
+        normalized = normalize_key(word)
+        results = []
+        for suffix in ("s", "es", "ed", "d", "ing", "ly", "er", "est"):
+            if normalized.endswith(suffix) and len(normalized) > len(suffix) + 2:
+                stem = normalized[:-len(suffix)]
+                for i in self.index.find(stem)[:1]:
+                    results.append(self.index.key(i))
+
+        candidates = self.index.prefix_range(normalized[:2])[:DictConfig.FUZZY_MAX_CANDIDATES]
+        matcher = difflib.SequenceMatcher(b=normalized, autojunk=False)
+        scored = []
+        for i in candidates:
+            key = self.index.norm_key(i).decode("utf-8")
+            matcher.set_seq1(key)
+            if matcher.real_quick_ratio() >= DictConfig.FUZZY_CUTOFF and \
+                    matcher.quick_ratio() >= DictConfig.FUZZY_CUTOFF:
+                ratio = matcher.ratio()
+                if ratio >= DictConfig.FUZZY_CUTOFF:
+                    scored.append((-ratio, i))
+        scored.sort()
+        for _, i in scored:
+            key = self.index.key(i)
+            if key not in results:
+                results.append(key)
+        return results[:limit]
+
+    def resource(self, name: str) -> Optional[bytes]:
+        """按路径读取 MDD 资源（图片、样式等）"""
+        key = "\\" + name.replace("/", "\\").lstrip("\\")
+        matches = self.index.find(key)
+        return self.record(matches[0]) if matches else None
+
+
+class DictionaryManager:
+    """管理已加载的离线词典，加载在后台线程中进行，查询在调用线程中同步完成"""
+
+    def __init__(self):
+        self.dictionaries: List[MDictionary] = []
+        self.resources: List[MDictionary] = []
+        self._lock = threading.Lock()
+        self._paths: Tuple[str, ...] = ()
+
+    @property
+    def is_loaded(self) -> bool:
+        return bool(self.dictionaries)
+
+    def load(self, paths: List[str], on_finished=None):
+        """在后台线程中加载词典（同名的 .mdd 资源文件一并加载），词典列表未变化时不重复加载
+
+        Args:
+            paths: MDX 文件路径列表
+            on_finished: 加载完成回调 on_finished(count: int)，在后台线程中调用
+        """
+        paths = tuple(path for path in paths if path)
+        if paths == self._paths:
+            return
+        self._paths = paths
+
+        def worker():
+            dictionaries, resources = [], []
+            for path in paths:
+                try:
+                    dictionaries.append(MDictionary(path))
+                    mdd_path = Path(path).with_suffix(".mdd")
+                    if mdd_path.exists():
+                        resources.append(MDictionary(mdd_path, is_mdd=True))
+                except Exception as e:
+                    logger.error("加载词典失败 %s: %s", path, e)
+
+            with self._lock:
+                self._close_all()
+                self.dictionaries, self.resources = dictionaries, resources
+            logger.info("已加载 %d 部离线词典", len(dictionaries))
+            if on_finished:
+                on_finished(len(dictionaries))
+
+        threading.Thread(target=worker, name="dict-loader", daemon=True).start()
+
+    def lookup(self, word: str) -> List[DictEntry]:
+        """在所有词典中查询，没有精确结果时按模糊匹配的第一个候选查询"""
+        with self._lock:
+            entries = []
+            for dictionary in self.dictionaries:
+                entries.extend(dictionary.lookup(word))
+            if entries:
+                return entries
+
+            for dictionary in self.dictionaries:
+                for candidate in dictionary.fuzzy_search(word, limit=1):
+                    entries.extend(dictionary.lookup(candidate))
+            return entries
+
+    def suggestions(self, prefix: str, limit: int = DictConfig.MAX_SUGGESTIONS) -> List[str]:
+        """前缀联想"""
+        results = []
+        with self._lock:
+            for dictionary in self.dictionaries:
+                for key in dictionary.prefix_search(prefix, limit):
+                    if key not in results:
+                        results.append(key)
+        return results[:limit]
+
+    def resource(self, name: str) -> Optional[bytes]:
+        """从已加载的 MDD 中读取资源"""
+        with self._lock:
+            for dictionary in self.resources:
+                data = dictionary.resource(name)
+                if data is not None:
+                    return data
+        return None
+
+    def _close_all(self):
+        for dictionary in self.dictionaries + self.resources:
+            dictionary.close()
+        self.dictionaries, self.resources = [], []
+
+    def close(self):
+        with self._lock:
+            self._close_all()
+            self._paths = ()
@@ -0,0 +1,91 @@
+import threading
+from typing import Callable, Optional
+
+from util.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class LifecycleConfig:
+    """模型生命周期配置"""
+    # 闲置多久（秒）后释放模型，0 表示常驻不释放
+    IDLE_TIMEOUT_S = 600
+    # 检查闲置的间隔（秒）
+    CHECK_INTERVAL_S = 30
+
+
+class ModelLifecycle:
+    """模型生命周期管理：闲置时释放模型，即将使用时提前在后台重新加载
+
+    程序常驻托盘，长时间不取词时没必要让整套模型占着内存：
+    - 后台线程定期检查，英文等升级识别模型闲置超时后单独释放，整体闲置超时后只保留一个未加载的会话
+    - 按下取词修饰键或截图快捷键时调用 prewarm，在用户完成操作前把模型加载回来
+    - 模型内存变化时通过 on_memory_changed(bytes) 通知（在后台线程中调用）
+    """
+
+    def __init__(self, engine, idle_timeout: float = LifecycleConfig.IDLE_TIMEOUT_S,
+                 on_memory_changed: Optional[Callable[[int], None]] = None):
+        self.engine = engine
+        self.idle_timeout = idle_timeout
+        self.on_memory_changed = on_memory_changed
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._prewarming = threading.Lock()
+        self._memory = -1
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="ocr-model-lifecycle", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._thread = None
+
+    def set_idle_timeout(self, seconds: float):
+        self.idle_timeout = seconds
+
+    def _run(self):
+        self._report_memory()
+        while not self._stop_event.wait(LifecycleConfig.CHECK_INTERVAL_S):
+            self.check_idle()
+
+    def check_idle(self):
+        """释放闲置模型"""
+        if self.idle_timeout > 0:
+            try:
+                evicted = self.engine.evict_idle(self.idle_timeout)
+                if evicted:
+                    logger.info("已释放闲置模型: %s", ", ".join(evicted))
+            except Exception as e:
+                logger.error("释放闲置模型失败: %s", e)
+        self._report_memory()
+
+    def prewarm(self):
+        """在后台重新加载已释放的模型，已有加载在进行时忽略"""
+        if not self._prewarming.acquire(blocking=False):
+            return
+
+        def worker():
+            try:
+                if self.engine.prewarm():
+                    logger.info("已重新加载模型")
+                    self._report_memory()
+            except Exception as e:
+                logger.error("预加载模型失败: %s", e)
+            finally:
+                self._prewarming.release()
+
+        threading.Thread(target=worker, name="ocr-model-prewarm", daemon=True).start()
+
+    def memory_bytes(self) -> int:
+        return self.engine.model_memory()
+
+    def _report_memory(self):
+        memory = self.memory_bytes()
+        if memory != self._memory:
+            self._memory = memory
+            if self.on_memory_changed:
+                self.on_memory_changed(memory)
@@ -0,0 +1,50 @@
+import os
+from typing import List
+
+from util.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ModelProfile:
+    """模型精度档位：各档位的模型与FP32模型同目录，文件名加后缀区分
+
+    例如 ch_PP-OCRv4_det_infer.onnx 的INT8模型为 ch_PP-OCRv4_det_infer.int8.onnx，
+    由 demos/quantize_models.py 离线生成。
+    """
+    FP32 = "fp32"
+    INT8 = "int8"
+
+    ALL = [FP32, INT8]
+    NAMES = {FP32: "FP32（默认）", INT8: "INT8 量化"}
+    SUFFIXES = {FP32: "", INT8: ".int8"}
+
+
+def profile_model_path(path: str, profile: str) -> str:
+    """FP32模型路径对应的指定档位模型路径"""
+    suffix = ModelProfile.SUFFIXES.get(profile, "")
+    if not suffix:
+        return path
+    root, ext = os.path.splitext(path)
+    return root + suffix + ext
+
+
+def resolve_model_path(path: str, profile: str) -> str:
+    """指定档位的模型路径，该档位的模型文件不存在时退回FP32模型"""
+    candidate = profile_model_path(path, profile)
+    if candidate != path and not os.path.exists(candidate):
+        logger.warning("未找到%s模型 %s，使用FP32模型", profile, os.path.basename(candidate))
+        return path
+    return candidate
+
+
+def is_profile_model(path: str) -> bool:
+    """是否为量化等非FP32档位生成的模型文件"""
+    root = os.path.splitext(path)[0]
+    return any(suffix and root.endswith(suffix) for suffix in ModelProfile.SUFFIXES.values())
+
+
+def available_profiles(paths: List[str]) -> List[str]:
+    """给定的FP32模型全部具备对应文件的档位"""
+    return [profile for profile in ModelProfile.ALL
+            if all(os.path.exists(profile_model_path(path, profile)) for path in paths)]
@@ -0,0 +1,493 @@
+import re
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, List, Type, Any, Optional
+
+from core.model_profiles import ModelProfile, resolve_model_path
+from core.ocr_result import OCRResult
+from core.session_registry import SessionRegistry, share_rapidocr_stages
+from util.utils import PathConfig
+
+
+@dataclass
+class BackendCapabilities:
+    """后端能力描述"""
+    name: str
+    display_name: str
+    languages: List[str] = field(default_factory=list)
+    supports_batch: bool = False
+    supports_gpu: bool = False
+    requires_models: bool = True
+
+
+@dataclass(frozen=True)
+class DetLimit:
+    """单次请求的检测输入尺寸限制（与 PP-OCR 的 limit_side_len/limit_type 含义相同）
+
+    limit_type 为 min 时短边不足 side_len 会放大；为 max 时长边超过 side_len 才缩小，
+    但 RapidOCR 的 max 方式忽略 side_len（按长边改用 960/1500/2000）。
+    """
+    side_len: int
+    limit_type: str = "min"
+
+
+class OCRBackend(ABC):
+    """OCR后端抽象基类
+
+    生命周期: load -> warmup -> infer/infer_batch -> unload
+    """
+    name = ""
+
+    def __init__(self, **options):
+        self.options = options
+        self._loaded = False
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    @abstractmethod
+    def load(self):
+        """加载模型"""
+        pass
+
+    def unload(self):
+        """释放模型"""
+        self._loaded = False
+
+    def warmup(self):
+        """预热推理，避免首次调用的初始化开销落在用户请求上"""
+        pass
+
+    @abstractmethod
+    def infer(self, image, use_cls: Optional[bool] = None, det_limit: Optional[DetLimit] = None) -> OCRResult:
+        """识别单张图像（文件路径或BGR格式的numpy数组）
+
+        Args:
+            use_cls: 是否运行文本方向分类，None 表示按后端默认
+            det_limit: 本次检测的输入尺寸限制，None 表示按后端默认；不支持的后端忽略
+        """
+        pass
+
+    def infer_batch(self, images, use_cls: Optional[bool] = None,
+                    det_limit: Optional[DetLimit] = None) -> List[OCRResult]:
+        """批量识别，默认逐张处理"""
+        return [self.infer(image, use_cls, det_limit) for image in images]
+
+    def recognize_line(self, image) -> OCRResult:
+        """识别已裁剪好的单行文字图像，文本框为整张图像
+
+        支持的后端跳过文本检测直接识别；默认仍走完整流程。
+        """
+        return self.infer(image, use_cls=False)
+
+    @abstractmethod
+    def capabilities(self) -> BackendCapabilities:
+        """返回后端能力描述"""
+        pass
+
+    def ensure_loaded(self):
+        """确保模型已加载"""
+        if not self._loaded:
+            self.load()
+
+    def needs_reload(self) -> bool:
+        """是否有模型已被释放，需要在使用前重新加载"""
+        return not self._loaded
+
+    def release_idle_models(self, idle_seconds: float) -> List[str]:
+        """释放超过 idle_seconds 未使用的部分模型（如升级识别用的模型），返回释放的模型名称
+
+        默认不支持部分释放，整个会话由会话池统一释放。
+        """
+        return []
+
+    def resident_model_bytes(self) -> int:
+        """已加载模型的估算内存占用（字节），无法估算时返回0"""
+        return 0
+
+    def stage_stats(self) -> Dict[str, Dict[str, float]]:
+        """各推理阶段的统计（调用次数、耗时等），不支持时返回空字典"""
+        return {}
+
+
+class ClsMode:
+    """文本方向分类阶段的启用方式"""
+    OFF = "off"  # 不运行，也不常驻模型
+    AUTO = "auto"  # 由调用方按任务类别决定
+    ON = "on"  # 始终运行
+
+    ALL = [AUTO, OFF, ON]
+    NAMES = {AUTO: "按任务自动", OFF: "关闭", ON: "始终启用"}
+
+
+class ClsStageProbe:
+    """包装方向分类阶段，统计耗时以及实际翻转了多少文本框，用于判断该阶段是否值得运行"""
+    # 与 RapidOCR 默认的 cls_thresh 一致，超过该置信度的 180 度结果才会翻转文本框
+    ROTATE_THRESHOLD = 0.9
+
+    def __init__(self, stage, stats: Dict[str, float]):
+        self.stage = stage
+        self.stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self.stage, name)
+
+    def __call__(self, *args, **kwargs):
+        start_time = time.perf_counter()
+        output = self.stage(*args, **kwargs)
+        self.stats["calls"] += 1
+        self.stats["seconds"] += time.perf_counter() - start_time
+
+        cls_res = getattr(output, "cls_res", None)
+        if cls_res is None and isinstance(output, tuple) and len(output) > 1:
+            cls_res = output[1]
+        for label, score in cls_res or []:
+            self.stats["crops"] += 1
+            if "180" in str(label) and score >= self.ROTATE_THRESHOLD:
+                self.stats["rotated"] += 1
+        return output
+
+
+# 后端注册表
+_BACKEND_REGISTRY: Dict[str, Type[OCRBackend]] = {}
+
+
+def register_backend(name: str):
+    """后端注册装饰器"""
+
+    def decorator(backend_cls: Type[OCRBackend]):
+        backend_cls.name = name
+        _BACKEND_REGISTRY[name] = backend_cls
+        return backend_cls
+
+    return decorator
+
+
+def available_backends() -> List[str]:
+    """获取所有已注册的后端名称"""
+    return list(_BACKEND_REGISTRY.keys())
+
+
+def create_backend(name: str, **options) -> OCRBackend:
+    """根据名称创建后端实例"""
+    if name not in _BACKEND_REGISTRY:
+        raise ValueError(f"未知的OCR后端: {name}，可用后端: {available_backends()}")
+    return _BACKEND_REGISTRY[name](**options)
+
+
+@register_backend("rapidocr")
+class RapidOCRBackend(OCRBackend):
+    """基于RapidOCR(ONNXRuntime)的后端，支持中英文自适应识别
+
+    options:
+        lang: auto（中文结果全为英文时改用英文模型）/ ch
+        profile: 模型精度档位（ModelProfile），默认FP32
+        cls: 方向分类阶段（ClsMode），默认 auto 由每次调用的 use_cls 决定；off 时不保留分类模型
+    """
+
+    NON_ENGLISH_PATTERN = re.compile(r'[^a-zA-Z0-9\s.,!?;:\'\"()\[\]{}<>+=\-_*&^%$#@~`|/\\]')
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.default_ocr = None
+        # 英文模型只在中文结果全为英文时升级使用，首次需要时才加载，长时间不用可单独释放
+        self.en_ocr = None
+        self._en_last_used = 0.0
+        # 各产线共享同一模型的推理会话（如中英文产线共用的方向分类模型）
+        self.sessions = SessionRegistry()
+        self._pipeline_keys: Dict[str, List[tuple]] = {}
+        self._cls_stats = {"calls": 0, "seconds": 0.0, "crops": 0, "rotated": 0}
+
+    @property
+    def profile(self) -> str:
+        return self.options.get("profile") or ModelProfile.FP32
+
+    def _model_path(self, model_name: str, lang_type: str = "ch") -> str:
+        """当前精度档位的模型路径"""
+        return resolve_model_path(PathConfig.get_model_path(model_name, lang_type=lang_type), self.profile)
+
+    def _default_params(self) -> Dict[str, Any]:
+        from rapidocr import OCRVersion
+
+        return {
+            "Cls.model_path": self._model_path("ch_ppocr_mobile_v2.0_cls_infer.onnx"),
+            "Det.ocr_version": OCRVersion.PPOCRV4,
+            # "Det.model_type": ModelType.SERVER,
+            "Det.model_path": self._model_path("ch_PP-OCRv4_det_infer.onnx"),
+            "Rec.ocr_version": OCRVersion.PPOCRV4,
+            # "Rec.model_type": ModelType.SERVER,
+            "Rec.model_path": self._model_path("ch_PP-OCRv4_rec_infer.onnx"),
+            "Global.font_path": PathConfig.models_dir / "FZYTK.TTF"
+        }
+
+    def _en_params(self) -> Dict[str, Any]:
+        from rapidocr import LangDet, LangRec
+
+        return {
+            "Det.lang_type": LangDet.EN,
+            "Rec.lang_type": LangRec.EN,
+            "Det.model_path": self._model_path("en_PP-OCRv3_det_infer.onnx", lang_type="en"),
+            "Rec.model_path": self._model_path("en_PP-OCRv4_rec_infer.onnx", lang_type="en"),
+            "Cls.model_path": self._model_path("ch_ppocr_mobile_v2.0_cls_infer.onnx"),
+            "Global.font_path": PathConfig.models_dir / "FZYTK.TTF"
+        }
+
+    def _build_pipeline(self, name: str, params: Dict[str, Any]):
+        """创建一套 RapidOCR 产线，其中与已加载产线相同的模型改用共享会话"""
+        from rapidocr import RapidOCR
+
+        pipeline = RapidOCR(params=params)
+        self._release_pipeline(name)
+        keys = share_rapidocr_stages(self.sessions, pipeline, params)
+        if self.cls_mode == ClsMode.OFF:
+            # RapidOCR 总会创建分类阶段，不需要时立即释放，不常驻内存
+            cls_keys = [key for key in keys if key[0] == "Cls"]
+            self.sessions.release_all(cls_keys)
+            keys = [key for key in keys if key not in cls_keys]
+            pipeline.text_cls = None
+        elif getattr(pipeline, "text_cls", None) is not None:
+            pipeline.text_cls = ClsStageProbe(pipeline.text_cls, self._cls_stats)
+        self._pipeline_keys[name] = keys
+        return pipeline
+
+    @property
+    def cls_mode(self) -> str:
+        return self.options.get("cls") or ClsMode.AUTO
+
+    def _run(self, pipeline, image, use_cls: Optional[bool], det_limit: Optional[DetLimit] = None):
+        if self.cls_mode != ClsMode.AUTO:
+            use_cls = self.cls_mode == ClsMode.ON
+        options = {} if use_cls is None else {"use_cls": use_cls}
+        detector = getattr(pipeline, "text_det", None)
+        if det_limit is None or not hasattr(detector, "limit_type"):
+            return pipeline(image, **options)
+
+        # RapidOCR 不支持按次传入检测尺寸，临时修改检测阶段的设置；
+        # 会话池保证同一后端同时只处理一个请求，共享的检测阶段不会被并发修改
+        saved = detector.limit_side_len, detector.limit_type
+        detector.limit_side_len, detector.limit_type = det_limit.side_len, det_limit.limit_type
+        try:
+            return pipeline(image, **options)
+        finally:
+            detector.limit_side_len, detector.limit_type = saved
+
+    def stage_stats(self) -> Dict[str, Dict[str, float]]:
+        return {"cls": dict(self._cls_stats)}
+
+    def _release_pipeline(self, name: str):
+        self.sessions.release_all(self._pipeline_keys.pop(name, []))
+
+    def load(self):
+        self.default_ocr = self._build_pipeline("default", self._default_params())
+        self._loaded = True
+
+    def _get_en_ocr(self):
+        """获取英文识别模型（延迟加载）"""
+        if self.en_ocr is None:
+            self.en_ocr = self._build_pipeline("en", self._en_params())
+        self._en_last_used = time.monotonic()
+        return self.en_ocr
+
+    def unload(self):
+        self.default_ocr = None
+        self.en_ocr = None
+        self._pipeline_keys.clear()
+        self.sessions.clear()
+        super().unload()
+
+    def warmup(self):
+        import numpy as np
+        self.ensure_loaded()
+        blank = np.full((48, 160, 3), 255, dtype=np.uint8)
+        self.default_ocr(blank)
+        if self.options.get("lang", "auto") == "auto":
+            self._get_en_ocr()(blank)
+
+    def needs_reload(self) -> bool:
+        return not self._loaded or (self.options.get("lang", "auto") == "auto" and self.en_ocr is None)
+
+    def release_idle_models(self, idle_seconds: float) -> List[str]:
+        if self.en_ocr is not None and time.monotonic() - self._en_last_used >= idle_seconds:
+            # 与默认产线共享的会话仍被引用，不会释放
+            self.en_ocr = None
+            self._release_pipeline("en")
+            return ["en_ocr"]
+        return []
+
+    def resident_model_bytes(self) -> int:
+        return self.sessions.resident_bytes()
+
+    def is_english_only(self, txts) -> bool:
+        """判断文本是否只包含英文字符（含数字和标点）"""
+        if not txts:
+            return False
+        return not bool(self.NON_ENGLISH_PATTERN.search(''.join(txts)))
+
+    def infer(self, image, use_cls: Optional[bool] = None, det_limit: Optional[DetLimit] = None) -> OCRResult:
+        self.ensure_loaded()
+        start_time = time.perf_counter()
+
+        result = self._to_result(self._run(self.default_ocr, image, use_cls, det_limit))
+        if self.options.get("lang", "auto") == "auto" and self.is_english_only(result.txts):
+            result = self._to_result(self._run(self._get_en_ocr(), image, use_cls, det_limit))
+
+        result.elapse = time.perf_counter() - start_time
+        return result
+
+    def recognize_line(self, image) -> OCRResult:
+        """跳过检测和方向分类，只运行识别模型"""
+        self.ensure_loaded()
+        start_time = time.perf_counter()
+
+        result = self._line_result(self.default_ocr(image, use_det=False, use_cls=False, use_rec=True), image)
+        if self.options.get("lang", "auto") == "auto" and self.is_english_only(result.txts):
+            result = self._line_result(self._get_en_ocr()(image, use_det=False, use_cls=False, use_rec=True), image)
+
+        result.elapse = time.perf_counter() - start_time
+        return result
+
+    def _line_result(self, output, image) -> OCRResult:
+        """不经检测的识别输出没有文本框，以整张图像作为文本框"""
+        txts = [text for text in (getattr(output, "txts", None) or []) if text]
+        if not txts:
+            return OCRResult.empty(backend=self.name)
+        height, width = image.shape[:2]
+        box = [[0, 0], [width, 0], [width, height], [0, height]]
+        return OCRResult(
+            txts=txts[:1],
+            polygons=[box],
+            scores=list(getattr(output, "scores", None) or [1.0])[:1],
+            backend=self.name
+        )
+
+    def _to_result(self, output) -> OCRResult:
+        """将RapidOCR输出转换为统一结果"""
+        if not output or output.txts is None:
+            return OCRResult.empty(backend=self.name)
+        return OCRResult(
+            txts=output.txts,
+            polygons=output.boxes,
+            scores=output.scores,
+            backend=self.name
+        )
+
+    def capabilities(self) -> BackendCapabilities:
+        return BackendCapabilities(
+            name=self.name,
+            display_name="RapidOCR (ONNX)",
+            languages=["ch", "en"],
+            supports_batch=False,
+            supports_gpu=False,
+        )
+
+
+@register_backend("paddlex")
+class PaddleXBackend(OCRBackend):
+    """基于PaddleX OCR产线的后端，产线配置默认使用 demos/OCR.yaml"""
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.pipeline = None
+
+    def load(self):
+        from paddlex import create_pipeline
+
+        config_path = self.options.get(
+            "pipeline_config", str(PathConfig.project_root / "demos" / "OCR.yaml")
+        )
+        self.pipeline = create_pipeline(pipeline=config_path, device=self.options.get("device", "cpu"))
+        self._loaded = True
+
+    def unload(self):
+        self.pipeline = None
+        super().unload()
+
+    def warmup(self):
+        import numpy as np
+        self.ensure_loaded()
+        self.infer(np.full((48, 160, 3), 255, dtype=np.uint8))
+
+    def infer(self, image, use_cls: Optional[bool] = None, det_limit: Optional[DetLimit] = None) -> OCRResult:
+        return self.infer_batch([image], use_cls, det_limit)[0]
+
+    def infer_batch(self, images, use_cls: Optional[bool] = None,
+                    det_limit: Optional[DetLimit] = None) -> List[OCRResult]:
+        self.ensure_loaded()
+        start_time = time.perf_counter()
+        options = {} if use_cls is None else {"use_textline_orientation": use_cls}
+        if det_limit is not None:
+            options.update(text_det_limit_side_len=det_limit.side_len, text_det_limit_type=det_limit.limit_type)
+        outputs = [self._to_result(output) for output in self.pipeline.predict(input=list(images), **options)]
+
+        elapse = (time.perf_counter() - start_time) / max(len(outputs), 1)
+        for result in outputs:
+            result.elapse = elapse
+        return outputs
+
+    def _to_result(self, output) -> OCRResult:
+        """将PaddleX产线输出转换为统一结果"""
+        res = output.json.get('res', {})
+        txts = res.get('rec_texts') or []
+        if not txts:
+            return OCRResult.empty(backend=self.name)
+        return OCRResult(
+            txts=txts,
+            polygons=res.get('rec_polys'),
+            scores=res.get('rec_scores'),
+            backend=self.name
+        )
+
+    def capabilities(self) -> BackendCapabilities:
+        return BackendCapabilities(
+            name=self.name,
+            display_name="PaddleX OCR Pipeline",
+            languages=["ch", "en"],
+            supports_batch=True,
+            supports_gpu=True,
+        )
+
+
+@register_backend("stub")
+class StubBackend(OCRBackend):
+    """测试用的桩后端，不加载模型，返回固定文本
+
+    options:
+        text: 返回的文本，默认 "stub"
+        score: 返回的置信度，默认 1.0
+    """
+
+    def load(self):
+        self._loaded = True
+
+    def infer(self, image, use_cls: Optional[bool] = None, det_limit: Optional[DetLimit] = None) -> OCRResult:
+        self.ensure_loaded()
+        start_time = time.perf_counter()
+        width, height = self._image_size(image)
+        text = self.options.get("text", "stub")
+        if not text:
+            return OCRResult.empty(backend=self.name)
+
+        return OCRResult(
+            txts=(text,),
+            polygons=[[[0, 0], [width, 0], [width, height], [0, height]]],
+            scores=[float(self.options.get("score", 1.0))],
+            elapse=time.perf_counter() - start_time,
+            backend=self.name
+        )
+
+    @staticmethod
+    def _image_size(image):
+        shape: Optional[Any] = getattr(image, "shape", None)
+        if shape is not None:
+            return shape[1], shape[0]
+        return 0, 0
+
+    def capabilities(self) -> BackendCapabilities:
+        return BackendCapabilities(
+            name=self.name,
+            display_name="Stub (测试用)",
+            supports_batch=True,
+            requires_models=False,
+        )
@@ -1,98 +1,375 @@
-import re
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional, Tuple
+import numpy as np
 from PySide6.QtGui import QImage
-from util.utils import PathConfig, qimage_to_numpy
-from rapidocr import EngineType, OCRVersion, RapidOCR, ModelType, LangDet, LangRec
+from util.utils import PathConfig, qimage_to_bgr
+from core.line_finder import LineFinderConfig, find_single_line
+from core.engine_pool import EnginePool, PoolClosedError, PoolConfig, Priority
+from core.input_scaling import InputScaler, ScalePlan, screen_key
+from core.ocr_backends import ClsMode, DetLimit, available_backends
+from core.ocr_result import OCRResult
+from core.preprocess import PreparedImage, Preprocessor, PreprocessProfile
+from core.scheduler import OCRScheduler
+from core.tiling import TilingConfig, plan_tiles, merge_tile_results, should_tile
+from util.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ClsConfig:
+    """文本方向分类阶段按任务类别启用（后端 cls 选项为 auto 时生效）
+
+    屏幕文字几乎都是正的，方向分类对每个文本框多一次推理却很少改变结果；
+    各类任务的实际耗时和翻转次数见 stats()["stages"]["cls"]，据此调整默认值。
+    """
+    POLICY = {
+        Priority.HOVER: ClsMode.OFF,
+        Priority.CAPTURE: ClsMode.AUTO,
+        Priority.WATCH: ClsMode.OFF,
+        Priority.BATCH: ClsMode.ON,
+    }
+    # auto: 图像高宽比超过该值时（竖排或旋转的文字）才启用
+    VERTICAL_RATIO = 1.5
+
 
 class OCREngine:
-    """OCR引擎封装类，支持中英文自适应识别"""
+    """OCR引擎封装类，通过可插拔后端完成识别，支持运行时热切换后端
+
+    后端会话由 EnginePool 管理，每次识别独占一个会话，多个线程（截图、取词、监视、服务）可以并发调用。
+    """
     _instance = None
+    _instance_lock = threading.Lock()
+    DEFAULT_BACKEND = "rapidocr"
+    # 调试用：将每次识别的输入图像保存到 ocr_result 目录
+    SAVE_INPUT_IMAGE = False
 
     @classmethod
-    def get_instance(cls):
-        """单例模式获取OCR引擎实例"""
+    def get_instance(cls, backend_name=None, pool_size=None, **backend_options):
+        """单例模式获取OCR引擎实例（线程安全）
+
+        Args:
+            backend_name: 首次创建时使用的后端名称，之后的调用忽略该参数
+            pool_size: 首次创建时的会话池大小，0 表示自动
+            backend_options: 首次创建时的后端选项（如模型精度档位 profile）
+        """
         if cls._instance is None:
-            cls._instance = OCREngine()
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = OCREngine(backend_name or cls.DEFAULT_BACKEND,
+                                              pool_size if pool_size is not None else PoolConfig.SIZE,
+                                              **backend_options)
         return cls._instance
 
-    def __init__(self):
-        self.default_ocr = RapidOCR(params={
-            "Cls.model_path": PathConfig.get_model_path("ch_ppocr_mobile_v2.0_cls_infer.onnx"),
-            "Det.ocr_version": OCRVersion.PPOCRV4,
-            # "Det.model_type": ModelType.SERVER,
-            "Det.model_path": PathConfig.get_model_path("ch_PP-OCRv4_det_infer.onnx"),
-            "Rec.ocr_version": OCRVersion.PPOCRV4,
-            # "Rec.model_type": ModelType.SERVER,
-            "Rec.model_path": PathConfig.get_model_path("ch_PP-OCRv4_rec_infer.onnx"),
-            "Global.font_path": PathConfig.models_dir / "FZYTK.TTF"
-        })
-        self.en_ocr = RapidOCR(params={
-            "Det.lang_type": LangDet.EN,
-            "Rec.lang_type": LangRec.EN,
-            "Det.model_path": PathConfig.get_model_path("en_PP-OCRv3_det_infer.onnx", lang_type="en"),
-            "Rec.model_path": PathConfig.get_model_path("en_PP-OCRv4_rec_infer.onnx", lang_type="en"),
-            "Cls.model_path": PathConfig.get_model_path("ch_ppocr_mobile_v2.0_cls_infer.onnx"),
-            "Global.font_path": PathConfig.models_dir / "FZYTK.TTF"
-        })
-
-    def is_english_only(self, text_list):
-        """判断文本是否只包含英文字符
+    def __init__(self, backend_name=DEFAULT_BACKEND, pool_size=PoolConfig.SIZE, **backend_options):
+        self._backend_lock = threading.Lock()
+        self.pool_size = pool_size
+        self.pool = EnginePool(backend_name, pool_size, **backend_options)
+        self.pool.load()
+        self.scheduler = OCRScheduler(lambda: self.pool.size)
+        self.preprocessor = Preprocessor()
+        self.scaler = InputScaler()
+        self._tile_executor = None
+
+    @property
+    def backend_name(self) -> str:
+        return self.pool.name
+
+    @property
+    def backend_options(self) -> dict:
+        return self.pool.backend_options
+
+    def stats(self) -> dict:
+        """会话池状态、排队等待时间、各类任务的调度情况和各屏幕记住的文字高度"""
+        state = self._current_pool().stats()
+        state["scheduler"] = self.scheduler.stats()
+        state["scaling"] = self.scaler.stats()
+        return state
+
+    def set_preprocess_profile(self, profile: str = PreprocessProfile.SCREEN):
+        """切换识别前的图像预处理档位（PreprocessProfile）"""
+        if profile != self.preprocessor.profile:
+            self.preprocessor = Preprocessor(profile)
+
+    def _current_pool(self) -> EnginePool:
+        with self._backend_lock:
+            return self.pool
+
+    def evict_idle(self, idle_seconds: float):
+        """释放超过 idle_seconds 未使用的模型，返回释放内容的说明"""
+        return self._current_pool().evict_idle(idle_seconds)
+
+    def prewarm(self) -> bool:
+        """重新加载已释放的模型，返回是否进行了加载"""
+        return self._current_pool().prewarm()
+
+    def model_memory(self) -> int:
+        """已加载模型的估算内存（字节）"""
+        return self._current_pool().model_memory()
+
+    @staticmethod
+    def available_backends():
+        """获取可用的后端列表"""
+        return available_backends()
+
+    def switch_backend(self, backend_name, on_finished=None, **backend_options):
+        """热切换后端
+
+        新后端在后台线程中加载并预热，完成后再替换当前后端，切换期间旧后端继续提供服务。
+
+        Args:
+            backend_name: 新后端名称
+            on_finished: 切换完成回调 on_finished(success: bool, message: str)，在后台线程中调用
+        """
+        if backend_name == self.backend_name and not backend_options:
+            if on_finished:
+                on_finished(True, backend_name)
+            return
+
+        def worker():
+            try:
+                new_pool = EnginePool(backend_name, self.pool_size, **backend_options)
+                new_pool.load()
+                new_pool.warmup()
+            except Exception as e:
+                logger.error("切换OCR后端失败: %s", e)
+                if on_finished:
+                    on_finished(False, str(e))
+                return
+
+            with self._backend_lock:
+                old_pool, self.pool = self.pool, new_pool
+            # 正在使用的旧会话在归还时释放
+            old_pool.close()
+            logger.info("OCR后端已切换: %s -> %s", old_pool.name, new_pool.name)
+            if on_finished:
+                on_finished(True, backend_name)
+
+        threading.Thread(target=worker, name="ocr-backend-switch", daemon=True).start()
+
+    @staticmethod
+    def use_cls_for(image, priority: int) -> bool:
+        """按任务类别（及图像形状）决定是否运行方向分类"""
+        mode = ClsConfig.POLICY.get(priority, ClsMode.AUTO)
+        if mode != ClsMode.AUTO:
+            return mode == ClsMode.ON
+        shape = getattr(image, "shape", None)
+        return shape is not None and shape[0] > shape[1] * ClsConfig.VERTICAL_RATIO
+
+    def recognize(self, image, priority: int = Priority.INTERACTIVE,
+                  det_limit: Optional[DetLimit] = None) -> OCRResult:
+        """使用当前后端识别图像，返回统一结果
+
+        Args:
+            priority: 任务类别（Priority），决定并发名额、会话繁忙时的排队顺序和是否运行方向分类
+            det_limit: 本次检测的输入尺寸限制，None 表示按后端默认
+        """
+        use_cls = self.use_cls_for(image, priority)
+        return self._run_on_backend(priority, lambda backend: backend.infer(image, use_cls, det_limit))
+
+    def recognize_line(self, image, priority: int = Priority.HOVER) -> OCRResult:
+        """识别已裁剪的单行文字图像（跳过文本检测），文本框为整张图像"""
+        return self._run_on_backend(priority, lambda backend: backend.recognize_line(image))
+
+    def _run_on_backend(self, priority: int, task):
+        """按任务类别取得执行名额和会话后执行 task(backend)"""
+        with self.scheduler.slot(priority):
+            while True:
+                with self._backend_lock:
+                    pool = self.pool
+                try:
+                    with pool.checkout(priority) as backend:
+                        return task(backend)
+                except PoolClosedError:
+                    # 排队期间后端被切换，改用新的会话池
+                    continue
+
+    def iter_recognize_batch(self, images, priority: int = Priority.BATCH) -> Iterator[OCRResult]:
+        """批量识别BGR图像，逐张产出结果；每张之间都可被交互任务抢占"""
+        for image in images:
+            yield self.process_array(image, priority)
+
+    def _get_tile_executor(self) -> ThreadPoolExecutor:
+        """获取分块识别线程池（延迟创建）"""
+        if self._tile_executor is None:
+            workers = TilingConfig.MAX_WORKERS or os.cpu_count() or 1
+            self._tile_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr-tile")
+        return self._tile_executor
+
+    def iter_recognize_tiled(self, image: np.ndarray, priority: int = Priority.INTERACTIVE,
+                             plan: Optional[ScalePlan] = None) -> Iterator[OCRResult]:
+        """分块并行识别大图，按阅读顺序逐批产出已确定的文本行
+
+        所有分块一次性提交到线程池并行识别，按分块行（从上到下）依次等待；
+        每完成一行分块就合并已有结果，把不会再受后续分块影响的文本行（完全位于下一行分块上方）先产出。
 
         Args:
-            text_list: 识别出的文本列表
+            image: BGR格式的numpy数组
+            plan: 输入缩放方案，文字大小已知时各分块按自身尺寸检测
+        """
+        height, width = image.shape[:2]
+        tiles = plan_tiles(width, height)
+        backend_name = self.backend_name
+
+        # 每个分块各自从会话池取会话，实际并行度受会话池大小限制
+        executor = self._get_tile_executor()
+        futures = [executor.submit(self.recognize, tile.crop(image), priority,
+                                   plan.det_limit(tile.width, tile.height) if plan else None)
+                   for tile in tiles]
+        band_starts = sorted({tile.y for tile in tiles})
+
+        done = []
+        emitted_bottom = -np.inf
+        for band_index, band_y in enumerate(band_starts):
+            for tile, future in zip(tiles, futures):
+                if tile.y == band_y:
+                    done.append((tile, future.result()))
+
+            merged = merge_tile_results(done, width, height, backend_name)
+            # 下一行分块的起点以上的文本行已经确定
+            boundary = band_starts[band_index + 1] if band_index + 1 < len(band_starts) else np.inf
+            bottoms = merged.boxes[:, 3]
+            ready = merged.select((bottoms > emitted_bottom) & (bottoms <= boundary))
+            emitted_bottom = boundary
+            if ready:
+                yield ready
+
+    def recognize_tiled(self, image: np.ndarray, priority: int = Priority.INTERACTIVE,
+                        plan: Optional[ScalePlan] = None) -> OCRResult:
+        """将大图切分为带重叠的分块并行识别，再合并接缝处的重复结果
 
-        Returns:
-            bool: 是否全为英文字符（含数字和标点）
+        Args:
+            image: BGR格式的numpy数组
+            plan: 输入缩放方案，文字大小已知时各分块按自身尺寸检测
+        """
+        start_time = time.perf_counter()
+        height, width = image.shape[:2]
+        merged = OCRResult.concatenate(list(self.iter_recognize_tiled(image, priority, plan)), self.backend_name,
+                                       time.perf_counter() - start_time)
+        logger.debug("分块识别: %dx%d, 识别 %d 行, 耗时 %.1fms",
+                     width, height, len(merged), merged.elapse * 1000)
+        return merged
+
+    def iter_process_image(self, image: QImage, priority: int = Priority.INTERACTIVE,
+                           screen: Optional[str] = None) -> Iterator[OCRResult]:
+        """流式处理QImage图像，按阅读顺序逐批产出识别结果
+
+        大尺寸截图按分块行逐批产出，首批文本无需等待整幅图像识别完成；小图一次性产出全部结果。
+
+        Args:
+            screen: 截图所在屏幕的名称，用于记住该屏幕的文字大小
         """
-        if not text_list:
-            return False
+        if image.isNull():
+            return
+        if self.SAVE_INPUT_IMAGE:
+            self._save_input_image(image)
+
+        prepared, plan = self._prepare(qimage_to_bgr(image), image.devicePixelRatio(), screen)
+        height, width = prepared.image.shape[:2]
+        if should_tile(width, height):
+            partials = []
+            for partial in self.iter_recognize_tiled(prepared.image, priority, plan):
+                partials.append(partial)
+                yield prepared.restore(partial)
+            self.scaler.feedback(plan, OCRResult.concatenate(partials))
+            return
 
-        # 将所有文本连接起来
-        combined_text = ''.join([text for text, _, _ in text_list])
+        result = self._process_prepared(prepared, priority, plan)
+        if result:
+            yield result
 
-        # 去除数字、标点和空格后检查是否只包含英文字母
-        # 使用正则表达式匹配非英文字符（包括中文和其他非ASCII字符）
-        non_english_pattern = re.compile(r'[^a-zA-Z0-9\s.,!?;:\'\"()\[\]{}<>+=\-_*&^%$#@~`|/\\]')
+    def process_image(self, image: QImage, priority: int = Priority.INTERACTIVE,
+                      screen: Optional[str] = None) -> OCRResult:
+        """处理QImage图像并返回OCR结果
 
-        # 如果没有匹配到非英文字符，则表示文本只包含英文
-        return not bool(non_english_pattern.search(combined_text))
+        返回的 OCRResult 可按行迭代，每行可解包为 (text, [min_x, max_x, min_y, max_y], score)
 
-    def process_image(self, image: QImage):
-        """处理QImage图像并返回OCR结果，自动选择最佳语言模型"""
+        Args:
+            screen: 截图所在屏幕的名称，用于记住该屏幕的文字大小
+        """
         if image.isNull():
-            return []
+            return OCRResult.empty(backend=self.backend_name)
 
-        import os
-        ocr_dir = PathConfig.get_ocr_result_path()
-        os.makedirs(ocr_dir, exist_ok=True)
-        screenshot_path = os.path.join(ocr_dir, "ocr.png")
-        image.save(screenshot_path)
+        # 截图保持原始32位格式，以BGR视图直接交给后端，颜色转换只在后端预处理中做一次
+        if self.SAVE_INPUT_IMAGE:
+            self._save_input_image(image)
+        return self.process_array(qimage_to_bgr(image), priority, image.devicePixelRatio(), screen)
+
+    def process_array(self, image: np.ndarray, priority: int = Priority.INTERACTIVE,
+                      dpi_ratio: float = 1.0, screen: Optional[str] = None) -> OCRResult:
+        """按文字大小缩放并预处理后识别BGR格式的numpy数组，大图自动分块，结果坐标对应原图
+
+        Args:
+            dpi_ratio: 截图的设备像素比，文字大小无法估计时用于高分屏大图的缩放
+            screen: 截图所在屏幕的名称，用于记住该屏幕的文字大小
+        """
+        prepared, plan = self._prepare(image, dpi_ratio, screen)
+        return self._process_prepared(prepared, priority, plan)
+
+    def _prepare(self, image: np.ndarray, dpi_ratio: float,
+                 screen: Optional[str]) -> Tuple[PreparedImage, ScalePlan]:
+        """制定缩放方案并预处理图像；预处理档位不允许缩放时不估计文字大小"""
+        if self.preprocessor.resizes:
+            plan = self.scaler.plan(image, screen, dpi_ratio)
+        else:
+            plan = ScalePlan(screen_key(screen, dpi_ratio))
+        return self.preprocessor.apply(image, dpi_ratio, plan.scale), plan
 
-        ch_result = self.default_ocr(screenshot_path)
+    def _process_prepared(self, prepared: PreparedImage, priority: int,
+                          plan: Optional[ScalePlan] = None) -> OCRResult:
+        image = prepared.image
+        height, width = image.shape[:2]
+        # 大尺寸截图（全屏、多显示器）分块并行识别，避免整体缩小导致小字丢失
+        if should_tile(width, height):
+            result = self.recognize_tiled(image, priority, plan)
+        else:
+            result = self.recognize(image, priority, plan.det_limit(width, height) if plan else None)
+        logger.debug("使用%s后端识别 %d 行, 耗时 %.1fms: %s",
+                     result.backend, len(result), result.elapse * 1000, result.txts)
+        if plan is not None:
+            self.scaler.feedback(plan, result)
+        return prepared.restore(result)
 
-        ch_texts = self.process_ocr_result(ch_result)
+    def process_hover(self, image: QImage, cursor=None, screen: Optional[str] = None) -> OCRResult:
+        """取词识别：光标处是单独一行文字时裁剪该行跳过检测直接识别，否则完整检测
+
+        Args:
+            cursor: 光标在图像中的位置 (x, y)，默认为图像中心
+            screen: 截图所在屏幕的名称，用于记住该屏幕的文字大小
+        """
+        if image.isNull():
+            return OCRResult.empty(backend=self.backend_name)
+        if self.SAVE_INPUT_IMAGE:
+            self._save_input_image(image)
 
-        if self.is_english_only(ch_texts):
-            en_result = self.en_ocr(screenshot_path)
-            en_texts = self.process_ocr_result(en_result)
-            print(f"使用英文模型识别结果: {en_texts}")
-            return en_texts
+        bgr = qimage_to_bgr(image)
+        line = find_single_line(bgr, cursor)
+        if line is not None:
+            x0, y0, x1, y1 = line
+            prepared = self.preprocessor.apply(np.ascontiguousarray(bgr[y0:y1, x0:x1]))
+            result = prepared.restore(self.recognize_line(prepared.image, Priority.HOVER))
+            if len(result) and result.scores.min() >= LineFinderConfig.MIN_SCORE:
+                logger.debug("单行快速识别, 耗时 %.1fms: %s", result.elapse * 1000, result.txts)
+                return OCRResult(result.txts, result.polygons + np.float32((x0, y0)), result.scores,
+                                 result.elapse, result.backend)
+            logger.debug("单行快速识别置信度不足，改用完整检测")
+        return self.process_array(bgr, Priority.HOVER, image.devicePixelRatio(), screen)
 
-        print(f"使用中文模型识别结果: {ch_texts}")
-        return ch_texts
+    @staticmethod
+    def _save_input_image(image: QImage):
+        """保存识别输入图像，便于排查识别问题（文件名唯一，并发识别时不会互相覆盖）"""
+        ocr_dir = PathConfig.get_ocr_result_path()
+        os.makedirs(ocr_dir, exist_ok=True)
+        image.save(os.path.join(ocr_dir, f"ocr_{time.time_ns()}_{threading.get_ident()}.png"))
 
-    def process_ocr_result(self, result):
+    def process_ocr_result(self, result: OCRResult):
+        """将识别结果转换为 (text, [min_x, max_x, min_y, max_y], score) 列表"""
         if not result:
             return []
-        texts = []
-        for i, txt in enumerate(result.txts):
-            print(txt, result.boxes[i])
-            x_list = [x[0] for x in result.boxes[i]]
-            y_list = [x[1] for x in result.boxes[i]]
-            min_x, max_x, min_y, max_y = min(x_list), max(x_list), min(y_list), max(y_list)
-            texts.append((txt, [min_x, max_x, min_y, max_y], result.scores[i]))
-        return texts
+        return result.to_tuples()
 
     def get_text_only(self, image: QImage):
         """只返回文本结果，不含位置信息"""
-        results = self.process_image(image)
-        return [text for text, _, _ in results]
+        return list(self.process_image(image).txts)
@@ -0,0 +1,137 @@
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class OCRLine:
+    """OCRResult 中单行文本的轻量视图
+
+    不复制数据，只保存所属结果和行号；支持按 (text, box, score) 解包，
+    兼容原先的元组格式。
+    """
+    __slots__ = ("_result", "_index")
+
+    def __init__(self, result: 'OCRResult', index: int):
+        self._result = result
+        self._index = index
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    @property
+    def text(self) -> str:
+        return self._result.txts[self._index]
+
+    @property
+    def box(self) -> List[float]:
+        """轴对齐边界 [min_x, max_x, min_y, max_y]"""
+        return self._result.boxes[self._index].tolist()
+
+    @property
+    def polygon(self) -> np.ndarray:
+        """四点坐标 (4, 2)"""
+        return self._result.polygons[self._index]
+
+    @property
+    def score(self) -> float:
+        return float(self._result.scores[self._index])
+
+    def as_tuple(self) -> Tuple[str, List[float], float]:
+        return self.text, self.box, self.score
+
+    def __iter__(self):
+        return iter(self.as_tuple())
+
+    def __getitem__(self, item):
+        return self.as_tuple()[item]
+
+    def __len__(self):
+        return 3
+
+    def __repr__(self):
+        return f"OCRLine({self.text!r}, box={self.box}, score={self.score:.3f})"
+
+
+class OCRResult:
+    """统一的OCR识别结果，所有后端都返回该类型
+
+    数据以NumPy数组存放，按行访问时返回 OCRLine 视图，避免为每行创建元组和列表。
+
+    Attributes:
+        txts: 识别出的文本
+        polygons: 每行文本的四点坐标，形状 (N, 4, 2)
+        scores: 每行文本的置信度，形状 (N,)
+        elapse: 推理耗时（秒）
+        backend: 产生该结果的后端名称
+    """
+    __slots__ = ("txts", "polygons", "scores", "elapse", "backend", "_boxes")
+
+    def __init__(self, txts: Sequence[str] = (), polygons=None, scores=None,
+                 elapse: float = 0.0, backend: str = ""):
+        self.txts: Tuple[str, ...] = tuple(txts)
+        count = len(self.txts)
+        self.polygons: np.ndarray = (np.asarray(polygons, dtype=np.float32).reshape(count, 4, 2)
+                                     if polygons is not None and count else np.zeros((count, 4, 2), np.float32))
+        self.scores: np.ndarray = (np.asarray(scores, dtype=np.float64).reshape(count)
+                                   if scores is not None and count else np.zeros(count, np.float64))
+        self.elapse = elapse
+        self.backend = backend
+        self._boxes: Optional[np.ndarray] = None
+
+    @classmethod
+    def empty(cls, backend: str = "", elapse: float = 0.0) -> 'OCRResult':
+        """创建空结果"""
+        return cls(elapse=elapse, backend=backend)
+
+    @classmethod
+    def concatenate(cls, results: Sequence['OCRResult'], backend: str = "", elapse: float = 0.0) -> 'OCRResult':
+        """按顺序拼接多个结果"""
+        results = [result for result in results if result]
+        if not results:
+            return cls.empty(backend=backend, elapse=elapse)
+        return cls(
+            [text for result in results for text in result.txts],
+            np.concatenate([result.polygons for result in results]),
+            np.concatenate([result.scores for result in results]),
+            elapse, backend
+        )
+
+    def select(self, indices) -> 'OCRResult':
+        """按行号（或布尔掩码）取出部分行，返回新结果"""
+        indices = np.flatnonzero(indices) if np.asarray(indices).dtype == bool else np.asarray(indices, dtype=np.intp)
+        return OCRResult([self.txts[i] for i in indices.tolist()], self.polygons[indices],
+                         self.scores[indices], self.elapse, self.backend)
+
+    @property
+    def boxes(self) -> np.ndarray:
+        """轴对齐边界 (N, 4)，每行为 [min_x, max_x, min_y, max_y]，首次访问时一次性计算"""
+        if self._boxes is None:
+            mins = self.polygons.min(axis=1)
+            maxs = self.polygons.max(axis=1)
+            self._boxes = np.stack((mins[:, 0], maxs[:, 0], mins[:, 1], maxs[:, 1]), axis=1)
+        return self._boxes
+
+    def __len__(self):
+        return len(self.txts)
+
+    def __bool__(self):
+        return len(self.txts) > 0
+
+    def __iter__(self) -> Iterator[OCRLine]:
+        for index in range(len(self.txts)):
+            yield OCRLine(self, index)
+
+    def __getitem__(self, index) -> OCRLine:
+        if index < 0:
+            index += len(self.txts)
+        if not 0 <= index < len(self.txts):
+            raise IndexError(index)
+        return OCRLine(self, index)
+
+    def __repr__(self):
+        return f"OCRResult(backend={self.backend!r}, lines={len(self)}, elapse={self.elapse:.3f})"
+
+    def to_tuples(self):
+        """转换为 (text, [min_x, max_x, min_y, max_y], score) 列表，供仍需元组的调用方使用"""
+        return list(zip(self.txts, self.boxes.tolist(), self.scores.tolist()))
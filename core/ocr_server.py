@@ -0,0 +1,333 @@
+import base64
+import json
+import os
+import socketserver
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+import numpy as np
+from PySide6.QtGui import QImage
+
+from core.engine_pool import Priority
+from core.ocr_result import OCRResult
+from util.logger import get_logger
+from util.utils import qimage_to_bgr
+
+logger = get_logger(__name__)
+
+
+class ServerConfig:
+    """OCR服务配置"""
+    HOST = "127.0.0.1"
+    PORT = 8765
+    # 同时进行推理的请求数，0 表示与引擎的会话池大小一致
+    WORKERS = 0
+    # 排队（含正在推理）的请求数上限，超过时返回503
+    MAX_QUEUE = 16
+    # 单次批量请求的图片数量上限
+    MAX_BATCH = 64
+    # 请求体大小上限（字节）
+    MAX_BODY = 64 * 1024 * 1024
+    # 统计延迟分位数时保留的样本数
+    LATENCY_SAMPLES = 1000
+
+
+class RequestError(Exception):
+    """请求内容无效"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+# 原始像素缓冲区的格式 -> (通道数, 转换为BGR的方法)
+_RAW_FORMATS = {
+    "bgr": (3, lambda a: a),
+    "bgra": (4, lambda a: a[:, :, :3]),
+    "rgb": (3, lambda a: a[:, :, ::-1]),
+    "rgba": (4, lambda a: a[:, :, 2::-1]),
+    "gray": (1, lambda a: np.repeat(a, 3, axis=2)),
+}
+
+
+def decode_encoded_image(data: bytes) -> np.ndarray:
+    """解码PNG/JPEG等编码图片为BGR数组"""
+    image = QImage.fromData(data)
+    if image.isNull():
+        raise RequestError("无法解码图片")
+    return qimage_to_bgr(image).copy()
+
+
+def decode_raw_image(data: bytes, width: int, height: int, pixel_format: str = "bgr") -> np.ndarray:
+    """将原始像素缓冲区解释为BGR数组
+
+    Args:
+        pixel_format: bgr / bgra / rgb / rgba / gray，逐行紧密排列
+    """
+    if pixel_format not in _RAW_FORMATS:
+        raise RequestError(f"不支持的像素格式: {pixel_format}")
+    channels, to_bgr = _RAW_FORMATS[pixel_format]
+    if width <= 0 or height <= 0 or len(data) != width * height * channels:
+        raise RequestError("原始图像尺寸与数据长度不符")
+    return np.ascontiguousarray(to_bgr(np.frombuffer(data, dtype=np.uint8).reshape(height, width, channels)))
+
+
+def result_to_dict(result: OCRResult) -> dict:
+    return {
+        "lines": [{"text": text, "box": box, "score": score} for text, box, score in result.to_tuples()],
+        "elapse": result.elapse,
+        "backend": result.backend,
+    }
+
+
+class ServerMetrics:
+    """服务运行统计"""
+
+    def __init__(self, samples: int = ServerConfig.LATENCY_SAMPLES):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.requests = 0
+        self.images = 0
+        self.rejected = 0
+        self.errors = 0
+        self.queued = 0
+        self.in_flight = 0
+        self._latencies = deque(maxlen=samples)
+        self._waits = deque(maxlen=samples)
+
+    def record(self, **changes):
+        with self._lock:
+            for name, delta in changes.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def observe(self, wait: float, latency: float):
+        with self._lock:
+            self._waits.append(wait)
+            self._latencies.append(latency)
+
+    @staticmethod
+    def _percentiles(samples) -> dict:
+        if not samples:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+        values = np.percentile(np.fromiter(samples, dtype=np.float64), [50, 95, 99]) * 1000
+        return {"p50": round(values[0], 2), "p95": round(values[1], 2), "p99": round(values[2], 2)}
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "uptime": round(time.time() - self.started_at, 1),
+                "requests": self.requests,
+                "images": self.images,
+                "rejected": self.rejected,
+                "errors": self.errors,
+                "queued": self.queued,
+                "in_flight": self.in_flight,
+                "queue_wait_ms": self._percentiles(self._waits),
+                "latency_ms": self._percentiles(self._latencies),
+            }
+
+
+class _OCRRequestHandler(BaseHTTPRequestHandler):
+    server_version = "ocr-tool"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug("%s %s", self.address_string(), format % args)
+
+    def address_string(self):
+        # Unix套接字没有客户端地址
+        return self.client_address[0] if isinstance(self.client_address, tuple) and self.client_address else "unix"
+
+    def _send_json(self, status: int, payload: dict, headers: Optional[dict] = None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> bytes:
+        value = (self.headers.get("Content-Length") or "0").strip()
+        # int() 接受负数、"+1"、"1_0" 等写法，这里只允许十进制非负整数
+        if not (value.isascii() and value.isdigit()):
+            raise RequestError("Content-Length 应为非负整数")
+        length = int(value)
+        if length > ServerConfig.MAX_BODY:
+            raise RequestError("请求体过大", 413)
+        return self.rfile.read(length)
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            metrics = self.server.ocr.metrics.snapshot()
+            metrics["pool"] = self.server.ocr.engine.stats()
+            self._send_json(200, metrics)
+        elif self.path == "/health":
+            self._send_json(200, {"status": "ok", "backend": self.server.ocr.engine.backend_name})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        ocr = self.server.ocr
+        try:
+            body = self._read_body()
+            if self.path == "/ocr":
+                images = [self._decode_single(body)]
+            elif self.path == "/ocr/batch":
+                images = self._decode_batch(body)
+            else:
+                self._send_json(404, {"error": "not found"})
+                return
+            results = ocr.run(images)
+        except RequestError as e:
+            # 请求体可能没有读完，不再复用该连接
+            self.close_connection = True
+            if e.status == 503:
+                self._send_json(503, {"error": str(e)}, {"Retry-After": "1"})
+            else:
+                self._send_json(e.status, {"error": str(e)})
+            return
+        except Exception as e:
+            logger.error("OCR服务请求失败: %s", e)
+            self._send_json(500, {"error": str(e)})
+            return
+
+        if self.path == "/ocr":
+            self._send_json(200, result_to_dict(results[0]))
+        else:
+            self._send_json(200, {"results": [result_to_dict(result) for result in results]})
+
+    def _decode_single(self, body: bytes) -> np.ndarray:
+        """单张图片：编码图片直接作为请求体，原始像素通过 X-Width/X-Height/X-Format 描述"""
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.startswith("application/octet-stream") and self.headers.get("X-Width"):
+            try:
+                width, height = int(self.headers["X-Width"]), int(self.headers.get("X-Height", ""))
+            except ValueError:
+                raise RequestError("X-Width/X-Height 应为整数")
+            return decode_raw_image(body, width, height, self.headers.get("X-Format", "bgr").lower())
+        return decode_encoded_image(body)
+
+    @staticmethod
+    def _decode_batch(body: bytes) -> List[np.ndarray]:
+        """批量请求：{"images": [{"data": base64, "width"?, "height"?, "format"?}, ...]}"""
+        try:
+            items = json.loads(body.decode("utf-8"))["images"]
+        except (ValueError, KeyError, TypeError):
+            raise RequestError("批量请求格式应为 {\"images\": [...]}")
+        if len(items) > ServerConfig.MAX_BATCH:
+            raise RequestError(f"单次最多 {ServerConfig.MAX_BATCH} 张图片", 413)
+
+        images = []
+        for index, item in enumerate(items):
+            try:
+                data = base64.b64decode(item["data"])
+                if "width" in item:
+                    images.append(decode_raw_image(data, int(item["width"]), int(item["height"]),
+                                                   item.get("format", "bgr").lower()))
+                else:
+                    images.append(decode_encoded_image(data))
+            except (ValueError, KeyError, TypeError, RequestError) as e:
+                raise RequestError(f"第 {index + 1} 张图片无效: {e}")
+        return images
+
+
+class _TCPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+# Windows 上没有 Unix 套接字
+if hasattr(socketserver, "UnixStreamServer"):
+    class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+else:
+    _UnixServer = None
+
+
+class OCRServer:
+    """无界面的本地OCR服务，复用已加载模型的 OCREngine
+
+    HTTP接口（本机TCP或Unix套接字）:
+        POST /ocr          请求体为PNG/JPEG，或 application/octet-stream 原始像素（X-Width/X-Height/X-Format）
+        POST /ocr/batch    JSON {"images": [{"data": base64, ...}]}
+        GET  /metrics      运行统计（排队等待和延迟分位数）
+        GET  /health
+    排队的请求数超过 max_queue 时立即返回503（Retry-After），由客户端退避重试。
+    """
+
+    def __init__(self, engine, host: str = ServerConfig.HOST, port: int = ServerConfig.PORT,
+                 unix_path: Optional[str] = None, workers: int = ServerConfig.WORKERS,
+                 max_queue: int = ServerConfig.MAX_QUEUE):
+        self.engine = engine
+        self.metrics = ServerMetrics()
+        workers = workers or engine.pool.size
+        self.max_queue = max(max_queue, workers)
+        self._workers = threading.Semaphore(max(workers, 1))
+        self._queue_lock = threading.Lock()
+
+        if unix_path:
+            if _UnixServer is None:
+                raise OSError("当前平台不支持Unix套接字")
+            if os.path.exists(unix_path):
+                os.unlink(unix_path)
+            self._httpd = _UnixServer(unix_path, _OCRRequestHandler)
+            self.address = unix_path
+        else:
+            self._httpd = _TCPServer((host, port), _OCRRequestHandler)
+            self.address = f"http://{host}:{self._httpd.server_address[1]}"
+        self._httpd.ocr = self
+        self.unix_path = unix_path
+
+    def run(self, images: List[np.ndarray]) -> List[OCRResult]:
+        """识别一个请求中的图片，队列已满时抛出 RequestError(503)"""
+        with self._queue_lock:
+            if self.metrics.queued + self.metrics.in_flight >= self.max_queue:
+                self.metrics.record(rejected=1)
+                raise RequestError("服务繁忙，请稍后重试", 503)
+            self.metrics.record(queued=1, requests=1)
+
+        enqueued_at = time.perf_counter()
+        # 批量请求中的每张图片单独占用推理名额，避免大批量请求长时间独占
+        results = []
+        started = False
+        try:
+            for image in images:
+                with self._workers:
+                    if not started:
+                        started = True
+                        self.metrics.record(queued=-1, in_flight=1)
+                    started_at = time.perf_counter()
+                    # 服务请求按批量优先级排队，界面上的交互识别优先获得会话
+                    results.append(self.engine.process_array(image, Priority.BATCH))
+                finished_at = time.perf_counter()
+                self.metrics.observe(started_at - enqueued_at, finished_at - enqueued_at)
+                enqueued_at = finished_at
+            self.metrics.record(images=len(images))
+        except Exception:
+            self.metrics.record(errors=1)
+            raise
+        finally:
+            self.metrics.record(**({"in_flight": -1} if started else {"queued": -1}))
+        return results
+
+    def serve_forever(self):
+        logger.info("OCR服务已启动: %s", self.address)
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+            if self.unix_path and os.path.exists(self.unix_path):
+                os.unlink(self.unix_path)
+
+    def start(self) -> threading.Thread:
+        """在后台线程中运行服务"""
+        thread = threading.Thread(target=self.serve_forever, name="ocr-server", daemon=True)
+        thread.start()
+        return thread
+
+    def shutdown(self):
+        self._httpd.shutdown()
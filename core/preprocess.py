@@ -0,0 +1,180 @@
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.ocr_result import OCRResult
+from util.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class PreprocessConfig:
+    """识别前图像预处理配置"""
+    # 统计亮度时的采样步长（每隔 N 个像素取一个），大图也只需几毫秒
+    SAMPLE_STEP = 4
+    # 背景亮度（中位数）低于该值视为深色主题，反色为白底黑字
+    DARK_BACKGROUND = 110
+    # 亮度 1%~99% 分位区间小于该值视为低对比度，拉伸到 0~255
+    LOW_CONTRAST = 120
+    CONTRAST_PERCENTILES = (1, 99)
+    # 分位区间小于该值时为纯色区域，不拉伸（避免放大噪声）
+    MIN_CONTRAST = 16
+    # 短边小于该值的图像（单行小字）按整数倍放大
+    MIN_SIDE = 48
+    MAX_UPSCALE = 3
+    # 高DPI截图长边超过该值时按DPI整数倍缩小，文字回到检测模型习惯的大小
+    DET_SIDE = 960
+
+
+@dataclass
+class PreprocessOptions:
+    """预处理步骤开关"""
+    invert: bool = True  # 深色背景反色
+    contrast: bool = True  # 低对比度拉伸
+    grayscale: bool = False  # 转灰度，去除次像素渲染的彩色边缘
+    upscale: bool = True  # 放大过小的图像或文字
+    dpi_resize: bool = True  # 缩小高分屏大图或大号文字
+
+
+class PreprocessProfile:
+    """预处理档位"""
+    OFF = "off"
+    SCREEN = "screen"
+    SUBPIXEL = "subpixel"
+
+    ALL = [SCREEN, SUBPIXEL, OFF]
+    NAMES = {SCREEN: "屏幕文字（默认）", SUBPIXEL: "屏幕文字 + 去彩边", OFF: "关闭"}
+    OPTIONS: Dict[str, PreprocessOptions] = {
+        OFF: PreprocessOptions(invert=False, contrast=False, upscale=False, dpi_resize=False),
+        SCREEN: PreprocessOptions(),
+        SUBPIXEL: PreprocessOptions(grayscale=True),
+    }
+
+
+@dataclass
+class PreparedImage:
+    """预处理后的图像，scale 为处理后坐标与原图坐标之比"""
+    image: np.ndarray
+    scale: float = 1.0
+    steps: List[str] = field(default_factory=list)
+    elapse: float = 0.0
+
+    def restore(self, result: OCRResult) -> OCRResult:
+        """把识别结果的坐标换算回原图"""
+        if self.scale == 1.0 or not result:
+            return result
+        return OCRResult(result.txts, result.polygons / np.float32(self.scale), result.scores,
+                         result.elapse, result.backend)
+
+
+class Preprocessor:
+    """识别前的图像预处理，全部为NumPy向量化操作
+
+    反色和对比度拉伸合并为一张256项的查找表，对图像只做一次查表（在缩小之后、放大之前）；
+    缩放只使用整数倍（放大按像素重复，缩小按块平均），不依赖其它图像库。
+    未触发任何步骤时直接返回原图（零拷贝视图）。
+    """
+
+    def __init__(self, profile: str = PreprocessProfile.SCREEN):
+        self.profile = profile
+        self.options = PreprocessProfile.OPTIONS.get(profile, PreprocessProfile.OPTIONS[PreprocessProfile.SCREEN])
+
+    @property
+    def resizes(self) -> bool:
+        """当前档位是否允许缩放图像"""
+        return self.options.upscale or self.options.dpi_resize
+
+    def apply(self, image: np.ndarray, dpi_ratio: float = 1.0, scale: Optional[float] = None) -> PreparedImage:
+        """预处理BGR图像
+
+        Args:
+            image: BGR格式的numpy数组（可以是截图缓冲区的跨步视图）
+            dpi_ratio: 截图的设备像素比
+            scale: 指定的缩放比例（取整为整数倍，见 InputScaler），None 表示按图像尺寸和DPI决定
+        """
+        start_time = time.perf_counter()
+        options = self.options
+        steps = []
+        output = image
+
+        # 先按采样统计生成查找表，查表放在缩小之后、放大之前，处理的像素最少
+        table = None
+        if options.invert or options.contrast:
+            table = self._levels_table(image, steps)
+
+        height, width = output.shape[:2]
+        upscale, downscale = self._resize_factors(height, width, dpi_ratio, scale)
+        scale = 1.0
+        if downscale > 1:
+            factor = downscale
+            height, width = height // factor * factor, width // factor * factor
+            # 块平均：先逐行、再逐列累加相邻像素，比 reshape 后按多个轴求均值快近十倍
+            rows = output[:height].reshape(height // factor, factor, output.shape[1], 3)
+            total = rows[:, 0, :width].astype(np.uint16)
+            for dy in range(1, factor):
+                total += rows[:, dy, :width]
+            columns = total.reshape(height // factor, width // factor, factor, 3)
+            total = columns[:, :, 0].copy()
+            for dx in range(1, factor):
+                total += columns[:, :, dx]
+            output = (total // (factor * factor)).astype(np.uint8)
+            scale = 1.0 / factor
+            steps.append(f"downscale /{factor}")
+
+        if options.grayscale:
+            output = (output.astype(np.uint16).sum(axis=2) // 3).astype(np.uint8)
+            if table is not None:
+                output = np.take(table, output)
+            output = np.repeat(output[:, :, np.newaxis], 3, axis=2)
+            steps.append("grayscale")
+        elif table is not None:
+            output = np.take(table, output)
+
+        if upscale > 1:
+            factor = upscale
+            output = output.repeat(factor, axis=0).repeat(factor, axis=1)
+            scale = float(factor)
+            steps.append(f"upscale x{factor}")
+
+        prepared = PreparedImage(output, scale, steps, time.perf_counter() - start_time)
+        if steps:
+            logger.debug("图像预处理: %s, 耗时 %.1fms", ", ".join(steps), prepared.elapse * 1000)
+        return prepared
+
+    def _resize_factors(self, height: int, width: int, dpi_ratio: float,
+                        scale: Optional[float]) -> Tuple[int, int]:
+        """(放大倍数, 缩小倍数)，不缩放时均为1"""
+        options = self.options
+        if scale is not None:
+            if scale > 1 and options.upscale:
+                return int(round(scale)), 1
+            if scale < 1 and options.dpi_resize:
+                return 1, int(round(1 / scale))
+            return 1, 1
+        if options.upscale and 0 < min(height, width) < PreprocessConfig.MIN_SIDE:
+            return min(math.ceil(PreprocessConfig.MIN_SIDE / min(height, width)), PreprocessConfig.MAX_UPSCALE), 1
+        if options.dpi_resize and dpi_ratio >= 2 and max(height, width) > PreprocessConfig.DET_SIDE:
+            return 1, int(dpi_ratio)
+        return 1, 1
+
+    def _levels_table(self, image: np.ndarray, steps: List[str]):
+        """按采样的亮度分布生成反色/对比度拉伸合并的查找表，无需调整时返回 None"""
+        sample = image[::PreprocessConfig.SAMPLE_STEP, ::PreprocessConfig.SAMPLE_STEP]
+        luminance = sample.astype(np.uint16).sum(axis=2) // 3
+        levels = np.arange(256, dtype=np.float32)
+        adjusted = False
+        if self.options.invert and np.median(luminance) < PreprocessConfig.DARK_BACKGROUND:
+            levels = 255 - levels
+            luminance = 255 - luminance
+            steps.append("invert")
+            adjusted = True
+        if self.options.contrast:
+            low, high = np.percentile(luminance, PreprocessConfig.CONTRAST_PERCENTILES)
+            if PreprocessConfig.MIN_CONTRAST <= high - low < PreprocessConfig.LOW_CONTRAST:
+                levels = (levels - low) * (255.0 / (high - low))
+                steps.append("contrast")
+                adjusted = True
+        return np.clip(levels, 0, 255).astype(np.uint8) if adjusted else None
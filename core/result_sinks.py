@@ -0,0 +1,305 @@
+import shlex
+import socket
+import subprocess
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional
+
+from PySide6.QtCore import QMimeData, QTimer
+from PySide6.QtGui import QGuiApplication, QImage
+
+from util.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class SinkResult:
+    """交给结果输出端的一次识别结果
+
+    Attributes:
+        text: 识别出的文本
+        image: 截图（悬停取词等没有截图时为 None）
+        source: 结果来源，"capture" 或 "hover"
+    """
+    text: str
+    image: Optional[QImage] = None
+    source: str = "capture"
+
+
+class ResultSink(ABC):
+    """识别结果输出端，在结果显示到界面之后调用"""
+    name = ""
+
+    @abstractmethod
+    def publish(self, result: SinkResult):
+        """输出一次识别结果"""
+        pass
+
+    def close(self):
+        """释放资源"""
+        pass
+
+
+class LazyImageMimeData(QMimeData):
+    """延迟提供图像数据的剪贴板内容
+
+    只声明包含图像，直到其它程序粘贴时平台剪贴板才来取图像数据，
+    大截图不必在识别前就编码交给系统剪贴板。
+    """
+    IMAGE_MIME_TYPE = "application/x-qt-image"
+
+    def __init__(self, image: QImage):
+        super().__init__()
+        self._image = image
+
+    def hasFormat(self, mime_type):
+        return mime_type == self.IMAGE_MIME_TYPE or super().hasFormat(mime_type)
+
+    def formats(self):
+        return [self.IMAGE_MIME_TYPE] + super().formats()
+
+    def hasImage(self):
+        return True
+
+    def retrieveData(self, mime_type, preferred_type):
+        if mime_type == self.IMAGE_MIME_TYPE:
+            return self._image
+        return super().retrieveData(mime_type, preferred_type)
+
+
+class ClipboardSink(ResultSink):
+    """将截图和/或文本写入剪贴板
+
+    mode:
+        image: 只复制截图（默认，与原先行为一致）
+        text: 只复制文本
+        both: 同时复制截图和文本
+        none: 不写剪贴板
+    没有截图的结果（悬停取词）在 mode 不为 none 时复制文本。
+    """
+    name = "clipboard"
+    MODES = ("image", "text", "both", "none")
+
+    def __init__(self, mode: str = "image"):
+        self.mode = mode if mode in self.MODES else "image"
+
+    def publish(self, result: SinkResult):
+        if self.mode == "none":
+            return
+
+        clipboard = QGuiApplication.clipboard()
+        if result.image is None or result.image.isNull():
+            if result.text:
+                clipboard.setText(result.text)
+            return
+
+        if self.mode == "text":
+            if result.text:
+                clipboard.setText(result.text)
+            return
+
+        mime_data = LazyImageMimeData(result.image)
+        if self.mode == "both" and result.text:
+            mime_data.setText(result.text)
+        clipboard.setMimeData(mime_data)
+
+
+TEXT_PLACEHOLDER = "{text}"
+
+
+def parse_command(command: str) -> List[str]:
+    """将命令模板拆分为参数列表，支持带引号的Windows路径"""
+    return [arg[1:-1] if len(arg) >= 2 and arg[0] == arg[-1] and arg[0] in "\"'" else arg
+            for arg in shlex.split(command, posix=False)]
+
+
+def build_argv(template: List[str], text: str) -> List[str]:
+    """替换参数中的文本占位符；文本作为独立参数传递，不经过shell解析"""
+    return [arg.replace(TEXT_PLACEHOLDER, text) for arg in template]
+
+
+class LauncherSink(ResultSink):
+    """将识别结果交给外部工具（如GoldenDict）
+
+    mode:
+        spawn: 每次结果直接执行命令（不经过shell，文本作为独立参数）
+        stdin: 启动一个常驻进程（去掉含占位符的参数），每次结果写入一行到其标准输入
+        socket: 保持到 address（host:port）的长连接，每次结果发送一行
+    stdin 和 socket 模式在同一个后台线程中启动进程、连接和发送，积压时只发最新一条。
+    连续相同的文本在 DEDUPE_SECONDS 内只发送一次；两次发送的间隔不小于 MIN_INTERVAL，
+    间隔内到达的结果只保留最新一条，延后发送。
+    """
+    name = "launcher"
+    MODES = ("spawn", "stdin", "socket")
+    DEDUPE_SECONDS = 2.0
+    MIN_INTERVAL = 0.3
+
+    def __init__(self, command: str, mode: str = "spawn", address: str = ""):
+        self.template = parse_command(command) if command else []
+        self.mode = mode if mode in self.MODES else "spawn"
+        self.address = address
+        self._process: Optional[subprocess.Popen] = None
+        self._socket: Optional[socket.socket] = None
+        self._worker_lock = threading.Lock()
+        self._queued_text: Optional[str] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._last_text = ""
+        self._last_sent_at = 0.0
+        self._pending_text: Optional[str] = None
+
+    def publish(self, result: SinkResult):
+        text = result.text.strip()
+        if not text:
+            return
+
+        now = time.monotonic()
+        if text == self._last_text and now - self._last_sent_at < self.DEDUPE_SECONDS:
+            logger.debug("跳过重复的外部工具调用: %s", text)
+            return
+
+        wait = self.MIN_INTERVAL - (now - self._last_sent_at)
+        if wait > 0:
+            if self._pending_text is None:
+                QTimer.singleShot(int(wait * 1000) + 1, self._flush_pending)
+            self._pending_text = text
+            return
+        self._send(text)
+
+    def _flush_pending(self):
+        text, self._pending_text = self._pending_text, None
+        if text is not None and text != self._last_text:
+            self._send(text)
+
+    def _send(self, text: str):
+        self._last_text = text
+        self._last_sent_at = time.monotonic()
+        # 延后发送由定时器触发，不在 ResultSinkPipeline 的异常保护内，失败只记录日志
+        try:
+            if self.mode == "spawn":
+                self._spawn(text)
+            else:
+                self._queue(text)
+        except Exception as e:
+            logger.error("外部工具调用失败 (%s): %s", self.mode, e)
+
+    def _spawn(self, text: str):
+        if not self.template:
+            return
+        argv = build_argv(self.template, text)
+        subprocess.Popen(argv, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                         stderr=subprocess.DEVNULL, close_fds=True)
+        logger.info("外部工具已执行: %s", argv)
+
+    def _queue(self, text: str):
+        """交给后台线程发送，启动常驻进程和连接超时不阻塞界面"""
+        with self._worker_lock:
+            idle = self._queued_text is None
+            self._queued_text = text
+        if idle:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ocr-launcher")
+            self._executor.submit(self._worker)
+
+    def _worker(self):
+        while True:
+            with self._worker_lock:
+                text, self._queued_text = self._queued_text, None
+            if text is None:
+                return
+            try:
+                if self.mode == "stdin":
+                    self._deliver_stdin(text)
+                else:
+                    self._deliver_socket(text)
+            except Exception as e:
+                logger.error("外部工具调用失败 (%s): %s", self.mode, e)
+
+    def _deliver_stdin(self, text: str):
+        for _ in range(2):
+            if self._process is None or self._process.poll() is not None:
+                argv = [arg for arg in self.template if TEXT_PLACEHOLDER not in arg]
+                if not argv:
+                    return
+                self._process = subprocess.Popen(argv, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                                 stderr=subprocess.DEVNULL, text=True, encoding="utf-8")
+                logger.info("外部工具常驻进程已启动: %s", argv)
+            try:
+                self._process.stdin.write(text + "\n")
+                self._process.stdin.flush()
+                return
+            except (BrokenPipeError, OSError) as e:
+                logger.warning("外部工具常驻进程写入失败，重新启动: %s", e)
+                self._process = None
+
+    def _deliver_socket(self, text: str):
+        host, _, port = self.address.rpartition(":")
+        for _ in range(2):
+            try:
+                if self._socket is None:
+                    self._socket = socket.create_connection((host or "127.0.0.1", int(port)), timeout=1.0)
+                self._socket.sendall((text + "\n").encode("utf-8"))
+                return
+            except (OSError, ValueError) as e:
+                logger.warning("外部工具连接发送失败 (%s): %s", self.address, e)
+                self._close_socket()
+
+    def _close_socket(self):
+        if self._socket is not None:
+            try:
+                self._socket.close()
+            except OSError:
+                pass
+            self._socket = None
+
+    def _close_outputs(self):
+        self._close_socket()
+        if self._process is not None and self._process.poll() is None:
+            try:
+                self._process.stdin.close()
+                self._process.terminate()
+            except OSError:
+                pass
+        self._process = None
+
+    def close(self):
+        self._pending_text = None
+        with self._worker_lock:
+            self._queued_text = None
+        if self._executor is not None:
+            # 在发送线程中关闭连接和常驻进程，避免与进行中的发送冲突
+            self._executor.submit(self._close_outputs)
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        else:
+            self._close_outputs()
+
+
+class ResultSinkPipeline:
+    """按顺序把识别结果交给各输出端，单个输出端失败不影响其它输出端"""
+
+    def __init__(self, sinks: Optional[List[ResultSink]] = None):
+        self.sinks: List[ResultSink] = list(sinks or [])
+
+    def set_sinks(self, sinks: List[ResultSink]):
+        """替换全部输出端，旧输出端会被关闭"""
+        self.close()
+        self.sinks = list(sinks)
+
+    def publish(self, result: SinkResult):
+        for sink in self.sinks:
+            try:
+                sink.publish(result)
+            except Exception as e:
+                logger.error("结果输出失败 (%s): %s", sink.name, e)
+
+    def close(self):
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                logger.warning("关闭结果输出端失败 (%s): %s", sink.name, e)
+        self.sinks = []
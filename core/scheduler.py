@@ -0,0 +1,84 @@
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict
+
+from core.engine_pool import Priority
+
+
+class SchedulerConfig:
+    """识别任务调度配置"""
+    # 每类任务同时进行的识别数上限，0 表示不单独限制
+    CONCURRENCY = {
+        Priority.HOVER: 0,
+        Priority.CAPTURE: 0,
+        Priority.WATCH: 1,
+        Priority.BATCH: 0,
+    }
+    # 为交互任务（取词、截图）保留的会话数：后台任务（监视、批量）合计最多占用 会话数 - 保留数（至少1个）
+    RESERVED_INTERACTIVE = 1
+
+
+class OCRScheduler:
+    """识别任务调度：在会话池之前按任务类别限制并发
+
+    - 交互任务（取词、截图）不受限制，排队时在会话池中优先获得会话
+    - 后台任务（监视、批量）合计不超过 会话数 - RESERVED_INTERACTIVE，
+      始终留出会话给取词，批量任务再多也不会让取词排在整批之后
+    - 批量识别逐张申请名额，每张图片之间都是抢占点
+    """
+
+    def __init__(self, capacity: Callable[[], int]):
+        """
+        Args:
+            capacity: 返回当前会话池大小的函数（切换后端后会话数可能变化）
+        """
+        self._capacity = capacity
+        self._cond = threading.Condition()
+        self._running: Dict[int, int] = {}
+        self._waiting: Dict[int, int] = {}
+        self._throttled: Dict[int, int] = {}
+
+    def background_limit(self) -> int:
+        """后台任务合计可占用的会话数"""
+        return max(self._capacity() - SchedulerConfig.RESERVED_INTERACTIVE, 1)
+
+    def _admissible(self, priority: int) -> bool:
+        limit = SchedulerConfig.CONCURRENCY.get(priority, 0)
+        if limit and self._running.get(priority, 0) >= limit:
+            return False
+        if Priority.is_background(priority):
+            background = sum(count for task, count in self._running.items() if Priority.is_background(task))
+            if background >= self.background_limit():
+                return False
+        return True
+
+    @contextmanager
+    def slot(self, priority: int):
+        """占用一个该类任务的执行名额，名额不足时等待"""
+        with self._cond:
+            if not self._admissible(priority):
+                self._throttled[priority] = self._throttled.get(priority, 0) + 1
+                self._waiting[priority] = self._waiting.get(priority, 0) + 1
+                try:
+                    while not self._admissible(priority):
+                        self._cond.wait()
+                finally:
+                    self._waiting[priority] -= 1
+            self._running[priority] = self._running.get(priority, 0) + 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._running[priority] -= 1
+                self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                Priority.NAMES.get(priority, str(priority)): {
+                    "running": self._running.get(priority, 0),
+                    "waiting": self._waiting.get(priority, 0),
+                    "throttled": self._throttled.get(priority, 0),
+                }
+                for priority in sorted(set(self._running) | set(self._waiting) | set(self._throttled))
+            }
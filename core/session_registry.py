@@ -0,0 +1,94 @@
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from util.logger import get_logger
+
+logger = get_logger(__name__)
+
+# RapidOCR 产线中的推理阶段：属性名 -> 参数前缀
+RAPIDOCR_STAGES = (("text_det", "Det"), ("text_cls", "Cls"), ("text_rec", "Rec"))
+# 影响所有阶段推理会话的全局参数前缀
+_ENGINE_PREFIX = "EngineConfig."
+
+
+class SessionRegistry:
+    """推理会话注册表：按 (阶段, 模型路径, 会话选项) 共享同一个会话对象，引用计数归零时释放
+
+    同一后端会话内的多套产线（中文/英文、不同精度档位）使用同一模型时只加载一份。
+    注册表属于单个后端实例，不跨会话池中的会话共享，保持各会话可以并发推理。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[tuple, list] = {}  # key -> [会话对象, 引用数]
+
+    @staticmethod
+    def make_key(stage: str, model_path: Optional[str], options: Dict[str, Any]) -> tuple:
+        """会话的唯一标识，选项按名称排序后参与比较"""
+        return stage, str(model_path or ""), tuple(sorted((name, str(value)) for name, value in options.items()))
+
+    def share(self, key: tuple, session):
+        """登记会话并增加引用；已有相同会话时返回已有的（新传入的对象随之丢弃）"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = [session, 0]
+            elif entry[0] is not session:
+                logger.debug("复用已加载的推理会话: %s %s", key[0], key[1])
+            entry[1] += 1
+            return entry[0]
+
+    def release(self, key: tuple):
+        """减少引用，归零时释放会话"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del self._entries[key]
+
+    def release_all(self, keys: Iterable[tuple]):
+        for key in keys:
+            self.release(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def model_paths(self) -> List[str]:
+        """已加载的模型文件（去重）"""
+        with self._lock:
+            return sorted({key[1] for key in self._entries if key[1]})
+
+    def resident_bytes(self) -> int:
+        """按模型文件大小估算已加载会话的内存占用"""
+        return sum(os.path.getsize(path) for path in self.model_paths() if os.path.exists(path))
+
+    def stats(self) -> List[Tuple[str, str, int]]:
+        """(阶段, 模型路径, 引用数) 列表"""
+        with self._lock:
+            return [(key[0], key[1], entry[1]) for key, entry in self._entries.items()]
+
+
+def share_rapidocr_stages(registry: SessionRegistry, pipeline, params: Dict[str, Any]) -> List[tuple]:
+    """把 RapidOCR 产线的检测/分类/识别阶段替换为注册表中的共享实例
+
+    以构建产线时的参数区分阶段：模型路径、该阶段的参数和全局推理引擎参数都相同才共享。
+
+    Returns:
+        产线持有的会话标识，释放产线时传给 registry.release_all
+    """
+    engine_options = {name: value for name, value in params.items() if name.startswith(_ENGINE_PREFIX)}
+    keys = []
+    for attr, prefix in RAPIDOCR_STAGES:
+        stage = getattr(pipeline, attr, None)
+        if stage is None:
+            continue
+        options = {name: value for name, value in params.items() if name.startswith(prefix + ".")}
+        options.update(engine_options)
+        key = registry.make_key(prefix, params.get(f"{prefix}.model_path"), options)
+        setattr(pipeline, attr, registry.share(key, stage))
+        keys.append(key)
+    return keys
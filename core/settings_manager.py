@@ -35,7 +35,17 @@ class SettingsManager:
         "current_theme": "blue",
         "font_size": "12",
         "window_opacity": "100",
-
+        "ocr_backend": "rapidocr",
+        "ocr_pool_size": 0,
+        "model_profile": "fp32",
+        "angle_cls": "auto",
+        "preprocess_profile": "screen",
+        "model_idle_minutes": 10,
+        "capture_live_preview": False,
+        "clipboard_mode": "image",
+        "external_tool_mode": "spawn",
+        "external_tool_address": "",
+        "dictionary_paths": [],
     }
 
     def __init__(self, config_file=None, use_file_storage=True):
@@ -0,0 +1,186 @@
+import getpass
+import hashlib
+import json
+from typing import Callable, Dict, List, Optional
+
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
+
+from util.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class InstanceConfig:
+    """单实例与命令转发配置"""
+    # 连接已运行实例的超时（毫秒）
+    CONNECT_TIMEOUT_MS = 500
+    # 等待命令结果的默认超时（毫秒），截图需要等用户框选，因此较长
+    REPLY_TIMEOUT_MS = 120000
+
+
+def server_name() -> str:
+    """本地套接字名称，按用户区分，避免多用户系统上互相干扰"""
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = "default"
+    return "ocr-tool-" + hashlib.md5(user.encode("utf-8")).hexdigest()[:8]
+
+
+class CommandError(Exception):
+    """命令转发失败或已运行实例返回错误"""
+    pass
+
+
+def send_command(command: str, args: Optional[List[str]] = None,
+                 timeout_ms: int = InstanceConfig.REPLY_TIMEOUT_MS):
+    """把命令转发给已运行的实例并等待结果
+
+    协议为一行 JSON 请求 {"command", "args"}，一行 JSON 回复 {"ok", "result" | "error"}。
+
+    Returns:
+        已运行实例返回的结果
+
+    Raises:
+        ConnectionError: 没有正在运行的实例
+        CommandError: 命令执行失败或等待超时
+    """
+    socket = QLocalSocket()
+    socket.connectToServer(server_name())
+    if not socket.waitForConnected(InstanceConfig.CONNECT_TIMEOUT_MS):
+        raise ConnectionError("没有正在运行的实例")
+
+    request = json.dumps({"command": command, "args": args or []}, ensure_ascii=False)
+    socket.write((request + "\n").encode("utf-8"))
+    socket.waitForBytesWritten(InstanceConfig.CONNECT_TIMEOUT_MS)
+
+    buffer = b""
+    while b"\n" not in buffer:
+        if not socket.waitForReadyRead(timeout_ms):
+            socket.abort()
+            raise CommandError("等待结果超时" if socket.state() == QLocalSocket.LocalSocketState.ConnectedState
+                               else "连接已断开")
+        buffer += bytes(socket.readAll())
+    socket.disconnectFromServer()
+
+    reply = json.loads(buffer.split(b"\n", 1)[0].decode("utf-8"))
+    if not reply.get("ok"):
+        raise CommandError(reply.get("error", "命令执行失败"))
+    return reply.get("result")
+
+
+class CommandRequest:
+    """一次转发来的命令，处理函数可以立即或稍后（可在任意线程）回复"""
+
+    def __init__(self, server: "SingleInstanceServer", socket: QLocalSocket, command: str, args: List[str]):
+        self.command = command
+        self.args = args
+        self._server = server
+        self._socket = socket
+        self.replied = False
+
+    def reply(self, result=None):
+        """回复成功结果，结果需可序列化为 JSON"""
+        self._send({"ok": True, "result": result})
+
+    def fail(self, error: str):
+        """回复错误信息"""
+        self._send({"ok": False, "error": error})
+
+    def _send(self, payload: dict):
+        if self.replied:
+            return
+        self.replied = True
+        # 回复可能来自后台识别线程，通过信号回到主线程写套接字
+        self._server._reply_ready.emit(self._socket, payload)
+
+
+class SingleInstanceServer(QObject):
+    """单实例守护：第一个实例监听本地套接字，之后的启动把命令转发过来
+
+    处理函数签名为 handler(request: CommandRequest)，通过 request.reply / request.fail 回复。
+    """
+    _reply_ready = Signal(object, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._server = QLocalServer(self)
+        self._server.newConnection.connect(self._on_new_connection)
+        self._handlers: Dict[str, Callable[[CommandRequest], None]] = {}
+        self._buffers: Dict[QLocalSocket, bytes] = {}
+        self._reply_ready.connect(self._write_reply)
+
+    def listen(self) -> bool:
+        """开始监听，已有实例在运行时返回 False"""
+        name = server_name()
+        probe = QLocalSocket()
+        probe.connectToServer(name)
+        if probe.waitForConnected(InstanceConfig.CONNECT_TIMEOUT_MS):
+            probe.disconnectFromServer()
+            return False
+
+        # 上次异常退出可能遗留套接字文件
+        QLocalServer.removeServer(name)
+        self._server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        if not self._server.listen(name):
+            logger.error("单实例监听失败: %s", self._server.errorString())
+            return False
+        logger.info("单实例守护已启动: %s", name)
+        return True
+
+    def register(self, command: str, handler: Callable[[CommandRequest], None]):
+        """注册命令处理函数"""
+        self._handlers[command] = handler
+
+    def close(self):
+        """停止监听并断开所有客户端"""
+        for socket in list(self._buffers):
+            socket.disconnected.disconnect()
+            socket.abort()
+        self._buffers.clear()
+        self._server.close()
+
+    def _on_new_connection(self):
+        while self._server.hasPendingConnections():
+            socket = self._server.nextPendingConnection()
+            self._buffers[socket] = b""
+            socket.readyRead.connect(lambda s=socket: self._on_ready_read(s))
+            socket.disconnected.connect(lambda s=socket: self._on_disconnected(s))
+
+    def _on_disconnected(self, socket: QLocalSocket):
+        self._buffers.pop(socket, None)
+        socket.deleteLater()
+
+    def _on_ready_read(self, socket: QLocalSocket):
+        buffer = self._buffers.get(socket, b"") + bytes(socket.readAll())
+        if b"\n" not in buffer:
+            self._buffers[socket] = buffer
+            return
+        line, self._buffers[socket] = buffer.split(b"\n", 1)
+
+        try:
+            message = json.loads(line.decode("utf-8"))
+            request = CommandRequest(self, socket, str(message["command"]), list(message.get("args", [])))
+        except (ValueError, KeyError, TypeError) as e:
+            self._write_reply(socket, {"ok": False, "error": f"无效的请求: {e}"})
+            return
+
+        handler = self._handlers.get(request.command)
+        if handler is None:
+            request.fail(f"未知命令: {request.command}")
+            return
+
+        logger.info("收到转发命令: %s %s", request.command, request.args)
+        try:
+            handler(request)
+        except Exception as e:
+            logger.error("处理转发命令失败 (%s): %s", request.command, e)
+            request.fail(str(e))
+
+    def _write_reply(self, socket: QLocalSocket, payload: dict):
+        if socket not in self._buffers:
+            # 客户端已断开
+            return
+        socket.write((json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8"))
+        socket.flush()
@@ -0,0 +1,218 @@
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from core.ocr_result import OCRResult
+
+
+class TilingConfig:
+    """分块识别配置"""
+    # 图像长边超过该值时启用分块（与RapidOCR的 max_side_len 一致，超过后会被整体缩小）
+    TRIGGER_SIDE = 2000
+    # 分块边长和相邻分块的重叠宽度
+    TILE_SIZE = 1280
+    OVERLAP = 160
+    # 文本框距分块内侧边缘小于该值时视为被接缝截断
+    EDGE_MARGIN = 4
+    # 两个框的交集占较小框面积的比例超过该值视为重复
+    DUPLICATE_IOM = 0.6
+    # 被截断的框与同一行另一框的交集比例超过该值时视为被包含，否则两段需要拼接
+    CONTAINED_IOM = 0.9
+    # 并行识别的线程数，0 表示按CPU核数自动选择
+    MAX_WORKERS = 0
+
+
+@dataclass(frozen=True)
+class Tile:
+    """图像中的一个分块区域"""
+    x: int
+    y: int
+    width: int
+    height: int
+
+    def crop(self, image: np.ndarray) -> np.ndarray:
+        """返回分块对应的图像视图（不复制）"""
+        return image[self.y:self.y + self.height, self.x:self.x + self.width]
+
+
+def should_tile(width: int, height: int) -> bool:
+    """判断图像是否需要分块识别"""
+    return max(width, height) > TilingConfig.TRIGGER_SIDE
+
+
+def _axis_starts(length: int, tile_size: int, overlap: int) -> List[int]:
+    """计算单个方向上的分块起点，最后一块贴齐边缘"""
+    if length <= tile_size:
+        return [0]
+    step = tile_size - overlap
+    starts = list(range(0, length - tile_size, step))
+    starts.append(length - tile_size)
+    return starts
+
+
+def plan_tiles(width: int, height: int,
+               tile_size: int = TilingConfig.TILE_SIZE,
+               overlap: int = TilingConfig.OVERLAP) -> List[Tile]:
+    """将图像划分为带重叠的分块，按阅读顺序（先行后列）返回"""
+    tiles = []
+    for y in _axis_starts(height, tile_size, overlap):
+        for x in _axis_starts(width, tile_size, overlap):
+            tiles.append(Tile(x, y, min(tile_size, width - x), min(tile_size, height - y)))
+    return tiles
+
+
+def uncovered_strips(region: Tile, covered: Tile, overlap: int) -> List[Tile]:
+    """计算 region 中未被 covered 覆盖的条带（covered 须在 region 内）
+
+    每个条带向 covered 内部延伸 overlap 像素，使跨越边界的文本行能在条带中被完整识别，
+    之后由 merge_tile_results 去重。
+    """
+    strips = []
+    region_right, region_bottom = region.x + region.width, region.y + region.height
+    covered_right, covered_bottom = covered.x + covered.width, covered.y + covered.height
+
+    if covered.y > region.y:
+        bottom = min(covered.y + overlap, region_bottom)
+        strips.append(Tile(region.x, region.y, region.width, bottom - region.y))
+    if covered_bottom < region_bottom:
+        top = max(covered_bottom - overlap, region.y)
+        strips.append(Tile(region.x, top, region.width, region_bottom - top))
+    if covered.x > region.x:
+        right = min(covered.x + overlap, region_right)
+        strips.append(Tile(region.x, covered.y, right - region.x, covered.height))
+    if covered_right < region_right:
+        left = max(covered_right - overlap, region.x)
+        strips.append(Tile(left, covered.y, region_right - left, covered.height))
+    return strips
+
+
+def bounding_tile(first: Tile, second: Tile) -> Tile:
+    """两个区域的外接矩形"""
+    x, y = min(first.x, second.x), min(first.y, second.y)
+    right = max(first.x + first.width, second.x + second.width)
+    bottom = max(first.y + first.height, second.y + second.height)
+    return Tile(x, y, right - x, bottom - y)
+
+
+def reading_order(boxes: np.ndarray) -> np.ndarray:
+    """按阅读顺序（从上到下、同一行从左到右）返回行号排列
+
+    Args:
+        boxes: 轴对齐边界 (N, 4)，每行为 [min_x, max_x, min_y, max_y]
+    """
+    if len(boxes) == 0:
+        return np.zeros(0, dtype=np.intp)
+
+    centers_y = (boxes[:, 2] + boxes[:, 3]) / 2
+    heights = np.maximum(boxes[:, 3] - boxes[:, 2], 1)
+    order = np.argsort(centers_y, kind="stable")
+
+    # 中心高度差小于半个行高的框归为同一行
+    rows = np.empty(len(boxes), dtype=np.intp)
+    row, row_center = 0, centers_y[order[0]]
+    for index in order:
+        if centers_y[index] - row_center > heights[index] / 2:
+            row += 1
+            row_center = centers_y[index]
+        rows[index] = row
+    return np.lexsort((boxes[:, 0], rows))
+
+
+def _cut_flags(boxes: np.ndarray, tile_ids: np.ndarray, tiles: Sequence[Tile],
+               width: int, height: int) -> np.ndarray:
+    """标记被分块接缝截断的框（贴近分块内侧边缘、且该边缘不是整幅图像边缘）"""
+    margin = TilingConfig.EDGE_MARGIN
+    tile_rects = np.array([(t.x, t.x + t.width, t.y, t.y + t.height) for t in tiles], dtype=np.float32)
+    rects = tile_rects[tile_ids]
+
+    cut_left = (boxes[:, 0] - rects[:, 0] <= margin) & (rects[:, 0] > 0)
+    cut_right = (rects[:, 1] - boxes[:, 1] <= margin) & (rects[:, 1] < width)
+    cut_top = (boxes[:, 2] - rects[:, 2] <= margin) & (rects[:, 2] > 0)
+    cut_bottom = (rects[:, 3] - boxes[:, 3] <= margin) & (rects[:, 3] < height)
+    return cut_left | cut_right | cut_top | cut_bottom
+
+
+def _join_overlapping_text(left: str, right: str) -> str:
+    """拼接被接缝切开的两段文本，去掉重叠区域重复识别出的字符"""
+    for size in range(min(len(left), len(right)), 0, -1):
+        if left.endswith(right[:size]):
+            return left + right[size:]
+    return left + right
+
+
+def merge_tile_results(tile_results: Sequence[Tuple[Tile, OCRResult]],
+                       width: int, height: int, backend: str = "") -> OCRResult:
+    """合并各分块的识别结果
+
+    1. 将各分块坐标平移回整幅图像坐标系
+    2. 对重叠区域内重复识别的框去重，优先保留未被接缝截断、面积更大的框
+    3. 同一行上被接缝切成两段的框合并为一个框，文本按重叠部分拼接
+    4. 按阅读顺序输出
+    """
+    txts, polygons, scores, tile_ids = [], [], [], []
+    elapse = 0.0
+    for tile_index, (tile, result) in enumerate(tile_results):
+        elapse = max(elapse, result.elapse)
+        if not result:
+            continue
+        txts.extend(result.txts)
+        polygons.append(result.polygons + np.array([tile.x, tile.y], dtype=np.float32))
+        scores.append(result.scores)
+        tile_ids.append(np.full(len(result), tile_index, dtype=np.intp))
+
+    if not txts:
+        return OCRResult.empty(backend=backend, elapse=elapse)
+
+    merged = OCRResult(txts, np.concatenate(polygons), np.concatenate(scores), elapse, backend)
+    boxes = merged.boxes
+    tiles = [tile for tile, _ in tile_results]
+    cut = _cut_flags(boxes, np.concatenate(tile_ids), tiles, width, height)
+
+    areas = (boxes[:, 1] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 2])
+    # 未截断的优先，其次面积大的优先
+    priority = np.lexsort((-areas, cut))
+
+    # 所有框两两之间的交集，一次性计算
+    inter_w = np.clip(np.minimum(boxes[:, None, 1], boxes[None, :, 1]) -
+                      np.maximum(boxes[:, None, 0], boxes[None, :, 0]), 0, None)
+    inter_h = np.clip(np.minimum(boxes[:, None, 3], boxes[None, :, 3]) -
+                      np.maximum(boxes[:, None, 2], boxes[None, :, 2]), 0, None)
+    intersection = inter_w * inter_h
+    min_area = np.maximum(np.minimum(areas[:, None], areas[None, :]), 1e-6)
+    iom = intersection / min_area
+    heights = np.maximum(boxes[:, 3] - boxes[:, 2], 1e-6)
+    vertical_overlap = inter_h / np.minimum(heights[:, None], heights[None, :])
+
+    kept: List[int] = []
+    texts = list(merged.txts)
+    polys = merged.polygons.copy()
+    line_scores = merged.scores.copy()
+    for index in priority.tolist():
+        duplicate = False
+        for kept_index in kept:
+            overlap = iom[index, kept_index]
+            if overlap <= 0:
+                continue
+            # 同一行上被接缝切开的两段：垂直方向基本重合，且较小的一段没有被完全包含
+            if ((cut[index] or cut[kept_index]) and vertical_overlap[index, kept_index] > 0.6
+                    and overlap < TilingConfig.CONTAINED_IOM):
+                left, right = sorted((kept_index, index), key=lambda i: boxes[i, 0])
+                texts[kept_index] = _join_overlapping_text(texts[left], texts[right])
+                x0 = min(boxes[index, 0], boxes[kept_index, 0])
+                x1 = max(boxes[index, 1], boxes[kept_index, 1])
+                y0 = min(boxes[index, 2], boxes[kept_index, 2])
+                y1 = max(boxes[index, 3], boxes[kept_index, 3])
+                polys[kept_index] = [[x0, y0], [x1, y0], [x1, y1], [x0, y1]]
+                line_scores[kept_index] = min(line_scores[kept_index], line_scores[index])
+                duplicate = True
+                break
+            if overlap >= TilingConfig.DUPLICATE_IOM:
+                duplicate = True
+                break
+        if not duplicate:
+            kept.append(index)
+
+    kept_array = np.array(kept, dtype=np.intp)
+    result = OCRResult([texts[i] for i in kept], polys[kept_array], line_scores[kept_array], elapse, backend)
+    return result.select(reading_order(result.boxes))
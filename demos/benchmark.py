@@ -0,0 +1,192 @@
+"""OCR后端基准测试
+
+在同一批输入图片上对比各后端（及模型精度档位、预处理档位）的加载耗时、单张延迟、内存和识别结果。
+指定预处理档位时按引擎的方式估计文字大小、缩放输入并设置检测尺寸，
+延迟包含这部分耗时，prep(ms) 列单独给出其平均耗时。
+
+精度以字符错误率(CER)表示：图片旁有同名 .txt 标注时与标注比较，否则与第一个档位（通常为FP32）的结果比较。
+
+用法:
+    python -m demos.benchmark --backends rapidocr stub --repeat 5
+    python -m demos.benchmark --backends rapidocr --profiles fp32 int8
+    python -m demos.benchmark --backends rapidocr --preprocess off screen subpixel
+"""
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+import numpy as np
+from PySide6.QtGui import QImage
+
+from core.input_scaling import InputScaler, ScalePlan
+from core.ocr_backends import available_backends, create_backend
+from core.preprocess import Preprocessor
+from util.utils import PathConfig, qimage_to_bgr
+
+try:
+    import psutil
+except ImportError:  # 可选依赖，没有时只报告模型文件估算的内存
+    psutil = None
+
+DEFAULT_IMAGE_DIR = PathConfig.project_root / "ocr_error_images"
+
+
+def collect_images(image_dir: Path):
+    """收集待测图片路径"""
+    return sorted(str(path) for path in image_dir.glob("*.png"))
+
+
+def load_image(path: str) -> np.ndarray:
+    """读取为BGR数组（与截图相同的输入格式）"""
+    return np.array(qimage_to_bgr(QImage(path)))
+
+
+def process_memory():
+    """当前进程的常驻内存（字节），无法获取时返回 None"""
+    return psutil.Process().memory_info().rss if psutil else None
+
+
+def edit_distance(a: str, b: str) -> int:
+    """编辑距离（Levenshtein）"""
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def load_references(images):
+    """图片旁的同名 .txt 标注文件"""
+    references = {}
+    for image in images:
+        label = Path(image).with_suffix(".txt")
+        if label.exists():
+            references[Path(image).name] = label.read_text(encoding="utf-8")
+    return references
+
+
+def character_error_rate(texts, references):
+    """按字符统计的错误率，只统计有参考文本的图片；忽略空白和换行差异"""
+    errors = total = 0
+    for image_name, reference in references.items():
+        if image_name not in texts:
+            continue
+        expected = "".join(reference.split())
+        errors += edit_distance("".join("".join(texts[image_name]).split()), expected)
+        total += len(expected)
+    return errors / total if total else None
+
+
+def benchmark_backend(name, images, repeat, profile=None, preprocess=None):
+    """对单个后端（指定精度档位、预处理档位时按该档位）进行测试，返回统计信息"""
+    backend = create_backend(name, **({"profile": profile} if profile else {}))
+    preprocessor = Preprocessor(preprocess) if preprocess else None
+
+    memory_before = process_memory()
+    start_time = time.perf_counter()
+    backend.load()
+    load_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    backend.warmup()
+    warmup_time = time.perf_counter() - start_time
+    memory_after = process_memory()
+    model_bytes = backend.resident_model_bytes()
+
+    latencies = []
+    prep_times = []
+    texts = {}
+    for image in images:
+        data = load_image(image) if preprocessor else image
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            if preprocessor:
+                plan = InputScaler().plan(data) if preprocessor.resizes else ScalePlan("")
+                prepared = preprocessor.apply(data, scale=plan.scale)
+                prep_times.append(time.perf_counter() - start_time)
+                height, width = prepared.image.shape[:2]
+                result = prepared.restore(backend.infer(prepared.image, det_limit=plan.det_limit(width, height)))
+            else:
+                result = backend.infer(data)
+            latencies.append(time.perf_counter() - start_time)
+        texts[Path(image).name] = list(result.txts)
+
+    backend.unload()
+    label = f"{name}/{profile}" if profile else name
+    return {
+        "backend": f"{label}+{preprocess}" if preprocess else label,
+        "model_mb": model_bytes / 1e6,
+        "rss_mb": (memory_after - memory_before) / 1e6 if memory_before is not None else None,
+        "load": load_time,
+        "warmup": warmup_time,
+        "mean": statistics.mean(latencies) if latencies else 0.0,
+        "p50": statistics.median(latencies) if latencies else 0.0,
+        "max": max(latencies) if latencies else 0.0,
+        "prep": statistics.mean(prep_times) * 1000 if prep_times else None,
+        "texts": texts,
+    }
+
+
+def format_optional(value, width, spec):
+    return f"{'-':>{width}}" if value is None else f"{value:>{width}{spec}}"
+
+
+def print_report(reports):
+    """打印对比报告"""
+    print(f"{'backend':<28}{'load(s)':>10}{'warmup(s)':>12}{'mean(ms)':>12}{'p50(ms)':>12}{'max(ms)':>12}"
+          f"{'prep(ms)':>10}{'model(MB)':>12}{'rss(MB)':>10}{'CER':>8}")
+    for report in reports:
+        print(f"{report['backend']:<28}{report['load']:>10.2f}{report['warmup']:>12.2f}"
+              f"{report['mean'] * 1000:>12.1f}{report['p50'] * 1000:>12.1f}{report['max'] * 1000:>12.1f}"
+              f"{format_optional(report['prep'], 10, '.2f')}"
+              f"{report['model_mb']:>12.1f}{format_optional(report['rss_mb'], 10, '.1f')}"
+              f"{format_optional(report.get('cer'), 8, '.2%')}")
+
+    print()
+    for report in reports:
+        print(f"[{report['backend']}]")
+        for image_name, txts in report["texts"].items():
+            print(f"  {image_name}: {txts}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR后端基准测试")
+    parser.add_argument("--backends", nargs="+", default=available_backends())
+    parser.add_argument("--images", type=Path, default=DEFAULT_IMAGE_DIR)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--profiles", nargs="+", default=[None],
+                        help="模型精度档位（如 fp32 int8），第一个档位作为没有标注时的精度基准")
+    parser.add_argument("--preprocess", nargs="+", default=[None],
+                        help="预处理档位（off screen subpixel），不指定时直接把图片路径交给后端")
+    args = parser.parse_args()
+
+    images = collect_images(args.images)
+    if not images:
+        print(f"未找到测试图片: {args.images}")
+        return
+
+    references = load_references(images)
+    reports = []
+    for name in args.backends:
+        baseline = references
+        for profile in args.profiles:
+            for preprocess in args.preprocess:
+                try:
+                    report = benchmark_backend(name, images, args.repeat, profile, preprocess)
+                except Exception as e:
+                    print(f"后端 {name} ({profile}, {preprocess}) 测试失败: {e}")
+                    continue
+                if not baseline:
+                    # 没有标注时以该后端第一个档位的结果为基准，报告其它档位的精度差异
+                    baseline = {image_name: "".join(txts) for image_name, txts in report["texts"].items()}
+                report["cer"] = character_error_rate(report["texts"], baseline)
+                reports.append(report)
+
+    print_report(reports)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""将内置的FP32 ONNX模型量化为INT8
+
+- dynamic: 只量化权重，无需校准数据，适合识别(rec)和分类(cls)模型
+- static:  权重和激活都量化（QDQ格式），用本地截图生成校准数据；检测(det)模型对激活量化较敏感，建议对比精度后再用
+
+输出文件与原模型同目录，文件名为 <原名>.int8.onnx，在设置中将模型精度选为 INT8 即可使用，
+再用 python -m demos.benchmark --profiles fp32 int8 对比延迟、内存和精度。
+
+用法:
+    python -m demos.quantize_models --mode dynamic
+    python -m demos.quantize_models --mode static --images ocr_error_images --kinds det rec
+"""
+import argparse
+import math
+import time
+from pathlib import Path
+
+import numpy as np
+import onnxruntime
+from onnxruntime.quantization import (CalibrationDataReader, QuantFormat, QuantType, quantize_dynamic,
+                                      quantize_static)
+from PySide6.QtCore import QRect, Qt
+from PySide6.QtGui import QImage
+
+from core.model_profiles import ModelProfile, is_profile_model, profile_model_path
+from util.utils import PathConfig, qimage_to_bgr
+
+DEFAULT_IMAGE_DIR = PathConfig.project_root / "ocr_error_images"
+KINDS = ["det", "rec", "cls"]
+
+# 与 PP-OCR 推理时一致的预处理参数
+DET_MAX_SIDE = 960
+DET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+DET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+REC_HEIGHT, REC_MAX_WIDTH = 48, 320
+CLS_SHAPE = (48, 192)
+# 每个模型最多使用的校准样本数
+MAX_SAMPLES = 200
+
+
+def model_kind(path: Path):
+    """按文件名判断模型类型（det/rec/cls）"""
+    for kind in KINDS:
+        if f"_{kind}" in path.stem:
+            return kind
+    return None
+
+
+def collect_models(kinds):
+    """内置的FP32模型（跳过已量化的模型）"""
+    models = sorted(PathConfig.models_dir.glob("*/*.onnx"))
+    return [path for path in models if not is_profile_model(str(path)) and model_kind(path) in kinds]
+
+
+def to_chw(bgr: np.ndarray, mean, std) -> np.ndarray:
+    """HWC BGR uint8 -> 1xCxHxW float32"""
+    data = (bgr.astype(np.float32) / 255.0 - mean) / std
+    return np.ascontiguousarray(data.transpose(2, 0, 1)[np.newaxis])
+
+
+def resize(image: QImage, width: int, height: int) -> np.ndarray:
+    scaled = image.scaled(width, height, Qt.AspectRatioMode.IgnoreAspectRatio,
+                          Qt.TransformationMode.SmoothTransformation)
+    return np.array(qimage_to_bgr(scaled))
+
+
+def det_sample(image: QImage) -> np.ndarray:
+    """整张截图，长边不超过 DET_MAX_SIDE，宽高取32的倍数"""
+    scale = min(DET_MAX_SIDE / max(image.width(), image.height()), 1.0)
+    width = max(int(round(image.width() * scale / 32)) * 32, 32)
+    height = max(int(round(image.height() * scale / 32)) * 32, 32)
+    return to_chw(resize(image, width, height), DET_MEAN, DET_STD)
+
+
+def line_sample(line: QImage, height: int, max_width: int) -> np.ndarray:
+    """文本行缩放到固定高度，宽度按比例（不超过 max_width），右侧补零"""
+    width = min(max(int(math.ceil(height * line.width() / max(line.height(), 1))), 1), max_width)
+    data = to_chw(resize(line, width, height), 0.5, 0.5)
+    padded = np.zeros((1, 3, height, max_width), dtype=np.float32)
+    padded[:, :, :, :width] = data
+    return padded
+
+
+def text_lines(images):
+    """用FP32模型检测截图中的文本行，作为识别和分类模型的校准样本"""
+    from core.ocr_backends import create_backend
+
+    backend = create_backend("rapidocr", lang="ch")
+    backend.load()
+    for image in images:
+        result = backend.infer(qimage_to_bgr(image))
+        for polygon in result.polygons if result.polygons is not None else []:
+            xs, ys = [point[0] for point in polygon], [point[1] for point in polygon]
+            rect = QRect(int(min(xs)), int(min(ys)), int(max(xs) - min(xs)) + 1, int(max(ys) - min(ys)) + 1)
+            if rect.width() > 4 and rect.height() > 4:
+                yield image.copy(rect)
+    backend.unload()
+
+
+class SampleReader(CalibrationDataReader):
+    """把预处理好的样本逐个交给量化校准"""
+
+    def __init__(self, input_name: str, samples):
+        self.input_name = input_name
+        self._samples = iter(samples)
+
+    def get_next(self):
+        sample = next(self._samples, None)
+        return None if sample is None else {self.input_name: sample}
+
+
+def calibration_samples(kind: str, images, lines):
+    if kind == "det":
+        return [det_sample(image) for image in images[:MAX_SAMPLES]]
+    if kind == "rec":
+        return [line_sample(line, REC_HEIGHT, REC_MAX_WIDTH) for line in lines[:MAX_SAMPLES]]
+    return [line_sample(line, *CLS_SHAPE) for line in lines[:MAX_SAMPLES]]
+
+
+def quantize_model(path: Path, mode: str, images, lines):
+    output = Path(profile_model_path(str(path), ModelProfile.INT8))
+    start_time = time.perf_counter()
+    if mode == "dynamic":
+        quantize_dynamic(str(path), str(output), weight_type=QuantType.QInt8)
+    else:
+        samples = calibration_samples(model_kind(path), images, lines)
+        if not samples:
+            raise RuntimeError("没有可用的校准样本")
+        input_name = onnxruntime.InferenceSession(
+            str(path), providers=["CPUExecutionProvider"]).get_inputs()[0].name
+        quantize_static(str(path), str(output), SampleReader(input_name, samples),
+                        quant_format=QuantFormat.QDQ, per_channel=True,
+                        activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+    elapsed = time.perf_counter() - start_time
+    print(f"{path.parent.name}/{path.name} -> {output.name}: "
+          f"{path.stat().st_size / 1e6:.1f} MB -> {output.stat().st_size / 1e6:.1f} MB ({elapsed:.1f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="量化内置OCR模型为INT8")
+    parser.add_argument("--mode", choices=["dynamic", "static"], default="dynamic")
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=KINDS)
+    parser.add_argument("--images", type=Path, default=DEFAULT_IMAGE_DIR, help="校准用的截图目录（static模式）")
+    args = parser.parse_args()
+
+    models = collect_models(args.kinds)
+    if not models:
+        print(f"未找到模型: {PathConfig.models_dir}")
+        return
+
+    images, lines = [], []
+    if args.mode == "static":
+        images = [QImage(str(path)) for path in sorted(args.images.glob("*.png"))]
+        images = [image for image in images if not image.isNull()]
+        if not images:
+            print(f"未找到校准图片: {args.images}")
+            return
+        if {"rec", "cls"} & set(args.kinds):
+            lines = list(text_lines(images))
+        print(f"校准样本: {len(images)} 张截图, {len(lines)} 个文本行")
+
+    for path in models:
+        try:
+            quantize_model(path, args.mode, images, lines)
+        except Exception as e:
+            print(f"{path.name} 量化失败: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import threading
+import time
+
+import pytest
+
+from core.engine_pool import EnginePool, PoolClosedError, PoolConfig, Priority
+
+
+def make_pool(size=1):
+    pool = EnginePool("stub", size)
+    pool.load()
+    return pool
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "等待超时"
+        time.sleep(0.005)
+
+
+def test_checkout_returns_session():
+    pool = make_pool()
+    with pool.checkout() as backend:
+        assert backend.is_loaded
+        assert pool.stats()["idle"] == 0
+    stats = pool.stats()
+    assert stats["idle"] == 1 and stats["sessions"] == 1
+    assert stats["priorities"]["capture"]["checkouts"] == 1
+
+
+def start_waiter(pool, priority, order):
+    def run():
+        with pool.checkout(priority):
+            order.append(priority)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_waiters_served_by_priority():
+    pool = make_pool()
+    order = []
+    backend = pool.acquire()
+    threads = []
+    for priority in (Priority.BATCH, Priority.WATCH, Priority.HOVER):
+        threads.append(start_waiter(pool, priority, order))
+        wait_until(lambda: sum(pool.stats()["waiting"].values()) == len(threads))
+    pool.release(backend)
+    for thread in threads:
+        thread.join(2)
+    assert order == [Priority.HOVER, Priority.WATCH, Priority.BATCH]
+
+
+def test_interactive_streak_lets_batch_through():
+    pool = make_pool()
+    order = []
+    backend = pool.acquire()
+    batch = start_waiter(pool, Priority.BATCH, order)
+    wait_until(lambda: pool.stats()["waiting"].get("batch") == 1)
+    # 高优先级请求连续获得会话达到上限后，让等待中的批量请求先走一次
+    pool._interactive_streak = PoolConfig.INTERACTIVE_STREAK
+    hover = start_waiter(pool, Priority.HOVER, order)
+    wait_until(lambda: pool.stats()["waiting"].get("hover") == 1)
+    pool.release(backend)
+    batch.join(2)
+    hover.join(2)
+    assert order == [Priority.BATCH, Priority.HOVER]
+
+
+def test_grows_when_busy():
+    pool = make_pool(size=2)
+    first = pool.acquire()
+    second = pool.acquire()
+    assert first is not second
+    assert pool.stats()["sessions"] == 2
+    pool.release(first)
+    pool.release(second)
+
+
+def test_evict_idle_keeps_one_unloaded_session():
+    pool = make_pool(size=2)
+    first, second = pool.acquire(), pool.acquire()
+    pool.release(first)
+    pool.release(second)
+
+    assert pool.evict_idle(3600) == []
+    evicted = pool.evict_idle(0)
+    assert evicted == ["stub x2"]
+    stats = pool.stats()
+    assert stats["sessions"] == 1 and stats["idle"] == 1 and stats["cold"] == 1
+
+    assert pool.prewarm()
+    assert pool.stats()["cold"] == 0
+    with pool.checkout() as backend:
+        assert backend.is_loaded
+
+
+def test_evict_idle_skips_busy_pool():
+    pool = make_pool()
+    backend = pool.acquire()
+    assert pool.evict_idle(0) == []
+    assert backend.is_loaded
+    pool.release(backend)
+
+
+def test_close_wakes_waiters():
+    pool = make_pool()
+    backend = pool.acquire()
+    errors = []
+
+    def run():
+        try:
+            pool.acquire(Priority.BATCH)
+        except PoolClosedError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    wait_until(lambda: pool.stats()["waiting"])
+    pool.close()
+    thread.join(2)
+    assert len(errors) == 1
+    pool.release(backend)
+    assert not backend.is_loaded
+    with pytest.raises(PoolClosedError):
+        pool.acquire()
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from core.incremental_ocr import (IncrementalOCR, changed_bands, estimate_vertical_shifts, ink_rows,
+                                  match_shifted_rows, row_profiles, tile_fingerprints)
+from core.tiling import Tile
+from core.ocr_engine import OCREngine
+
+
+def text_lines(rng, count, width, line_height=12, gap=12):
+    """白底上的若干行随机“文字”，行高 line_height、行距 gap"""
+    image = np.full((count * (line_height + gap), width, 3), 255, dtype=np.uint8)
+    for i in range(count):
+        top = i * (line_height + gap) + gap // 2
+        ink = rng.random((line_height, width - 20)) < 0.3
+        image[top:top + line_height, 10:width - 10][ink] = 0
+    return image
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return OCREngine("stub", 1)
+
+
+def test_tile_fingerprints_locate_change():
+    image = np.full((100, 130, 3), 255, dtype=np.uint8)
+    before = tile_fingerprints(image)
+    assert before.shape == (4, 5, 2)
+    image[70, 100] = 0
+    changed = (tile_fingerprints(image) != before).any(axis=2)
+    assert np.argwhere(changed).tolist() == [[2, 3]]
+
+
+def test_changed_bands_merge_adjacent_rows():
+    bands = changed_bands(np.array([False, True, True, False, False, True]), 32, 180, 300, margin=8)
+    assert bands == [Tile(0, 24, 300, 80), Tile(0, 152, 300, 28)]
+
+
+def test_estimate_vertical_shift():
+    page = text_lines(np.random.default_rng(5), 12, 200)
+    previous, current = row_profiles(page[40:240]), row_profiles(page[10:210])
+    shifts = estimate_vertical_shifts(previous, current, 150)
+    assert 30 in shifts[:3]
+    assert match_shifted_rows(previous, current, 30)[30:].all()
+
+
+def test_ink_rows():
+    image = np.full((4, 9, 3), 255, dtype=np.uint8)
+    image[1, 4] = 0
+    image[2] = 40
+    assert ink_rows(row_profiles(image), 9).tolist() == [False, True, False, False]
+
+
+def test_in_place_change_on_blank_frame_is_not_scroll(engine):
+    rng = np.random.default_rng(1)
+    first = np.full((300, 400, 3), 255, dtype=np.uint8)
+    second = first.copy()
+    first[140:152, 10:390] = text_lines(rng, 1, 400, gap=0)[:, 10:390]
+    second[140:152, 10:390] = text_lines(rng, 1, 400, gap=0)[:, 10:390]
+
+    ocr = IncrementalOCR(engine)
+    ocr.update(first)
+    diff = ocr.update(second)
+    assert diff.shift == 0
+
+
+def test_scroll_reuses_previous_rows(engine):
+    rng = np.random.default_rng(2)
+    page = text_lines(rng, 20, 400)
+    ocr = IncrementalOCR(engine)
+    ocr.update(page[48:348])
+    diff = ocr.update(page[24:324])
+    assert diff.shift == 24
+
+
+def test_unchanged_frame(engine):
+    image = text_lines(np.random.default_rng(3), 5, 200)
+    ocr = IncrementalOCR(engine)
+    assert ocr.update(image).recognized_ratio == 1.0
+    diff = ocr.update(image.copy())
+    assert not diff.changed and diff.recognized_ratio == 0
+
+
+def test_frames_go_through_input_scaling():
+    engine = OCREngine("stub", 1)
+    image = text_lines(np.random.default_rng(4), 8, 300, line_height=8)
+    ocr = IncrementalOCR(engine)
+    diff = ocr.update(image, screen="watch")
+    assert "watch" in engine.stats()["scaling"]
+    height, width = image.shape[:2]
+    assert np.allclose(diff.result.boxes[0], [0, width, 0, height])
@@ -0,0 +1,49 @@
+import numpy as np
+
+from core.input_scaling import InputScaler, ScalePlan, ScalingConfig, scale_for_glyph, screen_key
+from core.ocr_backends import DetLimit
+from core.ocr_result import OCRResult
+
+
+def test_det_limit_unknown_glyph_uses_backend_default():
+    assert ScalePlan("@1x").det_limit(800, 600) is None
+
+
+def test_det_limit_keeps_input_size():
+    plan = ScalePlan("@1x", 2.0, 10.0, "measured")
+    assert plan.det_limit(800, 600) == DetLimit(600, "min")
+    assert plan.det_limit(300, 1200) == DetLimit(300, "min")
+    # 检测模型的最小输入
+    assert plan.det_limit(400, 20) == DetLimit(ScalingConfig.DET_MIN_SIDE, "min")
+
+
+def test_scale_for_glyph():
+    assert scale_for_glyph(24, 800, 600) == 1.0
+    assert scale_for_glyph(10, 400, 100) == 3.0
+    assert scale_for_glyph(12, 400, 100) == 2.0
+    # 放大后长边不超过分块阈值
+    assert scale_for_glyph(8, ScalingConfig.MAX_UPSCALED_SIDE // 2, 100) == 2.0
+    assert scale_for_glyph(8, ScalingConfig.MAX_UPSCALED_SIDE, 100) == 1.0
+    assert scale_for_glyph(60, 800, 600) == 0.5
+    assert scale_for_glyph(500, 800, 600) == 1.0 / ScalingConfig.MAX_DOWNSCALE
+
+
+def test_screen_key():
+    assert screen_key("HDMI-1", 2.0) == "HDMI-1"
+    assert screen_key(None, 1.5) == "@1.5x"
+
+
+def test_feedback_remembers_glyph_height():
+    scaler = InputScaler()
+    blank = np.full((100, 200, 3), 255, dtype=np.uint8)
+    assert scaler.plan(blank, "s").glyph_height is None
+
+    good = OCRResult(["a"], [[[0, 0], [1, 0], [1, 1], [0, 1]]], [0.95])
+    scaler.feedback(ScalePlan("s", 2.0, 10.0, "measured"), good)
+    plan = scaler.plan(blank, "s")
+    assert plan.source == "remembered" and plan.glyph_height == 10.0 and plan.scale == 3.0
+
+    # 置信度低或不是本次测得的值不记住
+    scaler.feedback(ScalePlan("s", 1.0, 30.0, "remembered"), good)
+    scaler.feedback(ScalePlan("s", 1.0, 30.0, "measured"), OCRResult(["a"], good.polygons, [0.3]))
+    assert scaler.stats() == {"s": 10.0}
@@ -0,0 +1,85 @@
+import numpy as np
+
+from core.line_finder import estimate_glyph_height, find_single_line
+
+
+def blank(height, width, value=255):
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+def draw_text(image, y, height, x0, x1, color=0):
+    """用竖线模拟一段文字（笔画占比约三分之一）"""
+    image[y:y + height, x0:x1:3] = color
+    return image
+
+
+def test_single_line_found():
+    image = draw_text(blank(60, 300), 22, 14, 40, 200)
+    x0, y0, x1, y1 = find_single_line(image)
+    assert y0 < 22 and y1 > 36 and y1 - y0 < 30
+    assert x0 < 40 and x1 > 198
+
+
+def test_dark_theme():
+    image = draw_text(blank(60, 300, 30), 22, 14, 40, 200, color=230)
+    assert find_single_line(image) is not None
+
+
+def test_multiple_lines_rejected():
+    image = draw_text(blank(80, 300), 10, 12, 40, 200)
+    draw_text(image, 40, 12, 40, 200)
+    assert find_single_line(image) is None
+
+
+def test_line_cut_by_edge_ignored():
+    # 上边缘被截断的行不计入，剩下完整的一行
+    image = draw_text(blank(60, 300), 0, 10, 40, 200)
+    draw_text(image, 30, 12, 40, 200)
+    box = find_single_line(image)
+    assert box is not None and box[1] >= 20
+
+
+def test_picks_segment_under_cursor():
+    image = draw_text(blank(60, 400), 22, 14, 20, 120)
+    draw_text(image, 22, 14, 250, 380)
+    x0, _, x1, _ = find_single_line(image, cursor=(300, 30))
+    assert x0 > 200 and x1 > 370
+
+
+def test_cursor_away_from_line():
+    image = draw_text(blank(100, 300), 10, 14, 40, 200)
+    assert find_single_line(image, cursor=(100, 90)) is None
+
+
+def test_complex_background_rejected():
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, (60, 300, 3), dtype=np.uint8)
+    assert find_single_line(image) is None
+    assert estimate_glyph_height(image) is None
+
+
+def test_estimate_glyph_height():
+    image = blank(200, 600)
+    for y in range(10, 190, 30):
+        draw_text(image, y, 16, 20, 580)
+    assert estimate_glyph_height(image) == 16
+
+
+def test_estimate_glyph_height_columns_offset():
+    # 两栏的行错开，按竖条分别投影时不会把两栏的行合并
+    image = blank(200, 1024)
+    for y in range(10, 180, 30):
+        draw_text(image, y, 12, 20, 500)
+        draw_text(image, y + 10, 12, 530, 1000)
+    assert estimate_glyph_height(image) == 12
+
+
+def test_estimate_glyph_height_wide_image_sampled():
+    image = blank(120, 4000)
+    for y in range(10, 110, 25):
+        image[y:y + 10, 20:3980] = 0
+    assert estimate_glyph_height(image) == 10
+
+
+def test_estimate_glyph_height_no_text():
+    assert estimate_glyph_height(blank(100, 100)) is None
@@ -0,0 +1,78 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from core.mdx_dict import MDictIndex, normalize_key, ripemd128
+
+
+@pytest.mark.parametrize("message, digest", [
+    (b"", "cdf26213a150dc3ecb610f18f6b38b46"),
+    (b"a", "86be7afa339d0fc7cfc785e72f578d33"),
+    (b"abc", "c14a12199c66e4ba84636b0f69144c77"),
+    (b"message digest", "9e327b3d6e523062afc1132d7df9d1b8"),
+    (b"1234567890" * 8, "3f45ef194732c2dbb2c4a2c769795fa3"),
+])
+def test_ripemd128(message, digest):
+    assert ripemd128(message).hex() == digest
+
+
+class FakeMDict:
+    """只提供建立索引所需接口的词典文件"""
+    encoding = "UTF-8"
+
+    def __init__(self, path, keys):
+        self.path = Path(path)
+        self.path.write_bytes(b"mdx")
+        self.keys = keys
+
+    def iter_keys(self):
+        # 记录按文件顺序存放，每条10字节
+        for i, key in enumerate(self.keys):
+            yield i * 10, key
+
+    def record_blocks(self):
+        return np.array([100]), np.array([50]), np.array([0, len(self.keys) * 10])
+
+
+@pytest.fixture
+def index(tmp_path):
+    mdict = FakeMDict(tmp_path / "test.mdx", ["banana", "Apple", "apple ", "apply", "zebra", "app", "中文"])
+    MDictIndex.build(mdict, tmp_path / "test.idx")
+    index = MDictIndex(tmp_path / "test.idx")
+    yield index
+    index.close()
+
+
+def test_normalize_key():
+    assert normalize_key("  Straße ") == "strasse"
+
+
+def test_index_sorted_by_normalized_key(index):
+    assert index.count == 7
+    keys = [index.norm_key(i) for i in range(index.count)]
+    assert keys == sorted(keys)
+    assert index.encoding == "UTF-8"
+
+
+def test_find(index):
+    found = index.find("APPLE")
+    assert sorted(index.key(i) for i in found) == ["Apple", "apple "]
+    # 记录区间对应原始顺序中的位置，最后一条到记录流末尾
+    assert sorted((int(index.record_starts[i]), int(index.record_ends[i])) for i in found) == [(10, 20), (20, 30)]
+    last = index.find("中文")
+    assert [(int(index.record_starts[i]), int(index.record_ends[i])) for i in last] == [(60, 70)]
+    assert len(index.find("missing")) == 0
+
+
+def test_prefix_range(index):
+    assert sorted(index.key(i) for i in index.prefix_range("app")) == ["Apple", "app", "apple ", "apply"]
+    assert [index.key(i) for i in index.prefix_range("z")] == ["zebra"]
+    assert len(index.prefix_range("q")) == 0
+
+
+def test_is_fresh(index, tmp_path):
+    source = tmp_path / "test.mdx"
+    assert index.is_fresh(source)
+    source.write_bytes(b"changed")
+    assert not index.is_fresh(source)
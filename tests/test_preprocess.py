@@ -0,0 +1,78 @@
+import numpy as np
+
+from core.ocr_result import OCRResult
+from core.preprocess import PreparedImage, Preprocessor, PreprocessOptions, PreprocessProfile
+
+
+def test_plain_image_is_untouched():
+    image = np.full((100, 200, 3), 255, dtype=np.uint8)
+    image[40:60, 20:180] = 0
+    prepared = Preprocessor().apply(image)
+    assert prepared.image is image and prepared.scale == 1.0 and prepared.steps == []
+
+
+def test_dark_background_inverted():
+    image = np.full((100, 200, 3), 20, dtype=np.uint8)
+    image[40:60, 20:180] = 240
+    prepared = Preprocessor().apply(image)
+    assert "invert" in prepared.steps
+    assert prepared.image[0, 0, 0] == 235 and prepared.image[50, 50, 0] == 15
+
+
+def test_low_contrast_stretched():
+    image = np.full((100, 200, 3), 180, dtype=np.uint8)
+    image[:50] = 120
+    prepared = Preprocessor().apply(image)
+    assert prepared.steps == ["contrast"]
+    assert prepared.image.min() == 0 and prepared.image.max() == 255
+
+
+def test_lut_matches_per_pixel_levels():
+    rng = np.random.default_rng(0)
+    image = rng.integers(100, 180, (64, 64, 3), dtype=np.uint8)
+    prepared = Preprocessor().apply(image)
+    table = Preprocessor()._levels_table(image, [])
+    assert np.array_equal(prepared.image, table[image])
+
+
+def test_off_profile_skips_everything():
+    image = np.full((20, 20, 3), 10, dtype=np.uint8)
+    prepared = Preprocessor(PreprocessProfile.OFF).apply(image, 2.0)
+    assert prepared.image is image and not Preprocessor(PreprocessProfile.OFF).resizes
+
+
+def test_small_image_upscaled():
+    image = np.full((20, 100, 3), 255, dtype=np.uint8)
+    image[5:15, 10:90:3] = 0
+    prepared = Preprocessor().apply(image)
+    assert prepared.scale == 3.0 and prepared.image.shape == (60, 300, 3)
+    assert np.array_equal(prepared.image[::3, ::3], image)
+
+
+def test_downscale_block_average():
+    image = np.zeros((1200, 2000, 3), dtype=np.uint8)
+    image[:, 1::2] = 200
+    image[0:2, 0:3] = 255
+    preprocessor = Preprocessor()
+    preprocessor.options = PreprocessOptions(invert=False, contrast=False)
+    prepared = preprocessor.apply(image, scale=0.5)
+    assert prepared.scale == 0.5 and prepared.image.shape == (600, 1000, 3)
+    assert prepared.image[1, 1, 0] == 100
+    assert prepared.image[0, 0, 0] == 255
+    assert prepared.image[0, 1, 0] == (255 * 2 + 200 * 2) // 4
+
+
+def test_hidpi_downscale():
+    image = np.full((1200, 2000, 3), 255, dtype=np.uint8)
+    prepared = Preprocessor().apply(image, dpi_ratio=2.0)
+    assert prepared.scale == 0.5 and prepared.image.shape == (600, 1000, 3)
+
+
+def test_restore():
+    result = OCRResult(["a"], [[[30, 60], [90, 60], [90, 90], [30, 90]]], [0.9], 0.1, "stub")
+    restored = PreparedImage(np.zeros((1, 1, 3), np.uint8), 3.0).restore(result)
+    assert np.allclose(restored.boxes[0], [10, 30, 20, 30])
+    assert restored.txts == ("a",) and restored.backend == "stub"
+    restored = PreparedImage(np.zeros((1, 1, 3), np.uint8), 0.5).restore(result)
+    assert np.allclose(restored.boxes[0], [60, 180, 120, 180])
+    assert PreparedImage(np.zeros((1, 1, 3), np.uint8)).restore(result) is result
@@ -0,0 +1,98 @@
+import numpy as np
+
+from core.ocr_engine import OCREngine
+from core.ocr_result import OCRResult
+from core.tiling import (Tile, bounding_tile, merge_tile_results, plan_tiles, reading_order,
+                         should_tile, uncovered_strips)
+
+
+def line(text, x0, y0, x1, y1, score=0.9):
+    return OCRResult([text], [[[x0, y0], [x1, y0], [x1, y1], [x0, y1]]], [score])
+
+
+def test_should_tile():
+    assert not should_tile(2000, 1000)
+    assert should_tile(2001, 1000)
+    assert should_tile(800, 2400)
+
+
+def test_plan_tiles_covers_image_with_overlap():
+    tiles = plan_tiles(3000, 1000, tile_size=1280, overlap=160)
+    assert [(t.x, t.width) for t in tiles] == [(0, 1280), (1120, 1280), (1720, 1280)]
+    assert all(t.y == 0 and t.height == 1000 for t in tiles)
+
+    tiles = plan_tiles(2400, 2400, tile_size=1280, overlap=160)
+    assert len(tiles) == 4
+    assert tiles[-1] == Tile(1120, 1120, 1280, 1280)
+    # 先行后列
+    assert [(t.y, t.x) for t in tiles] == sorted((t.y, t.x) for t in tiles)
+
+
+def test_plan_tiles_small_image_is_single_tile():
+    assert plan_tiles(500, 300) == [Tile(0, 0, 500, 300)]
+
+
+def test_tile_crop_is_view():
+    image = np.zeros((10, 20, 3), dtype=np.uint8)
+    crop = Tile(5, 2, 4, 3).crop(image)
+    assert crop.shape == (3, 4, 3)
+    crop[:] = 7
+    assert image[2:5, 5:9].min() == 7
+
+
+def test_merge_removes_duplicates_in_overlap():
+    left, right = Tile(0, 0, 1280, 500), Tile(1120, 0, 1280, 500)
+    # 同一行完整落在重叠区域，两个分块都识别到
+    results = [(left, line("hello", 1150, 10, 1250, 30)), (right, line("hello", 30, 10, 130, 30))]
+    merged = merge_tile_results(results, 2400, 500, "stub")
+    assert merged.txts == ("hello",)
+    assert np.allclose(merged.boxes[0], [1150, 1250, 10, 30])
+    assert merged.backend == "stub"
+
+
+def test_merge_joins_line_cut_by_seam():
+    left, right = Tile(0, 0, 1280, 500), Tile(1120, 0, 1280, 500)
+    # 左块的框贴着右边缘被截断，右块识别到后半段，两段在重叠区域有交集
+    results = [(left, line("hello wor", 1000, 10, 1279, 30, 0.95)),
+               (right, line("world", 50, 10, 300, 30, 0.8))]
+    merged = merge_tile_results(results, 2400, 500)
+    assert merged.txts == ("hello world",)
+    assert np.allclose(merged.boxes[0], [1000, 1420, 10, 30])
+    assert np.isclose(merged.scores[0], 0.8)
+
+
+def test_merge_empty():
+    merged = merge_tile_results([(Tile(0, 0, 10, 10), OCRResult.empty())], 10, 10, "stub")
+    assert len(merged) == 0 and merged.backend == "stub"
+
+
+def test_reading_order():
+    boxes = np.array([[100, 150, 52, 68],   # 第二行
+                      [200, 260, 10, 30],   # 第一行右
+                      [0, 80, 12, 28],      # 第一行左
+                      [0, 50, 50, 70]],     # 第二行左
+                     dtype=np.float32)
+    assert reading_order(boxes).tolist() == [2, 1, 3, 0]
+    assert len(reading_order(np.zeros((0, 4), dtype=np.float32))) == 0
+
+
+def test_uncovered_strips():
+    region = Tile(0, 0, 100, 100)
+    covered = Tile(20, 30, 50, 40)
+    strips = uncovered_strips(region, covered, 5)
+    assert strips == [Tile(0, 0, 100, 35), Tile(0, 65, 100, 35), Tile(0, 30, 25, 40), Tile(65, 30, 35, 40)]
+    assert uncovered_strips(region, region, 5) == []
+
+
+def test_bounding_tile():
+    assert bounding_tile(Tile(10, 20, 30, 40), Tile(0, 50, 20, 20)) == Tile(0, 20, 40, 50)
+
+
+def test_engine_tiles_large_image():
+    engine = OCREngine("stub", 1)
+    image = np.full((1000, 3000, 3), 255, dtype=np.uint8)
+    result = engine.process_array(image)
+    # 桩后端对每个分块返回整块的文本框，合并后坐标都在原图内
+    assert len(result) >= 1
+    boxes = result.boxes
+    assert boxes[:, 0].min() >= 0 and boxes[:, 1].max() <= 3000 and boxes[:, 3].max() <= 1000
@@ -1,19 +1,139 @@
-from PySide6.QtCore import Qt, QRect, Signal, QObject
-from PySide6.QtGui import QPainter, QPen, QBrush, QColor, QFont, QImage, QGuiApplication
+import threading
+import time
+
+from PySide6.QtCore import Qt, QRect, QRectF, Signal, QObject, QTimer
+from PySide6.QtGui import (QPainter, QPen, QColor, QFont, QFontMetrics, QImage, QPixmap, QRegion,
+                           QGuiApplication)
 from PySide6.QtWidgets import QWidget
 from core.ocr_engine import OCREngine
+from core.tiling import Tile, bounding_tile, merge_tile_results, uncovered_strips
+from ui.region_watch import RegionWatcher
+from util.utils import qimage_to_bgr
+from util.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class LivePreview(QObject):
+    """拖动选择区域时的实时识别预览
+
+    选择区域变化后防抖一段时间再识别；同一时间只有一个后台任务，期间的新请求合并为最新一次。
+    同一次拖动中已识别过的区域结果会被复用，只识别新露出的条带，再用分块合并逻辑拼接。
+    """
+    preview_ready = Signal(object)  # OCRResult，坐标为截图中的设备像素
+    _job_finished = Signal(int, object, object, object, object)
+
+    DEBOUNCE_MS = 250
+    # 新条带向已识别区域内延伸的像素，保证跨越边界的文本行被完整识别
+    STRIP_OVERLAP = 48
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.ocr_engine = OCREngine.get_instance()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.DEBOUNCE_MS)
+        self._timer.timeout.connect(self._start_job)
+        self._job_finished.connect(self._on_job_finished)
+
+        self._image = None
+        self._generation = 0
+        self._busy = False
+        self._pending = None
+        self._covered = None
+        self._tile_results = []
+
+    def reset(self, screenshot: QPixmap = None):
+        """切换到新的截图（或清空），丢弃所有缓存和进行中的任务"""
+        self.cancel()
+        self._image = qimage_to_bgr(screenshot.toImage()) if screenshot is not None else None
+        self.restart()
+
+    def restart(self):
+        """开始新的一次拖动，已识别区域不再复用"""
+        self._generation += 1
+        self._covered = None
+        self._tile_results = []
+
+    def cancel(self):
+        """取消等待中的请求，进行中任务的结果将被丢弃"""
+        self._timer.stop()
+        self._pending = None
+        self._generation += 1
+
+    def request(self, region: Tile):
+        """请求识别指定区域（设备像素），防抖后执行"""
+        if self._image is None:
+            return
+        self._pending = region
+        self._timer.start()
+
+    def _start_job(self):
+        if self._busy or self._pending is None:
+            return
+        region, self._pending = self._pending, None
+        covered = bounding_tile(self._covered, region) if self._covered is not None else region
+        strips = uncovered_strips(covered, self._covered, self.STRIP_OVERLAP) if self._covered is not None \
+            else [covered]
+
+        self._busy = True
+        threading.Thread(target=self._run,
+                         args=(self._generation, region, covered, strips, self._image, list(self._tile_results)),
+                         name="ocr-live-preview", daemon=True).start()
+
+    def _run(self, generation, region, covered, strips, image, tile_results):
+        """后台识别新条带并与已有结果合并"""
+        merged = None
+        new_results = []
+        try:
+            for strip in strips:
+                if generation != self._generation:
+                    break
+                new_results.append((strip, self.ocr_engine.recognize(strip.crop(image))))
+            else:
+                height, width = image.shape[:2]
+                merged = merge_tile_results(tile_results + new_results, width, height)
+        except Exception as e:
+            logger.warning("实时预览识别失败: %s", e)
+        self._job_finished.emit(generation, region, covered, new_results, merged)
+
+    def _on_job_finished(self, generation, region, covered, new_results, merged):
+        self._busy = False
+        if generation == self._generation and merged is not None:
+            # 识别成功后才记为已覆盖，失败的条带在下一次请求中重新识别
+            self._covered = covered
+            self._tile_results.extend(new_results)
+            boxes = merged.boxes
+            centers_x = (boxes[:, 0] + boxes[:, 1]) / 2
+            centers_y = (boxes[:, 2] + boxes[:, 3]) / 2
+            inside = ((centers_x >= region.x) & (centers_x <= region.x + region.width) &
+                      (centers_y >= region.y) & (centers_y <= region.y + region.height))
+            self.preview_ready.emit(merged.select(inside))
+        if self._pending is not None:
+            self._timer.start()
 
 
 class ScreenshotWidget(QWidget):
-    """截图选择窗口"""
+    """截图选择窗口，覆盖整个虚拟桌面（所有显示器），可重复使用"""
     capture_finished = Signal(QImage)
+    capture_cancelled = Signal()  # 按ESC取消或选择区域过小
+    region_selected = Signal(QRect)  # 选中区域（全局逻辑坐标）
+
+    MASK_COLOR = QColor(0, 0, 0, 100)
+    BORDER_WIDTH = 2
+    PREVIEW_BOX_COLOR = QColor(0, 200, 0)
+    PREVIEW_BACKGROUND = QColor(0, 0, 0, 180)
+    PREVIEW_MAX_LINES = 3
+    PREVIEW_MIN_WIDTH = 240
 
     def __init__(self):
         super().__init__()
         self.setWindowTitle("屏幕截图")
-        self.setWindowState(Qt.WindowState.WindowFullScreen)
-        self.setWindowFlags(Qt.WindowType.FramelessWindowHint | Qt.WindowType.WindowStaysOnTopHint)
-        self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+        self.setWindowFlags(Qt.WindowType.FramelessWindowHint | Qt.WindowType.WindowStaysOnTopHint |
+                            Qt.WindowType.Tool)
+        # 窗口内容完全由冻结的截图绘制，不需要透明背景和系统擦除背景
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self.label_font = QFont("Arial", 10, QFont.Weight.Bold)
 
         # 初始化截图区域
         self.start_point = None
@@ -21,31 +141,160 @@ class ScreenshotWidget(QWidget):
         self.selection_rect = QRect()
         self.dragging = False
 
-        # 获取全屏截图
-        self.screen = QGuiApplication.primaryScreen()
-        self.full_screenshot = self.screen.grabWindow(0)
+        # 虚拟桌面截图（逻辑坐标与本窗口坐标一致）及其设备像素比
+        self.full_screenshot = QPixmap()
+        self.backing = QPixmap()
+        self.device_pixel_ratio = 1.0
+
+        # 实时预览（可选）：识别出的文本框（逻辑坐标）和文本
+        self.live_preview_enabled = False
+        self.live_preview = LivePreview(self)
+        self.live_preview.preview_ready.connect(self._on_preview_ready)
+        self.preview_boxes = []
+        self.preview_lines = []
+
+    def begin(self):
+        """抓取当前桌面并显示选择遮罩"""
+        self.full_screenshot, geometry = self._grab_virtual_desktop()
+        self.device_pixel_ratio = self.full_screenshot.devicePixelRatio()
+
+        self.start_point = None
+        self.end_point = None
+        self.selection_rect = QRect()
+        self.dragging = False
+        self.preview_boxes = []
+        self.preview_lines = []
+        self.live_preview.reset(self.full_screenshot if self.live_preview_enabled else None)
+
+        self.setGeometry(geometry)
+        self._build_backing()
+        self.show()
+        self.raise_()
+        self.activateWindow()
+
+    @staticmethod
+    def _grab_virtual_desktop():
+        """抓取所有显示器，拼接为一张覆盖虚拟桌面的截图
+
+        Returns:
+            (QPixmap, QRect): 截图及虚拟桌面的逻辑坐标范围
+        """
+        screens = QGuiApplication.screens()
+        if len(screens) == 1:
+            return screens[0].grabWindow(0), screens[0].geometry()
+
+        geometry = screens[0].virtualGeometry()
+        ratio = max(screen.devicePixelRatio() for screen in screens)
+        desktop = QPixmap(geometry.size() * ratio)
+        desktop.setDevicePixelRatio(ratio)
+        desktop.fill(Qt.GlobalColor.black)
+
+        painter = QPainter(desktop)
+        for screen in screens:
+            target = screen.geometry().translated(-geometry.topLeft())
+            painter.drawPixmap(target, screen.grabWindow(0))
+        painter.end()
+        return desktop, geometry
+
+    def _build_backing(self):
+        """将冻结的截图加遮罩绘制到缓存中，每次截图只绘制一次"""
+        self.backing = QPixmap(self.full_screenshot)
+        painter = QPainter(self.backing)
+        painter.fillRect(self.rect(), self.MASK_COLOR)
+        painter.end()
+
+    def _source_rect(self, rect: QRect) -> QRectF:
+        """将逻辑坐标区域换算为截图中的设备像素区域"""
+        ratio = self.device_pixel_ratio
+        return QRectF(rect.x() * ratio, rect.y() * ratio, rect.width() * ratio, rect.height() * ratio)
+
+    def _device_rect(self, rect: QRect) -> QRect:
+        """将逻辑坐标区域换算为截图中的设备像素区域（整数）"""
+        return self._source_rect(rect).toRect()
+
+    def _size_text(self) -> str:
+        return f"{self.selection_rect.width()} × {self.selection_rect.height()}"
+
+    def _label_rect(self) -> QRect:
+        """尺寸标签的绘制区域"""
+        metrics = QFontMetrics(self.label_font)
+        return QRect(self.selection_rect.right() - 100, self.selection_rect.bottom() + 20 - metrics.ascent(),
+                     metrics.horizontalAdvance(self._size_text()), metrics.height())
+
+    def _dirty_region(self) -> QRegion:
+        """当前选择区域（含边框）和尺寸标签占据的区域"""
+        if self.selection_rect.isNull():
+            return QRegion()
+        margin = self.BORDER_WIDTH
+        region = QRegion(self.selection_rect.adjusted(-margin, -margin, margin, margin)).united(
+            self._label_rect().adjusted(-margin, -margin, margin, margin))
+        if self.preview_lines:
+            region = region.united(self._preview_text_rect().adjusted(-margin, -margin, margin, margin))
+        return region
+
+    def _preview_text_rect(self) -> QRect:
+        """预览文本面板区域，位于尺寸标签下方"""
+        metrics = QFontMetrics(self.label_font)
+        line_count = min(len(self.preview_lines), self.PREVIEW_MAX_LINES)
+        width = max(self.selection_rect.width(), self.PREVIEW_MIN_WIDTH)
+        return QRect(self.selection_rect.left(), self.selection_rect.bottom() + 28,
+                     width, line_count * metrics.height() + 8)
+
+    def _on_preview_ready(self, result):
+        """实时预览结果返回，更新文本框和预览文本"""
+        old_region = self._dirty_region()
+        ratio = self.device_pixel_ratio
+        self.preview_boxes = [QRectF(x0 / ratio, y0 / ratio, (x1 - x0) / ratio, (y1 - y0) / ratio)
+                              for x0, x1, y0, y1 in result.boxes.tolist()]
+        self.preview_lines = list(result.txts)
+        self.update(old_region.united(self._dirty_region()))
+
+    def _request_preview(self):
+        if self.live_preview_enabled and self.selection_rect.width() > 5 and self.selection_rect.height() > 5:
+            rect = self._device_rect(self.selection_rect)
+            self.live_preview.request(Tile(rect.x(), rect.y(), rect.width(), rect.height()))
 
     def paintEvent(self, event):
-        """绘制截图区域和遮罩"""
+        """只重绘脏区域：遮罩背景来自缓存，选择区域显示原始截图"""
         painter = QPainter(self)
-
-        # 绘制半透明背景
-        painter.setPen(QPen(Qt.GlobalColor.blue, 2))
-        painter.setBrush(QBrush(QColor(0, 0, 0, 100)))
-        painter.drawRect(self.rect())
+        dirty = event.rect()
+        painter.drawPixmap(QRectF(dirty), self.backing, self._source_rect(dirty))
 
         # 绘制选择区域
         if not self.selection_rect.isNull():
-            painter.setPen(QPen(Qt.GlobalColor.red, 2))
-            painter.setBrush(QBrush(QColor(255, 0, 0, 30)))
+            selection = self.selection_rect.intersected(dirty)
+            if not selection.isEmpty():
+                painter.drawPixmap(QRectF(selection), self.full_screenshot, self._source_rect(selection))
+
+            painter.setPen(QPen(Qt.GlobalColor.red, self.BORDER_WIDTH))
+            painter.setBrush(Qt.BrushStyle.NoBrush)
             painter.drawRect(self.selection_rect)
 
             # 绘制区域尺寸信息
             painter.setPen(QPen(Qt.GlobalColor.white))
-            painter.setFont(QFont("Arial", 10, QFont.Weight.Bold))
-            size_text = f"{self.selection_rect.width()} × {self.selection_rect.height()}"
+            painter.setFont(self.label_font)
             painter.drawText(self.selection_rect.right() - 100,
-                             self.selection_rect.bottom() + 20, size_text)
+                             self.selection_rect.bottom() + 20, self._size_text())
+
+            if self.preview_lines:
+                self._paint_preview(painter)
+
+    def _paint_preview(self, painter: QPainter):
+        """绘制实时预览的文本框和文本"""
+        painter.save()
+        painter.setClipRect(self.selection_rect)
+        painter.setPen(QPen(self.PREVIEW_BOX_COLOR, 1))
+        painter.drawRects(self.preview_boxes)
+        painter.restore()
+
+        text_rect = self._preview_text_rect()
+        painter.fillRect(text_rect, self.PREVIEW_BACKGROUND)
+        metrics = QFontMetrics(self.label_font)
+        y = text_rect.top() + 4 + metrics.ascent()
+        for line in self.preview_lines[:self.PREVIEW_MAX_LINES]:
+            painter.drawText(text_rect.left() + 4, y,
+                             metrics.elidedText(line, Qt.TextElideMode.ElideRight, text_rect.width() - 8))
+            y += metrics.height()
 
     def mousePressEvent(self, event):
         """鼠标按下开始截图"""
@@ -53,68 +302,162 @@ class ScreenshotWidget(QWidget):
             self.start_point = event.pos()
             self.end_point = event.pos()
             self.dragging = True
+            self.live_preview.restart()
 
     def mouseMoveEvent(self, event):
         """鼠标移动更新截图区域"""
         if self.dragging:
             self.end_point = event.pos()
+            old_region = self._dirty_region()
             self.selection_rect = QRect(self.start_point, self.end_point).normalized()
-            self.update()
+            # 只更新新旧选择区域及尺寸标签，避免整屏重绘
+            self.update(old_region.united(self._dirty_region()))
+            self._request_preview()
 
     def mouseReleaseEvent(self, event):
         """鼠标释放完成截图"""
         if event.button() == Qt.MouseButton.LeftButton:
             self.dragging = False
+            self.live_preview.cancel()
+            self.hide()
             if (self.selection_rect.width() > 5 and self.selection_rect.height() > 5):
                 self.capture_selection()
-            self.close()
+            else:
+                self.capture_cancelled.emit()
 
     def capture_selection(self):
         """捕获选中的区域"""
         if self.selection_rect.isNull() or self.selection_rect.width() < 5 or self.selection_rect.height() < 5:
             return
 
-        screenshot = self.full_screenshot.copy(
-            self.selection_rect.x(),
-            self.selection_rect.y(),
-            self.selection_rect.width(),
-            self.selection_rect.height()
-        )
+        # 截图按设备像素存储，选择区域为逻辑坐标，需要换算
+        screenshot = self.full_screenshot.copy(self._device_rect(self.selection_rect))
 
         # 发送截图完成信号
+        self.region_selected.emit(self.selection_rect.translated(self.geometry().topLeft()))
         self.capture_finished.emit(screenshot.toImage())
 
     def keyPressEvent(self, event):
         """按ESC取消截图"""
         if event.key() == Qt.Key.Key_Escape:
-            self.close()
+            self.live_preview.cancel()
+            self.hide()
+            self.capture_cancelled.emit()
 
 
 class CaptureTool(QObject):
     """截图工具类，负责处理截图逻辑"""
+    capture_started = Signal()  # 截图完成、开始识别
+    capture_partial = Signal(list)  # 识别过程中按阅读顺序逐批传递新识别出的文本行
     capture_completed = Signal(list)  # 截图完成后传递OCR结果
+    capture_cancelled = Signal()  # 用户取消了框选
+    watch_updated = Signal(object)  # 区域监视结果变化，传递 FrameDiff
+
+    # 主窗口隐藏后等待窗口管理器完成重绘的时间（毫秒），之后再抓屏
+    HIDE_SETTLE_MS = 30
 
     def __init__(self):
         super().__init__()
         self.screenshot_widget = None
         self.ocr_engine = OCREngine.get_instance()
+        self.live_preview_enabled = False
+        self.region_watcher = None
+        self.last_image = None
+        # 本次框选用于区域监视而不是单次识别
+        self._select_for_watch = False
+        # 每次截图递增，用于丢弃被新截图取代的旧识别任务的结果
+        self._capture_id = 0
+        # 框选区域所在屏幕，引擎按屏幕记住文字大小
+        self._capture_screen = None
+
+    def start_capture(self, requested_at=None, watch=False):
+        """开始截图，复用同一个遮罩窗口
+
+        Args:
+            requested_at: 触发截图的时间（time.perf_counter），用于统计热键到遮罩显示的延迟
+            watch: 为True时框选的区域用于区域监视
+        """
+        if self.screenshot_widget is None:
+            self.screenshot_widget = ScreenshotWidget()
+            self.screenshot_widget.region_selected.connect(self._on_region_selected)
+            self.screenshot_widget.capture_finished.connect(self.process_captured_image)
+            self.screenshot_widget.capture_cancelled.connect(self._on_capture_cancelled)
+        self._select_for_watch = watch
+        self.screenshot_widget.live_preview_enabled = self.live_preview_enabled
+
+        grab_start = time.perf_counter()
+        self.screenshot_widget.begin()
+        shown_at = time.perf_counter()
+        if requested_at is not None:
+            logger.info("截图遮罩已显示: 抓屏+显示 %.1fms, 距触发 %.1fms",
+                        (shown_at - grab_start) * 1000, (shown_at - requested_at) * 1000)
+        else:
+            logger.info("截图遮罩已显示: 抓屏+显示 %.1fms", (shown_at - grab_start) * 1000)
+
+    @property
+    def is_watching(self) -> bool:
+        return self.region_watcher is not None and self.region_watcher.is_running
+
+    def stop_watch(self):
+        """停止区域监视"""
+        if self.region_watcher is not None:
+            self.region_watcher.stop()
+            self.region_watcher.deleteLater()
+            self.region_watcher = None
+        self.last_image = None
 
-    def start_capture(self):
-        """开始截图"""
-        self.screenshot_widget = ScreenshotWidget()
-        self.screenshot_widget.capture_finished.connect(self.process_captured_image)
-        self.screenshot_widget.show()
+    def _on_region_selected(self, rect):
+        screen = QGuiApplication.screenAt(rect.center())
+        self._capture_screen = screen.name() if screen else None
+        if not self._select_for_watch:
+            return
+        self.region_watcher = RegionWatcher(rect, self)
+        self.region_watcher.updated.connect(self.watch_updated)
+        self.region_watcher.start()
+
+    def _on_capture_cancelled(self):
+        self._select_for_watch = False
+        self.capture_cancelled.emit()
+
+    def cleanup(self):
+        """释放遮罩窗口，停止区域监视"""
+        self.stop_watch()
+        if self.screenshot_widget is not None:
+            self.screenshot_widget.hide()
+            self.screenshot_widget.deleteLater()
+            self.screenshot_widget = None
 
     def process_captured_image(self, image):
         """处理截图并进行OCR识别"""
+        if self._select_for_watch:
+            # 区域监视由 RegionWatcher 负责识别
+            self._select_for_watch = False
+            return
+
         if image.isNull():
             self.capture_completed.emit([])
             return
 
-        # 将图像添加到剪贴板
-        from PySide6.QtGui import QGuiApplication
-        QGuiApplication.clipboard().setImage(image)
+        # 剪贴板等输出在识别结果显示之后由结果输出端处理，这里只保留截图
+        self.last_image = image
+
+        # 在后台线程中流式识别，界面逐批显示结果
+        self._capture_id += 1
+        self.capture_started.emit()
+        threading.Thread(target=self._recognize_worker, args=(image, self._capture_id, self._capture_screen),
+                         name="ocr-capture", daemon=True).start()
+
+    def _recognize_worker(self, image, capture_id, screen=None):
+        """后台识别线程，逐批发送部分结果，最后发送完整结果"""
+        text_results = []
+        try:
+            for partial in self.ocr_engine.iter_process_image(image, screen=screen):
+                if capture_id != self._capture_id:
+                    return
+                text_results.extend(partial.txts)
+                self.capture_partial.emit(list(partial.txts))
+        except Exception as e:
+            logger.error("截图识别失败: %s", e)
 
-        # 处理OCR
-        text_results = self.ocr_engine.get_text_only(image)
-        self.capture_completed.emit(text_results)
\ No newline at end of file
+        if capture_id == self._capture_id:
+            self.capture_completed.emit(text_results)
\ No newline at end of file
@@ -0,0 +1,58 @@
+import html
+from typing import List
+
+from PySide6.QtCore import QUrl
+from PySide6.QtGui import QImage, QTextDocument
+from PySide6.QtWidgets import QTextBrowser
+
+from core.mdx_dict import DictEntry, DictionaryManager
+from util.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class DefinitionView(QTextBrowser):
+    """在结果面板中显示离线词典释义
+
+    释义中的图片从 MDD 资源中读取，entry:// 链接在当前窗口内跳转查询。
+    """
+
+    def __init__(self, dictionaries: DictionaryManager, parent=None):
+        super().__init__(parent)
+        self.dictionaries = dictionaries
+        self.setOpenLinks(False)
+        self.anchorClicked.connect(self._on_anchor_clicked)
+
+    def show_entries(self, entries: List[DictEntry]):
+        """显示查询结果，没有结果时清空"""
+        if not entries:
+            self.clear()
+            return
+
+        parts = []
+        for entry in entries:
+            parts.append(f"<p style='color:gray; font-size:small;'>{html.escape(entry.dictionary)}"
+                         f" · <b>{html.escape(entry.headword)}</b></p>")
+            parts.append(entry.definition)
+        self.setHtml("<hr/>".join(parts))
+
+    def lookup(self, word: str) -> bool:
+        """查询并显示释义，返回是否查到"""
+        entries = self.dictionaries.lookup(word) if word and self.dictionaries.is_loaded else []
+        self.show_entries(entries)
+        return bool(entries)
+
+    def loadResource(self, resource_type, url: QUrl):
+        if url.scheme() in ("", "file"):
+            data = self.dictionaries.resource(url.path())
+            if data is not None:
+                if resource_type == QTextDocument.ResourceType.ImageResource:
+                    return QImage.fromData(data)
+                return data.decode("utf-8", errors="ignore")
+        return super().loadResource(resource_type, url)
+
+    def _on_anchor_clicked(self, url: QUrl):
+        if url.scheme() == "entry":
+            word = url.toString()[len("entry://"):]
+            logger.debug("词典内跳转: %s", word)
+            self.lookup(QUrl.fromPercentEncoding(word.encode("utf-8")))
@@ -4,7 +4,14 @@ from PySide6.QtWidgets import QGraphicsScene, QGraphicsView, QGraphicsRectItem
 import jieba
 import re
 import os
+import time
+import logging
+import numpy as np
 from core.ocr_engine import OCREngine
+from core.ocr_result import OCRResult
+from util.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 class CaptureConfig:
@@ -92,15 +99,15 @@ class VisualFeedback:
     def show(self, rect):
         """显示视觉反馈 - 修复版本"""
         if not self.view or not self.rect_item or not self.timer:
-            print("视觉反馈组件未初始化")
+            logger.warning("视觉反馈组件未初始化")
             return
 
         x, y, width, height = rect
-        print(f"准备显示反馈框: 位置({x}, {y}), 大小({width}x{height})")
+        logger.debug("准备显示反馈框: 位置(%s, %s), 大小(%sx%s)", x, y, width, height)
 
         # 修复6: 确保尺寸合理
         if width <= 0 or height <= 0:
-            print(f"警告: 反馈框尺寸无效: {width}x{height}")
+            logger.warning("反馈框尺寸无效: %sx%s", width, height)
             return
 
         # 修复7: 设置场景矩形
@@ -122,7 +129,8 @@ class VisualFeedback:
         self.view.repaint()
 
         # 调试信息
-        print(f"反馈框已显示: 可见={self.view.isVisible()}, 几何形状={self.view.geometry()}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("反馈框已显示: 可见=%s, 几何形状=%s", self.view.isVisible(), self.view.geometry())
 
         # 启动隐藏定时器
         if self.timer.isActive():
@@ -134,7 +142,7 @@ class VisualFeedback:
         if self.view and self.is_showing:
             self.view.hide()
             self.is_showing = False
-            print("反馈框已隐藏")
+            logger.debug("反馈框已隐藏")
 
     def hide(self):
         """立即隐藏视觉反馈"""
@@ -218,55 +226,43 @@ class OCRProcessor:
 
     def __init__(self):
         self.ocr_engine = OCREngine.get_instance()
-        self.dpi_scale = self._get_dpi_scale()
-        print(f"DPI缩放比例: {self.dpi_scale}")
-
-    def _get_dpi_scale(self):
-        """获取DPI缩放比例"""
-        screen = QGuiApplication.primaryScreen()
-        if screen:
-            ratio = screen.devicePixelRatio()
-            print(f"设备像素比: {ratio}")
-            return ratio
-        return 1.0
-
-    def _adjust_capture_size(self, width, height):
-        """根据DPI调整截图尺寸"""
-        adjusted_width = int(width * self.dpi_scale)
-        adjusted_height = int(height * self.dpi_scale)
-        print(f"尺寸调整: {width}x{height} -> {adjusted_width}x{adjusted_height}")
-        return adjusted_width, adjusted_height
 
     def capture_at_position(self, pos, width, height):
-        """在指定位置捕获图像并进行OCR"""
+        """在指定位置捕获图像并进行OCR
+
+        截图区域为逻辑像素，不再按DPI放大：高分屏截图本身就是物理像素，
+        文字大小由引擎按实际像素估计并缩放。返回结果的坐标换算为逻辑像素，与光标位置一致。
+        """
         screen = QGuiApplication.screenAt(pos)
         if not screen:
-            print("错误: 无法找到屏幕")
+            logger.error("无法找到屏幕")
             return None
 
         # 计算截图区域
         x = pos.x() - width // 2
         y = pos.y() - height // 2
 
-        print(f"截图区域: x={x}, y={y}, w={width}, h={height}")
-        print(f"鼠标位置: ({pos.x()}, {pos.y()})")
+        logger.debug("截图区域: x=%s, y=%s, w=%s, h=%s", x, y, width, height)
 
         # 截图
         screenshot = screen.grabWindow(0, x, y, width, height)
         if screenshot.isNull():
-            print("错误: 截图失败")
+            logger.error("截图失败")
             return None
 
-        print(f"截图成功: 尺寸={screenshot.width()}x{screenshot.height()}")
-
-        # 调试保存
-        self._save_debug_image(screenshot, width, height)
+        # 调试保存，仅在调试日志开启时写盘
+        if CaptureConfig.SAVE_DEBUG_IMAGES and logger.isEnabledFor(logging.DEBUG):
+            self._save_debug_image(screenshot, width, height)
 
         # OCR处理
         img = screenshot.toImage()
-        result = self.ocr_engine.process_image(img)
-        print(f"OCR结果: {len(result) if result else 0} 个文本区域")
+        result = self.ocr_engine.process_hover(img, screen=screen.name())
+        logger.debug("OCR结果: %d 个文本区域, 推理耗时 %.1fms", len(result), result.elapse * 1000)
 
+        ratio = img.devicePixelRatio()
+        if ratio != 1.0 and result:
+            result = OCRResult(result.txts, result.polygons / np.float32(ratio), result.scores,
+                               result.elapse, result.backend)
         return result
 
     def _save_debug_image(self, screenshot, width, height):
@@ -276,25 +272,30 @@ class OCRProcessor:
             os.makedirs(debug_dir, exist_ok=True)
             screenshot_path = os.path.join(debug_dir, f"hover_capture_{width}x{height}.png")
             success = screenshot.save(screenshot_path)
-            print(f"调试图片保存: {screenshot_path} ({'成功' if success else '失败'})")
+            logger.debug("调试图片保存: %s (%s)", screenshot_path, "成功" if success else "失败")
         except Exception as e:
-            print(f"保存调试图片失败: {e}")
+            logger.warning("保存调试图片失败: %s", e)
 
 
 class WordSelector:
     """单词选择器"""
 
+    @staticmethod
+    def valid_indices(ocr_result):
+        """返回满足置信度和长度要求的行号，置信度过滤在数组上一次完成"""
+        candidates = np.flatnonzero(ocr_result.scores >= CaptureConfig.CONFIDENCE_THRESHOLD)
+        return [index for index in candidates.tolist()
+                if len(ocr_result.txts[index].strip()) >= CaptureConfig.MIN_TEXT_LENGTH]
+
     @staticmethod
     def select_word_at_position(ocr_results, mouse_pos, capture_rect):
         """根据鼠标位置选择单词"""
         if not ocr_results:
             return None
 
-        # 过滤低置信度结果
+        # 过滤低置信度结果，只为保留下来的行生成元组
         filtered_results = [
-            (text, box, conf) for text, box, conf in ocr_results
-            if conf >= CaptureConfig.CONFIDENCE_THRESHOLD and
-               len(text.strip()) >= CaptureConfig.MIN_TEXT_LENGTH
+            ocr_results[index].as_tuple() for index in WordSelector.valid_indices(ocr_results)
         ]
 
         if not filtered_results:
@@ -307,10 +308,10 @@ class WordSelector:
             mouse_pos.y() - capture_y  # 鼠标Y坐标 - 截图上边界
         )
 
-        # 调试输出
-        print(f"鼠标全局位置: ({mouse_pos.x()}, {mouse_pos.y()})")
-        print(f"截图区域: ({capture_x}, {capture_y}, {width}, {height})")
-        print(f"相对鼠标位置: ({relative_mouse_pos.x()}, {relative_mouse_pos.y()})")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("鼠标全局位置: (%s, %s), 截图区域: %s, 相对鼠标位置: (%s, %s)",
+                         mouse_pos.x(), mouse_pos.y(), capture_rect,
+                         relative_mouse_pos.x(), relative_mouse_pos.y())
 
         # 找到鼠标位置对应的文本框
         target_text_box = WordSelector._find_text_box_at_mouse(
@@ -321,7 +322,7 @@ class WordSelector:
             return None
 
         text, box, _ = target_text_box
-        print(f"选中文本框: '{text}', box: {box}")
+        logger.debug("选中文本框: '%s', box: %s", text, box)
 
         # 分词并选择单词
         selected_word = WordSelector._select_word_from_text(
@@ -333,10 +334,11 @@ class WordSelector:
     @staticmethod
     def _find_text_box_at_mouse(filtered_results, mouse_pos):
         """找到鼠标位置对应的文本框"""
-        # 添加调试输出
-        print(f"寻找鼠标位置({mouse_pos.x()}, {mouse_pos.y()})对应的文本框:")
-        for i, (text, box, conf) in enumerate(filtered_results):
-            print(f"  {i}: '{text}' box:{box} conf:{conf:.3f}")
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        if debug_enabled:
+            logger.debug("寻找鼠标位置(%s, %s)对应的文本框:", mouse_pos.x(), mouse_pos.y())
+            for i, (text, box, conf) in enumerate(filtered_results):
+                logger.debug("  %d: '%s' box:%s conf:%.3f", i, text, box, conf)
 
         # 首先检查鼠标是否在文本框内部
         candidates_inside = []
@@ -346,12 +348,13 @@ class WordSelector:
             if (min_x <= mouse_pos.x() <= max_x and
                     min_y <= mouse_pos.y() <= max_y):
                 candidates_inside.append((text, box, conf))
-                print(f"  鼠标在文本框内: '{text}'")
+                if debug_enabled:
+                    logger.debug("  鼠标在文本框内: '%s'", text)
 
         # 如果有文本框包含鼠标，选择置信度最高的
         if candidates_inside:
             best_candidate = max(candidates_inside, key=lambda x: x[2])  # 按置信度排序
-            print(f"  选择置信度最高的内部候选: '{best_candidate[0]}' conf:{best_candidate[2]:.3f}")
+            logger.debug("  选择置信度最高的内部候选: '%s' conf:%.3f", best_candidate[0], best_candidate[2])
             return best_candidate
 
         # 如果鼠标不在任何文本框内部，检查附近区域
@@ -366,7 +369,8 @@ class WordSelector:
                 # 计算到文本框边界的距离
                 distance_to_box = WordSelector._calculate_distance_to_box(mouse_pos, box)
                 candidates_nearby.append((text, box, conf, distance_to_box))
-                print(f"  附近候选: '{text}' 距离:{distance_to_box:.1f} conf:{conf:.3f}")
+                if debug_enabled:
+                    logger.debug("  附近候选: '%s' 距离:%.1f conf:%.3f", text, distance_to_box, conf)
 
         # 优先选择距离近且置信度高的候选
         if candidates_nearby:
@@ -374,7 +378,7 @@ class WordSelector:
             best_candidate = min(candidates_nearby,
                                  key=lambda x: x[3] * 2 - x[2])  # 距离*2 - 置信度
             result = (best_candidate[0], best_candidate[1], best_candidate[2])
-            print(f"  选择最佳附近候选: '{result[0]}' 距离:{best_candidate[3]:.1f} conf:{result[2]:.3f}")
+            logger.debug("  选择最佳附近候选: '%s' 距离:%.1f conf:%.3f", result[0], best_candidate[3], result[2])
             return result
 
         # 最后兜底：选择最近的文本框
@@ -389,7 +393,7 @@ class WordSelector:
                 closest_text_box = (text, box, conf)
 
         if closest_text_box:
-            print(f"  兜底选择最近候选: '{closest_text_box[0]}' 距离:{min_distance:.1f}")
+            logger.debug("  兜底选择最近候选: '%s' 距离:%.1f", closest_text_box[0], min_distance)
 
         return closest_text_box
 
@@ -474,7 +478,8 @@ class HoverTool(QObject):
     def capture_text_at_position(self, pos):
         """在指定位置捕获文本，使用多级尺寸策略"""
         try:
-            print(f"\n=== 开始捕获文本，鼠标位置: ({pos.x()}, {pos.y()}) ===")
+            start_time = time.perf_counter()
+            logger.debug("开始捕获文本，鼠标位置: (%s, %s)", pos.x(), pos.y())
 
             # 按从小到大的顺序尝试不同尺寸
             size_configs = [
@@ -484,14 +489,12 @@ class HoverTool(QObject):
             ]
 
             for i, (width, height) in enumerate(size_configs):
-                print(f"\n--- 尝试尺寸 {i + 1}/{len(size_configs)}: {width}x{height} ---")
+                logger.debug("尝试尺寸 %d/%d: %sx%s", i + 1, len(size_configs), width, height)
 
-                # 调整尺寸并创建捕获区域
-                adj_width, adj_height = self.ocr_processor._adjust_capture_size(width, height)
-                capture_rect = self._create_capture_region(pos, adj_width, adj_height)
+                # 创建捕获区域
+                capture_rect = self._create_capture_region(pos, width, height)
 
-                print(f"调整后尺寸: {adj_width}x{adj_height}")
-                print(f"捕获区域: {capture_rect}")
+                logger.debug("捕获区域: %s", capture_rect)
 
                 # 显示视觉反馈 - 确保在OCR之前显示
                 # self._show_visual_feedback(capture_rect)
@@ -500,10 +503,10 @@ class HoverTool(QObject):
                 QGuiApplication.processEvents()
 
                 # 尝试OCR识别
-                ocr_result = self.ocr_processor.capture_at_position(pos, adj_width, adj_height)
+                ocr_result = self.ocr_processor.capture_at_position(pos, width, height)
 
                 if self._is_valid_ocr_result(ocr_result):
-                    print(f"OCR成功，找到 {len(ocr_result)} 个文本区域")
+                    logger.debug("OCR成功，找到 %d 个文本区域", len(ocr_result))
 
                     # 选择单词
                     selected_word = WordSelector.select_word_at_position(
@@ -511,20 +514,22 @@ class HoverTool(QObject):
                     )
 
                     if selected_word:
+                        logger.info("取词成功: '%s', 尺寸级别 %d, 总耗时 %.1fms",
+                                    selected_word, i + 1, (time.perf_counter() - start_time) * 1000)
                         self._handle_successful_recognition(selected_word)
                         return
                     else:
-                        print("未能选择到有效单词")
+                        logger.debug("未能选择到有效单词")
                 else:
-                    print("OCR结果无效或不满足条件")
+                    logger.debug("OCR结果无效或不满足条件")
 
             # 所有尺寸都未成功
-            print("=== 所有尺寸都未能成功识别 ===")
+            logger.info("所有尺寸都未能成功识别, 总耗时 %.1fms", (time.perf_counter() - start_time) * 1000)
             self.status_changed.emit("未能识别到文本")
 
         except Exception as e:
             error_msg = f"取词失败: {str(e)}"
-            print(f"异常: {error_msg}")
+            logger.exception("取词异常: %s", e)
             self.status_changed.emit(error_msg)
 
     def _create_capture_region(self, pos, width, height):
@@ -540,40 +545,28 @@ class HoverTool(QObject):
         # 发射区域变化信号
         x, y, width, height = capture_rect
         self.capture_area_changed.emit(QRectF(x, y, width, height))
-        print(f"发射区域变化信号: QRectF({x}, {y}, {width}, {height})")
+        logger.debug("发射区域变化信号: QRectF(%s, %s, %s, %s)", x, y, width, height)
 
         # 显示视觉反馈
-        print("准备显示视觉反馈...")
         self.visual_feedback.show(capture_rect)
 
         # 确保事件被处理
         QGuiApplication.processEvents()
-        print("视觉反馈处理完成")
 
     def _is_valid_ocr_result(self, ocr_result):
         """判断OCR结果是否有效"""
         if not ocr_result:
-            print("OCR结果为空")
+            logger.debug("OCR结果为空")
             return False
 
-        valid_count = 0
-        for text, box, confidence in ocr_result:
-            is_valid = (len(text.strip()) >= CaptureConfig.MIN_TEXT_LENGTH and
-                       confidence >= CaptureConfig.CONFIDENCE_THRESHOLD)
-            print(f"文本: '{text}', 置信度: {confidence:.3f}, 有效: {is_valid}")
-            if is_valid:
-                valid_count += 1
-
-        print(f"有效文本区域数量: {valid_count}")
+        valid_count = len(WordSelector.valid_indices(ocr_result))
+        if logger.isEnabledFor(logging.DEBUG):
+            for line in ocr_result:
+                logger.debug("文本: '%s', 置信度: %.3f", line.text, line.score)
+            logger.debug("有效文本区域数量: %d", valid_count)
         return valid_count > 0
 
     def _handle_successful_recognition(self, word):
-        """处理成功识别的结果"""
-        print(f"成功识别单词: '{word}'")
-
-        # 复制到剪贴板
-        QGuiApplication.clipboard().setText(word)
-
-        # 发射信号
+        """处理成功识别的结果（剪贴板由结果输出端处理）"""
         self.word_found.emit(word)
-        self.status_changed.emit("成功识别文本并复制到剪贴板")
\ No newline at end of file
+        self.status_changed.emit("成功识别文本")
\ No newline at end of file
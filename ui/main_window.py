@@ -1,6 +1,8 @@
 import os
 import subprocess
 import logging
+import threading
+import time
 from typing import List
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout,
@@ -8,15 +10,26 @@ from PySide6.QtWidgets import (
     QSystemTrayIcon, QMenu, QMessageBox, QDialog,
 )
 from PySide6.QtCore import QTimer, Qt, Signal
-from PySide6.QtGui import QIcon
+from PySide6.QtGui import QIcon, QImage
 
+from core.engine_pool import Priority
 from core.hotkey_manager import CrossPlatformHotkeyManager
+from core.mdx_dict import DictionaryManager
+from core.model_lifecycle import ModelLifecycle
+from core.model_profiles import ModelProfile
+from core.ocr_backends import ClsMode
+from core.preprocess import PreprocessProfile
+from core.ocr_engine import OCREngine
+from core.result_sinks import ResultSinkPipeline, ClipboardSink, LauncherSink, SinkResult
 from core.settings_manager import SettingsManager
+from core.single_instance import CommandRequest, SingleInstanceServer
 from ui.capture_tool import CaptureTool
+from ui.definition_view import DefinitionView
 from ui.hover_tool import HoverTool
 from ui.theme import ThemeManager, ThemeType, create_stylesheet
 from ui.settings_dialog import SettingsDialog
 from ui.status_label import StatusLabel
+from util.logger import get_logger, get_ring_buffer
 
 
 class MainWindow(QMainWindow):
@@ -32,11 +45,22 @@ class MainWindow(QMainWindow):
     # 信号定义
     window_hidden = Signal()
     window_shown = Signal()
+    backend_switched = Signal(bool, str)
+    dictionaries_loaded = Signal(int)
+    model_memory_changed = Signal(int)
+
+    # 结果面板高度上限，显示词典释义时放宽
+    RESULT_PANEL_HEIGHT = 120
+    DEFINITION_PANEL_HEIGHT = 360
 
     def __init__(self):
         super().__init__()
         self.logger = self._setup_logger()
         self.tray_notified = False
+        self._partial_lines = []
+        self._pending_capture = None
+        # 通过命令行转发、等待截图结果的请求
+        self._capture_requests: List[CommandRequest] = []
 
         # 初始化核心组件
         self._init_components()
@@ -52,23 +76,33 @@ class MainWindow(QMainWindow):
 
     def _setup_logger(self) -> logging.Logger:
         """设置日志记录器"""
-        logger = logging.getLogger(__name__)
-        if not logger.handlers:
-            handler = logging.StreamHandler()
-            formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-            )
-            handler.setFormatter(formatter)
-            logger.addHandler(handler)
-            logger.setLevel(logging.INFO)
-        return logger
+        return get_logger(__name__)
 
     def _init_components(self):
         """初始化核心组件"""
         try:
+            self.settings_manager = SettingsManager(use_file_storage=True)
+
+            # 按配置的后端初始化OCR引擎，需在截图和取词工具之前创建
+            self.ocr_engine = OCREngine.get_instance(
+                self.settings_manager.get_value("ocr_backend", OCREngine.DEFAULT_BACKEND),
+                int(self.settings_manager.get_value("ocr_pool_size", 0)),
+                **self._backend_options(),
+            )
+            # 闲置时释放模型，按下修饰键或快捷键时提前重新加载；在 _update_ui_config 中按配置启动
+            self.model_lifecycle = ModelLifecycle(self.ocr_engine, on_memory_changed=self.model_memory_changed.emit)
             self.capture_tool = CaptureTool()
+            self.capture_tool.live_preview_enabled = bool(
+                self.settings_manager.get_value("capture_live_preview", False)
+            )
             self.hover_tool = HoverTool()
-            self.settings_manager = SettingsManager(use_file_storage=True)
+
+            # 识别结果输出端（剪贴板等），在结果显示后执行
+            self.result_sinks = ResultSinkPipeline()
+            self._apply_result_sinks()
+
+            # 离线词典，在 _update_ui_config 中按配置后台加载
+            self.dictionaries = DictionaryManager()
 
             # 获取配置
             self.hotkey = self.settings_manager.get_value("capture_shortcuts", "alt+c")
@@ -103,6 +137,10 @@ class MainWindow(QMainWindow):
         main_layout.addWidget(self._create_bottom_bar())
 
         self.setCentralWidget(central_widget)
+
+        # 状态栏右侧显示模型内存占用
+        self.model_memory_label = QLabel()
+        self.statusBar().addPermanentWidget(self.model_memory_label)
         self.logger.info("UI界面创建完成")
 
     def _setup_window_properties(self):
@@ -313,7 +351,8 @@ class MainWindow(QMainWindow):
         """创建结果显示面板"""
         panel = QWidget()
         panel.setStyleSheet(self.stylesheet.get_card_style())
-        panel.setMaximumHeight(120)
+        panel.setMaximumHeight(self.RESULT_PANEL_HEIGHT)
+        self.result_panel = panel
 
         layout = QVBoxLayout(panel)
         layout.setContentsMargins(20, 16, 20, 16)
@@ -329,8 +368,13 @@ class MainWindow(QMainWindow):
         self.result_text.setPlaceholderText("识别结果将显示在这里...")
         self.result_text.setFixedHeight(36)
 
+        # 离线词典释义，查到释义时才显示
+        self.definition_view = DefinitionView(self.dictionaries)
+        self.definition_view.setVisible(False)
+
         layout.addWidget(header)
         layout.addWidget(self.result_text)
+        layout.addWidget(self.definition_view, 1)
 
         return panel
 
@@ -484,6 +528,7 @@ class MainWindow(QMainWindow):
             self.hotkey_manager = CrossPlatformHotkeyManager(self.hotkey)
             self.hotkey_manager.hotkey_activated.connect(self.start_screenshot)
             self.hotkey_manager.mouse_clicked.connect(self.start_hover)
+            self.hotkey_manager.state_changed.connect(self._on_hotkey_state_changed)
             self.hotkey_manager.start()
 
             self.logger.info(f"热键管理器已启动，快捷键: {self.hotkey}")
@@ -529,6 +574,8 @@ class MainWindow(QMainWindow):
             ("显示", self.show),
             ("截图OCR", self.start_screenshot),
             ("悬停取词", lambda: self.hover_tool.capture_at_cursor()),
+            ("区域监视", self.toggle_region_watch),
+            ("导出日志", self.export_logs),
             None,  # 分隔符
             ("退出", self.quit_application)
         ]
@@ -546,9 +593,17 @@ class MainWindow(QMainWindow):
     def _connect_signals(self):
         """连接组件信号"""
         try:
+            self.capture_tool.capture_started.connect(self._on_capture_started)
+            self.capture_tool.capture_partial.connect(self.append_ocr_result)
             self.capture_tool.capture_completed.connect(self.update_ocr_result)
+            self.capture_tool.watch_updated.connect(self.update_watch_result)
+            self.capture_tool.capture_completed.connect(self._reply_capture_requests)
+            self.capture_tool.capture_cancelled.connect(self._on_capture_cancelled)
             self.hover_tool.word_found.connect(self.update_hover_result)
             self.hover_tool.status_changed.connect(self._update_status)
+            self.backend_switched.connect(self._on_backend_switched)
+            self.dictionaries_loaded.connect(self._on_dictionaries_loaded)
+            self.model_memory_changed.connect(self._on_model_memory_changed)
             self.logger.info("信号连接完成")
         except Exception as e:
             self.logger.error(f"信号连接失败: {e}")
@@ -567,10 +622,174 @@ class MainWindow(QMainWindow):
             self.has_external_tool = bool(cmd)
             self._update_tool_cmd_display()
 
+            # 截图实时预览
+            self.capture_tool.live_preview_enabled = bool(
+                self.settings_manager.get_value("capture_live_preview", False)
+            )
+
+            # 结果输出端
+            self._apply_result_sinks()
+
+            # 热切换OCR后端
+            self._apply_ocr_backend()
+            self.ocr_engine.set_preprocess_profile(
+                self.settings_manager.get_value("preprocess_profile", PreprocessProfile.SCREEN))
+
+            # 离线词典
+            self._apply_dictionaries()
+
+            # 闲置模型释放
+            self._apply_model_lifecycle()
+
             self.logger.info("UI配置更新完成")
         except Exception as e:
             self.logger.error(f"UI配置更新失败: {e}")
 
+    def _apply_result_sinks(self):
+        """按配置重建识别结果输出端"""
+        sinks = [ClipboardSink(self.settings_manager.get_value("clipboard_mode", "image"))]
+
+        # 外部工具（如GoldenDict），不经过shell执行
+        cmd = self.settings_manager.get_value("external_tool_exec_cmd", "")
+        if cmd:
+            sinks.append(LauncherSink(
+                cmd,
+                mode=self.settings_manager.get_value("external_tool_mode", "spawn"),
+                address=self.settings_manager.get_value("external_tool_address", ""),
+            ))
+        self.result_sinks.set_sinks(sinks)
+
+    def _publish_result(self, text: str, image=None, source: str = "capture"):
+        """界面更新后再把结果交给输出端，避免剪贴板等操作推迟结果显示"""
+        result = SinkResult(text, image, source)
+        QTimer.singleShot(0, lambda: self.result_sinks.publish(result))
+
+    def _apply_ocr_backend(self):
+        """按配置热切换OCR后端或后端选项（模型精度、方向分类），无需重启应用"""
+        backend_name = self.settings_manager.get_value("ocr_backend", OCREngine.DEFAULT_BACKEND)
+        options = self._backend_options()
+        if backend_name == self.ocr_engine.backend_name and options == self.ocr_engine.backend_options:
+            return
+
+        self._update_status("正在切换OCR后端...")
+        self.ocr_engine.switch_backend(
+            backend_name,
+            on_finished=lambda success, message: self.backend_switched.emit(success, message),
+            **options,
+        )
+
+    def _backend_options(self) -> dict:
+        """设置中的后端选项"""
+        return {
+            "profile": self.settings_manager.get_value("model_profile", ModelProfile.FP32),
+            "cls": self.settings_manager.get_value("angle_cls", ClsMode.AUTO),
+        }
+
+    def _on_backend_switched(self, success: bool, message: str):
+        """OCR后端切换完成"""
+        if success:
+            self._update_status("后端切换完成")
+            self.logger.info(f"OCR后端已切换为: {message}")
+        else:
+            self._update_status("后端切换失败")
+            self.logger.error(f"OCR后端切换失败: {message}")
+
+    def _apply_model_lifecycle(self):
+        """按配置设置模型闲置释放时间（分钟，0 表示常驻）"""
+        try:
+            minutes = float(self.settings_manager.get_value("model_idle_minutes", 10))
+        except (TypeError, ValueError):
+            minutes = 10
+        self.model_lifecycle.set_idle_timeout(max(minutes, 0) * 60)
+        self.model_lifecycle.start()
+
+    def _on_hotkey_state_changed(self, state: str):
+        """按下修饰键时预计即将取词或截图，提前加载已释放的模型"""
+        if state == "ready":
+            self.model_lifecycle.prewarm()
+
+    def _on_model_memory_changed(self, memory: int):
+        """更新状态栏中的模型内存"""
+        if memory:
+            self.model_memory_label.setText(f"模型内存: {memory / (1024 * 1024):.0f} MB")
+        else:
+            self.model_memory_label.setText("模型已释放")
+
+    def _apply_dictionaries(self):
+        """按配置在后台加载离线词典，首次加载时建立索引"""
+        paths = self.settings_manager.get_value("dictionary_paths", []) or []
+        if isinstance(paths, str):
+            paths = [paths]
+        if not paths and not self.dictionaries.is_loaded:
+            return
+        self.dictionaries.load(paths, on_finished=lambda count: self.dictionaries_loaded.emit(count))
+
+    def _on_dictionaries_loaded(self, count: int):
+        """离线词典加载完成"""
+        if count:
+            self._update_status(f"已加载 {count} 部离线词典")
+        self._show_definition(self.result_text.text() if self.definition_view.isVisible() else "")
+
+    def _show_definition(self, word: str):
+        """在结果面板中显示离线词典释义，查不到时收起释义区域"""
+        found = self.definition_view.lookup(word.strip())
+        self.definition_view.setVisible(found)
+        self.result_panel.setMaximumHeight(self.DEFINITION_PANEL_HEIGHT if found else self.RESULT_PANEL_HEIGHT)
+
+    def attach_instance_server(self, server: SingleInstanceServer):
+        """注册可由后续启动（命令行）转发执行的命令"""
+        server.register("show", self._handle_show_command)
+        server.register("capture", self._handle_capture_command)
+        server.register("ocr", self._handle_ocr_command)
+        server.register("quit", self._handle_quit_command)
+
+    def _handle_show_command(self, request: CommandRequest):
+        self.show()
+        request.reply()
+
+    def _handle_capture_command(self, request: CommandRequest):
+        """截图识别，框选完成并识别后回复识别文本"""
+        self._capture_requests.append(request)
+        self._update_status("请选择截图区域")
+        self._begin_capture(time.perf_counter())
+
+    def _handle_ocr_command(self, request: CommandRequest):
+        """识别图片文件，在后台线程中用已加载的模型识别，回复 {路径: 文本行列表}"""
+        images = []
+        for path in request.args:
+            image = QImage(path)
+            if image.isNull():
+                request.fail(f"无法读取图片: {path}")
+                return
+            images.append((path, image))
+
+        def worker():
+            try:
+                # 命令行批量识别不应拖慢界面上的取词和截图
+                request.reply({path: list(self.ocr_engine.process_image(image, Priority.BATCH).txts)
+                               for path, image in images})
+            except Exception as e:
+                self.logger.error(f"命令行识别失败: {e}")
+                request.fail(str(e))
+
+        threading.Thread(target=worker, name="ocr-command", daemon=True).start()
+
+    def _handle_quit_command(self, request: CommandRequest):
+        request.reply()
+        QTimer.singleShot(0, self.quit_application)
+
+    def _reply_capture_requests(self, text_list: List[str]):
+        requests, self._capture_requests = self._capture_requests, []
+        for request in requests:
+            request.reply(list(text_list))
+
+    def _on_capture_cancelled(self):
+        """框选被取消"""
+        self._update_status("截图已取消")
+        requests, self._capture_requests = self._capture_requests, []
+        for request in requests:
+            request.fail("截图已取消")
+
     def _update_status(self, status_text: str):
         """更新状态信息"""
         self.status_label.update_status(status_text)
@@ -607,14 +826,48 @@ class MainWindow(QMainWindow):
             return
 
         try:
-            self.hide()
+            requested_at = time.perf_counter()
             self._update_status("请选择截图区域")
-            QTimer.singleShot(300, self.capture_tool.start_capture)
+            self._begin_capture(requested_at)
             self.logger.info("启动截图OCR")
         except Exception as e:
             self.logger.error(f"启动截图OCR失败: {e}")
             self._update_status("启动截图失败")
 
+    def _begin_capture(self, requested_at, watch=False):
+        """隐藏主窗口后开始框选"""
+        # 用户框选期间在后台加载已释放的模型
+        self.model_lifecycle.prewarm()
+        if self.isVisible():
+            # 主窗口真正隐藏后（hideEvent）再抓屏，避免固定延时
+            self._pending_capture = (requested_at, watch)
+            self.hide()
+        else:
+            self.capture_tool.start_capture(requested_at, watch)
+
+    def toggle_region_watch(self):
+        """开始/停止区域监视"""
+        try:
+            if self.capture_tool.is_watching:
+                self.capture_tool.stop_watch()
+                self._update_status("区域监视已停止")
+                self.logger.info("停止区域监视")
+            else:
+                self._update_status("请选择监视区域")
+                self.capture_tool.stop_watch()
+                self._begin_capture(time.perf_counter(), watch=True)
+                self.logger.info("启动区域监视")
+        except Exception as e:
+            self.logger.error(f"切换区域监视失败: {e}")
+
+    def update_watch_result(self, diff):
+        """更新区域监视结果"""
+        try:
+            self.result_text.setText('\n'.join(diff.result.txts))
+            self._update_status(f"监视中: +{len(diff.added)} -{len(diff.removed)}")
+        except Exception as e:
+            self.logger.error(f"更新监视结果失败: {e}")
+
     def start_hover(self):
         """启动悬停取词功能"""
         if not self._validate_external_tool():
@@ -640,6 +893,21 @@ class MainWindow(QMainWindow):
         except Exception as e:
             self.logger.error(f"切换悬停取词模式失败: {e}")
 
+    def _on_capture_started(self):
+        """截图完成，开始识别"""
+        self._partial_lines = []
+        self.result_text.clear()
+        self._update_status("正在识别...")
+
+    def append_ocr_result(self, text_list: List[str]):
+        """追加识别过程中逐批返回的文本行"""
+        try:
+            self._partial_lines.extend(text_list)
+            self.result_text.setText('\n'.join(self._partial_lines))
+            self._update_status(f"正在识别... 已识别 {len(self._partial_lines)} 行")
+        except Exception as e:
+            self.logger.error(f"追加OCR结果失败: {e}")
+
     def update_ocr_result(self, text_list: List[str]):
         """更新OCR结果"""
         try:
@@ -649,13 +917,12 @@ class MainWindow(QMainWindow):
                 return
 
             # 更新结果
+            self._partial_lines = []
             result_text = '\n'.join(text_list)
             self.result_text.setText(result_text)
             self._update_status("识别完成")
-
-            # 运行外部工具
-            if self.has_external_tool:
-                self._run_external_tool()
+            self._show_definition(result_text if len(text_list) == 1 else "")
+            self._publish_result(result_text, self.capture_tool.last_image, "capture")
 
             self.logger.info(f"OCR识别完成，识别到 {len(text_list)} 行文本")
         except Exception as e:
@@ -666,10 +933,8 @@ class MainWindow(QMainWindow):
         """更新悬停取词结果"""
         try:
             self.result_text.setText(word)
-
-            # 运行外部工具
-            if self.has_external_tool:
-                self._run_external_tool()
+            self._show_definition(word)
+            self._publish_result(word, source="hover")
 
             self.logger.info(f"悬停取词完成: {word}")
         except Exception as e:
@@ -694,34 +959,32 @@ class MainWindow(QMainWindow):
         """清空结果"""
         try:
             self.result_text.clear()
+            self._show_definition("")
             self.statusBar().showMessage("结果已清空", 2000)
             self.logger.info("结果已清空")
         except Exception as e:
             self.logger.error(f"清空结果失败: {e}")
 
-    def _run_external_tool(self) -> bool:
-        """运行外部工具处理OCR结果"""
+    def export_logs(self):
+        """导出内存中的运行日志"""
         try:
-            text = self.result_text.text()
-            cmd = self.settings_manager.get_value("external_tool_exec_cmd", "")
-
-            if not cmd or not text:
-                return False
-
-            # 替换文本占位符
-            formatted_cmd = cmd.replace("{text}", text)
-
-            # 执行命令
-            subprocess.Popen(formatted_cmd, shell=True)
-            self.statusBar().showMessage(f"已执行命令: {formatted_cmd}", 3000)
-            self.logger.info(f"外部工具执行成功: {formatted_cmd}")
-            return True
+            ring_buffer = get_ring_buffer()
+            if ring_buffer is None:
+                self.statusBar().showMessage("日志缓冲未启用", 2000)
+                return
 
+            log_path = ring_buffer.dump_to_file()
+            self.statusBar().showMessage(f"日志已导出: {log_path}", 3000)
+            self.tray_icon.showMessage(
+                "OCR小工具",
+                f"日志已导出到 {log_path}",
+                QSystemTrayIcon.MessageIcon.Information,
+                2000
+            )
+            self.logger.info("日志已导出: %s", log_path)
         except Exception as e:
-            error_msg = f"执行命令失败: {str(e)}"
-            self.statusBar().showMessage(error_msg, 3000)
-            self.logger.error(f"外部工具执行失败: {e}")
-            return False
+            self.logger.error(f"导出日志失败: {e}")
+            self.statusBar().showMessage("导出日志失败", 2000)
 
     def hide_window(self):
         """隐藏窗口到系统托盘"""
@@ -782,6 +1045,18 @@ class MainWindow(QMainWindow):
                 self.tray_icon.hide()
                 self.logger.info("托盘图标已隐藏")
 
+            # 关闭结果输出端
+            if hasattr(self, 'result_sinks'):
+                self.result_sinks.close()
+
+            # 关闭离线词典
+            if hasattr(self, 'dictionaries'):
+                self.dictionaries.close()
+
+            # 停止模型闲置检查
+            if hasattr(self, 'model_lifecycle'):
+                self.model_lifecycle.stop()
+
             # 清理其他资源
             if hasattr(self, 'capture_tool') and self.capture_tool:
                 # 如果capture_tool有cleanup方法
@@ -797,6 +1072,14 @@ class MainWindow(QMainWindow):
             self.logger.error(f"清理资源时出错: {e}")
 
     # 事件处理方法
+    def hideEvent(self, event):
+        """窗口隐藏后启动等待中的截图"""
+        super().hideEvent(event)
+        if self._pending_capture is not None:
+            (requested_at, watch), self._pending_capture = self._pending_capture, None
+            QTimer.singleShot(CaptureTool.HIDE_SETTLE_MS,
+                              lambda: self.capture_tool.start_capture(requested_at, watch))
+
     def closeEvent(self, event):
         """窗口关闭事件处理"""
         try:
@@ -0,0 +1,102 @@
+import threading
+import time
+
+from PySide6.QtCore import QObject, QRect, QTimer, Signal
+from PySide6.QtGui import QGuiApplication
+
+from core.incremental_ocr import IncrementalOCR
+from core.ocr_engine import OCREngine
+from util.logger import get_logger
+from util.utils import qimage_to_bgr
+
+logger = get_logger(__name__)
+
+
+class WatchConfig:
+    """区域监视配置"""
+    # 采样间隔（毫秒）
+    INTERVAL_MS = 1000
+    # 识别耗时占总时间的上限，超过时自动拉长采样间隔
+    CPU_BUDGET = 0.25
+
+
+class RegionWatcher(QObject):
+    """区域监视：定时对固定屏幕区域采样，只重新识别发生变化的部分"""
+    updated = Signal(object)  # FrameDiff，仅在识别结果变化时发送
+    status_changed = Signal(str)
+    _frame_finished = Signal(object, float)
+
+    def __init__(self, rect: QRect, parent=None):
+        """
+        Args:
+            rect: 监视区域（全局逻辑坐标）
+        """
+        super().__init__(parent)
+        self.rect = QRect(rect)
+        self.incremental = IncrementalOCR(OCREngine.get_instance())
+        self._busy = False
+        self._running = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._sample)
+        self._frame_finished.connect(self._on_frame_finished)
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    def start(self):
+        """开始监视"""
+        self._running = True
+        self.incremental.reset()
+        self._timer.start(0)
+        logger.info("开始监视区域: %s", self.rect)
+
+    def stop(self):
+        """停止监视"""
+        self._running = False
+        self._timer.stop()
+        logger.info("停止监视区域")
+
+    def _sample(self):
+        """截取监视区域并在后台线程中增量识别"""
+        if not self._running or self._busy:
+            return
+
+        screen = QGuiApplication.screenAt(self.rect.center()) or QGuiApplication.primaryScreen()
+        # grabWindow 的坐标相对于屏幕左上角，副屏上需要从全局坐标换算
+        local = self.rect.translated(-screen.geometry().topLeft())
+        pixmap = screen.grabWindow(0, local.x(), local.y(), local.width(), local.height())
+        if pixmap.isNull():
+            logger.warning("监视区域截图失败")
+            self._timer.start(WatchConfig.INTERVAL_MS)
+            return
+
+        self._busy = True
+        image = qimage_to_bgr(pixmap.toImage())
+        threading.Thread(target=self._recognize_worker, args=(image, pixmap.devicePixelRatio(), screen.name()),
+                         name="ocr-region-watch", daemon=True).start()
+
+    def _recognize_worker(self, image, dpi_ratio, screen_name):
+        start_time = time.perf_counter()
+        diff = None
+        try:
+            diff = self.incremental.update(image, dpi_ratio, screen_name)
+        except Exception as e:
+            logger.error("区域监视识别失败: %s", e)
+        self._frame_finished.emit(diff, time.perf_counter() - start_time)
+
+    def _on_frame_finished(self, diff, elapsed):
+        self._busy = False
+        if not self._running:
+            return
+
+        # 按CPU预算调整下一次采样的间隔
+        interval = max(WatchConfig.INTERVAL_MS, int(elapsed * 1000 / WatchConfig.CPU_BUDGET))
+        self._timer.start(interval)
+
+        if diff is not None and diff.changed:
+            logger.info("监视区域变化: +%d -%d, 重新识别 %.0f%%, 耗时 %.1fms",
+                        len(diff.added), len(diff.removed), diff.recognized_ratio * 100, elapsed * 1000)
+            self.updated.emit(diff)
@@ -1,11 +1,15 @@
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
                                QLabel, QLineEdit, QFormLayout, QScrollArea,
                                QListWidget, QStackedWidget, QFileDialog,
-                               QWidget, QMessageBox, QFrame)
+                               QWidget, QMessageBox, QFrame, QComboBox, QCheckBox)
 from PySide6.QtCore import Qt, QSize
 import subprocess
 import os
 from ui.theme import ThemeManager, ThemeType, create_stylesheet
+from core.model_profiles import ModelProfile
+from core.ocr_backends import ClsMode, available_backends
+from core.preprocess import PreprocessProfile
+from core.result_sinks import parse_command, build_argv
 
 
 class SectionWidget(QWidget):
@@ -62,6 +66,7 @@ class SettingsDialog(QDialog):
 
         self.setup_ui()
         self.load_settings()
+        self.initial_theme_type = self.current_theme_type
 
     def setup_ui(self):
         main_layout = QVBoxLayout(self)
@@ -366,6 +371,16 @@ class SettingsDialog(QDialog):
         param_layout.addWidget(self.tool_param_input, 1)
         tool_section.addLayout(param_layout)
 
+        self.tool_mode_combo = QComboBox()
+        for label, mode in [("每次启动程序", "spawn"), ("常驻进程（标准输入）", "stdin"), ("常驻连接（本地端口）", "socket")]:
+            self.tool_mode_combo.addItem(label, mode)
+        self.tool_address_input = QLineEdit()
+        self.tool_address_input.setPlaceholderText("例如: 127.0.0.1:9000（仅常驻连接模式）")
+        mode_form = QFormLayout()
+        mode_form.addRow("调用方式:", self.tool_mode_combo)
+        mode_form.addRow("连接地址:", self.tool_address_input)
+        tool_section.addLayout(mode_form)
+
         preview_layout = QVBoxLayout()
         preview_layout.addWidget(self.check_info_label)
         test_btn = QPushButton("测试命令")
@@ -373,15 +388,63 @@ class SettingsDialog(QDialog):
         preview_layout.addWidget(test_btn)
         tool_section.addLayout(preview_layout)
 
-        self.create_scrollable_page("系统设置", "⚙️", [hotkey_section, tool_section])
+        capture_section = SectionWidget("截图选项", "框选截图区域时的辅助功能", self.stylesheet)
+        self.live_preview_checkbox = QCheckBox("拖动选择时实时预览识别结果")
+        capture_section.addWidget(self.live_preview_checkbox)
+        self.clipboard_mode_combo = QComboBox()
+        for label, mode in [("复制截图", "image"), ("复制文本", "text"), ("截图和文本", "both"), ("不复制", "none")]:
+            self.clipboard_mode_combo.addItem(label, mode)
+        clipboard_form = QFormLayout()
+        clipboard_form.addRow("识别完成后剪贴板:", self.clipboard_mode_combo)
+        capture_section.addLayout(clipboard_form)
+
+        self.create_scrollable_page("系统设置", "⚙️", [hotkey_section, tool_section, capture_section])
 
     def create_advanced_settings_page(self):
+        engine_section = SectionWidget("OCR引擎", "选择识别后端，保存后无需重启即可生效", self.stylesheet)
+        self.backend_combo = QComboBox()
+        self.backend_combo.addItems(available_backends())
+        form = QFormLayout()
+        self.pool_size_input = QLineEdit()
+        self.pool_size_input.setPlaceholderText("0 表示按CPU核数和内存自动决定，重启后生效")
+        form.addRow("识别后端:", self.backend_combo)
+        form.addRow("推理会话数:", self.pool_size_input)
+        self.profile_combo = QComboBox()
+        for profile in ModelProfile.ALL:
+            self.profile_combo.addItem(ModelProfile.NAMES[profile], profile)
+        self.profile_combo.setToolTip("INT8 量化模型需先运行 demos/quantize_models.py 生成，缺少时使用FP32模型")
+        form.addRow("模型精度:", self.profile_combo)
+        self.cls_combo = QComboBox()
+        for mode in ClsMode.ALL:
+            self.cls_combo.addItem(ClsMode.NAMES[mode], mode)
+        self.cls_combo.setToolTip("自动：取词和监视跳过，截图仅竖长图像启用，批量识别始终启用；关闭时不加载分类模型")
+        form.addRow("文字方向分类:", self.cls_combo)
+        self.preprocess_combo = QComboBox()
+        for profile in PreprocessProfile.ALL:
+            self.preprocess_combo.addItem(PreprocessProfile.NAMES[profile], profile)
+        self.preprocess_combo.setToolTip("深色背景反色、低对比度拉伸、小图放大和高分屏大图缩小；去彩边适合ClearType等次像素渲染的文字")
+        form.addRow("图像预处理:", self.preprocess_combo)
+        self.idle_minutes_input = QLineEdit()
+        self.idle_minutes_input.setPlaceholderText("闲置多少分钟后释放模型，0 表示常驻内存")
+        form.addRow("模型闲置释放:", self.idle_minutes_input)
+        engine_section.addLayout(form)
+
+        dict_section = SectionWidget("离线词典", "加载本地 MDX 词典，取词后直接在结果面板显示释义（同名 MDD 资源自动加载）", self.stylesheet)
+        self.dict_paths_input = QLineEdit()
+        self.dict_paths_input.setPlaceholderText("多个词典用 ; 分隔")
+        dict_browse_btn = QPushButton("添加...")
+        dict_browse_btn.clicked.connect(self.open_dictionary_dialog)
+        dict_layout = QHBoxLayout()
+        dict_layout.addWidget(self.dict_paths_input, 1)
+        dict_layout.addWidget(dict_browse_btn)
+        dict_section.addLayout(dict_layout)
+
         dev_section = SectionWidget("开发中功能", "这些功能正在开发中，敬请期待", self.stylesheet)
         layout = QVBoxLayout()
         for f in ["🔄 自动更新检查", "📊 使用统计分析", "🗃️ 数据导入导出", "🔐 高级安全选项", "🌐 云同步设置"]:
             layout.addWidget(QLabel(f))
         dev_section.addLayout(layout)
-        self.create_scrollable_page("高级设置", "🔧", [dev_section])
+        self.create_scrollable_page("高级设置", "🔧", [engine_section, dict_section, dev_section])
 
     def create_bottom_widget(self):
         widget = QWidget()
@@ -413,6 +476,13 @@ class SettingsDialog(QDialog):
             self.tool_path_label.setProperty("full_path", file_path)
             self.update_check_tool_text()
 
+    def open_dictionary_dialog(self):
+        file_paths, _ = QFileDialog.getOpenFileNames(self, "选择词典文件", "", "MDict 词典 (*.mdx);;所有文件 (*.*)")
+        if file_paths:
+            paths = [p for p in self.dict_paths_input.text().split(";") if p.strip()]
+            paths.extend(p for p in file_paths if p not in paths)
+            self.dict_paths_input.setText(";".join(paths))
+
     def update_check_tool_text(self):
         tool_path = self.tool_path_label.property("full_path")
         tool_param = self.tool_param_input.text()
@@ -422,9 +492,9 @@ class SettingsDialog(QDialog):
             self.check_info_label.setText("请先选择外部工具")
 
     def check_tool_call(self):
-        cmd = self.check_info_label.text().replace("{text}", "hello")
+        argv = build_argv(parse_command(self.check_info_label.text()), "hello")
         try:
-            subprocess.Popen(cmd, shell=True)
+            subprocess.Popen(argv)
             QMessageBox.information(self, "成功", "✅ 外部工具测试成功！")
         except Exception as e:
             QMessageBox.critical(self, "错误", f"❌ 命令执行失败:\n{str(e)}")
@@ -465,10 +535,42 @@ class SettingsDialog(QDialog):
                     self.tool_path_label.setProperty("full_path", tool_path)
                     self.tool_param_input.setText(f'"{parts[3].strip()}"')
 
+        index = self.tool_mode_combo.findData(self.settings_manager.get_value("external_tool_mode", "spawn"))
+        if index >= 0:
+            self.tool_mode_combo.setCurrentIndex(index)
+        self.tool_address_input.setText(self.settings_manager.get_value("external_tool_address", ""))
+
         # 加载快捷键设置
         hotkey = self.settings_manager.get_value("capture_shortcuts", "alt+c")
         self.hotkey_input.setText(hotkey)
 
+        # 加载截图选项
+        self.live_preview_checkbox.setChecked(bool(self.settings_manager.get_value("capture_live_preview", False)))
+        index = self.clipboard_mode_combo.findData(self.settings_manager.get_value("clipboard_mode", "image"))
+        if index >= 0:
+            self.clipboard_mode_combo.setCurrentIndex(index)
+
+        # 加载OCR后端设置
+        backend = self.settings_manager.get_value("ocr_backend", "rapidocr")
+        index = self.backend_combo.findText(backend)
+        if index >= 0:
+            self.backend_combo.setCurrentIndex(index)
+        self.pool_size_input.setText(str(self.settings_manager.get_value("ocr_pool_size", 0)))
+        index = self.profile_combo.findData(self.settings_manager.get_value("model_profile", ModelProfile.FP32))
+        if index >= 0:
+            self.profile_combo.setCurrentIndex(index)
+        index = self.cls_combo.findData(self.settings_manager.get_value("angle_cls", ClsMode.AUTO))
+        if index >= 0:
+            self.cls_combo.setCurrentIndex(index)
+        index = self.preprocess_combo.findData(
+            self.settings_manager.get_value("preprocess_profile", PreprocessProfile.SCREEN))
+        if index >= 0:
+            self.preprocess_combo.setCurrentIndex(index)
+        self.idle_minutes_input.setText(str(self.settings_manager.get_value("model_idle_minutes", 10)))
+
+        # 加载离线词典设置
+        self.dict_paths_input.setText(";".join(self.settings_manager.get_value("dictionary_paths", [])))
+
     def save_settings(self):
         """保存设置"""
         # 保存主题设置
@@ -493,10 +595,38 @@ class SettingsDialog(QDialog):
         cmd = self.check_info_label.text()
         if cmd != "请先选择外部工具":
             self.settings_manager.set_value("external_tool_exec_cmd", cmd)
+        self.settings_manager.set_value("external_tool_mode", self.tool_mode_combo.currentData())
+        self.settings_manager.set_value("external_tool_address", self.tool_address_input.text().strip())
 
         # 保存快捷键设置
         self.settings_manager.set_value("capture_shortcuts", self.hotkey_input.text())
 
+        # 保存截图选项
+        self.settings_manager.set_value("capture_live_preview", self.live_preview_checkbox.isChecked())
+        self.settings_manager.set_value("clipboard_mode", self.clipboard_mode_combo.currentData())
+
+        # 保存OCR后端设置
+        self.settings_manager.set_value("ocr_backend", self.backend_combo.currentText())
+        self.settings_manager.set_value("model_profile", self.profile_combo.currentData())
+        self.settings_manager.set_value("angle_cls", self.cls_combo.currentData())
+        self.settings_manager.set_value("preprocess_profile", self.preprocess_combo.currentData())
+        try:
+            pool_size = int(self.pool_size_input.text())
+            if pool_size >= 0:
+                self.settings_manager.set_value("ocr_pool_size", pool_size)
+        except ValueError:
+            pass  # 忽略无效的会话数
+        try:
+            idle_minutes = int(self.idle_minutes_input.text())
+            if idle_minutes >= 0:
+                self.settings_manager.set_value("model_idle_minutes", idle_minutes)
+        except ValueError:
+            pass  # 忽略无效的闲置时间
+
+        # 保存离线词典设置
+        paths = [p.strip() for p in self.dict_paths_input.text().split(";") if p.strip()]
+        self.settings_manager.set_value("dictionary_paths", paths)
+
         # 同步设置到文件
         self.settings_manager.sync()
 
@@ -522,9 +652,9 @@ class SettingsDialog(QDialog):
         """确认保存设置"""
         self.save_settings()
 
-        # 通知父窗口主题已更改
+        # 通知父窗口主题已更改（主题切换需要重启，其余设置热更新）
         if self.parent() and hasattr(self.parent(), 'apply_theme'):
-            if hasattr(self, 'current_theme_type'):
+            if hasattr(self, 'current_theme_type') and self.current_theme_type != self.initial_theme_type:
                 self.parent().apply_theme(self.current_theme_type)
 
         # 设置快捷键管理器
@@ -0,0 +1,108 @@
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from typing import List, Optional
+
+from util.utils import PathConfig
+
+# 项目日志的根命名空间，所有模块日志都挂在其下
+ROOT_LOGGER_NAME = "ocr_tool"
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_LEVEL_ENV = "OCR_TOOL_LOG_LEVEL"
+
+
+class RingBufferHandler(logging.Handler):
+    """内存环形缓冲日志处理器
+
+    只保存 LogRecord，不在记录时格式化；导出时才格式化，热路径上只有一次 deque.append。
+    """
+
+    def __init__(self, capacity: int = 2000):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+        self._dump_lock = threading.Lock()
+
+    def emit(self, record: logging.LogRecord):
+        self.records.append(record)
+
+    def dump(self) -> List[str]:
+        """格式化并返回缓冲区中的全部日志"""
+        with self._dump_lock:
+            records = list(self.records)
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.format(record))
+            except Exception:
+                lines.append(f"{record.name} - {record.levelname} - {record.msg}")
+        return lines
+
+    def dump_to_file(self, file_path: Optional[str] = None) -> str:
+        """将缓冲区日志写入文件，返回文件路径"""
+        if file_path is None:
+            log_dir = PathConfig.project_root / "logs"
+            log_dir.mkdir(parents=True, exist_ok=True)
+            file_path = log_dir / f"ocr_tool_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(self.dump()))
+            f.write('\n')
+        return str(file_path)
+
+    def clear(self):
+        """清空缓冲区"""
+        self.records.clear()
+
+
+_ring_buffer_handler: Optional[RingBufferHandler] = None
+_setup_lock = threading.Lock()
+
+
+def setup_logging(level=None, capacity: int = 2000) -> logging.Logger:
+    """初始化项目日志：控制台输出 + 内存环形缓冲，可重复调用
+
+    Args:
+        level: 日志级别，默认读取环境变量 OCR_TOOL_LOG_LEVEL，未设置时为 INFO
+        capacity: 环形缓冲容量（条）
+    """
+    global _ring_buffer_handler
+
+    with _setup_lock:
+        root = logging.getLogger(ROOT_LOGGER_NAME)
+        if level is None:
+            level = os.environ.get(LOG_LEVEL_ENV, "INFO").upper()
+        root.setLevel(level)
+
+        if _ring_buffer_handler is None:
+            formatter = logging.Formatter(LOG_FORMAT)
+
+            stream_handler = logging.StreamHandler()
+            stream_handler.setFormatter(formatter)
+            root.addHandler(stream_handler)
+
+            _ring_buffer_handler = RingBufferHandler(capacity)
+            _ring_buffer_handler.setFormatter(formatter)
+            root.addHandler(_ring_buffer_handler)
+
+            root.propagate = False
+
+    return root
+
+
+def get_logger(name: str) -> logging.Logger:
+    """获取模块日志记录器，统一挂在 ocr_tool 命名空间下"""
+    if _ring_buffer_handler is None:
+        setup_logging()
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+
+
+def get_ring_buffer() -> Optional[RingBufferHandler]:
+    """获取内存环形缓冲处理器"""
+    return _ring_buffer_handler
+
+
+def set_level(level):
+    """运行时调整日志级别"""
+    logging.getLogger(ROOT_LOGGER_NAME).setLevel(level)
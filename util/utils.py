@@ -19,11 +19,57 @@ class PathConfig:
     def get_ocr_result_path():
         return str(PathConfig.project_root / "ocr_result")
 
+    @staticmethod
+    def get_dict_index_path():
+        return str(PathConfig.project_root / "_internal" / "dict_index")
+
 
 def qimage_to_numpy(qimage: QImage) -> np.ndarray:
-    """将QImage转换为numpy数组"""
+    """将QImage转换为RGB格式的numpy数组（复制数据，不依赖临时QImage的生命周期）"""
     qimage = qimage.convertToFormat(QImage.Format.Format_RGB888)
     width, height = qimage.width(), qimage.height()
     img_np = np.ndarray((height, width, 3), buffer=qimage.constBits(),
                         strides=[qimage.bytesPerLine(), 3, 1], dtype=np.uint8)
-    return img_np
+    # 转换后的QImage是局部对象，返回前必须复制，否则数组指向已释放的内存
+    return img_np.copy()
+
+
+# 内存布局为 BGRA（小端序）的32位格式，可直接作为numpy视图使用
+_BGRA_FORMATS = (
+    QImage.Format.Format_RGB32,
+    QImage.Format.Format_ARGB32,
+    QImage.Format.Format_ARGB32_Premultiplied,
+)
+
+
+class QImageArray(np.ndarray):
+    """直接引用QImage像素缓冲区的numpy数组
+
+    数组及其切片视图都持有源QImage的引用，保证缓冲区在数组存活期间有效。
+    """
+
+    def __array_finalize__(self, obj):
+        self.qimage = getattr(obj, "qimage", None)
+
+
+def qimage_to_bgra(qimage: QImage) -> np.ndarray:
+    """将QImage以BGRA格式暴露为 (H, W, 4) 的numpy视图
+
+    截图得到的32位格式不复制数据；其它格式先转换为 RGB32（复制一次）。
+    """
+    if qimage.format() not in _BGRA_FORMATS:
+        qimage = qimage.convertToFormat(QImage.Format.Format_RGB32)
+    else:
+        # 浅拷贝，共享像素数据，只为持有引用
+        qimage = QImage(qimage)
+
+    width, height = qimage.width(), qimage.height()
+    array = np.ndarray((height, width, 4), dtype=np.uint8, buffer=qimage.constBits(),
+                       strides=(qimage.bytesPerLine(), 4, 1)).view(QImageArray)
+    array.qimage = qimage
+    return array
+
+
+def qimage_to_bgr(qimage: QImage) -> np.ndarray:
+    """将QImage以BGR格式暴露为 (H, W, 3) 的numpy视图（跨步访问，不复制数据）"""
+    return qimage_to_bgra(qimage)[:, :, :3]